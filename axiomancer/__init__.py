@@ -0,0 +1,10 @@
+"""Axiomancer tooling.
+
+Deterministic helpers that take the mechanical work of a bootstrap off the
+assistant: the assistant decides *what* the project looks like, these tools
+do the bulk reading and writing.
+
+Run ``python3 -m axiomancer --help`` for the available commands.
+"""
+
+__version__ = "0.1.0"
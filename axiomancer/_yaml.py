@@ -0,0 +1,45 @@
+"""Lazy access to PyYAML.
+
+PyYAML is the only third-party dependency of the tooling and it is only
+needed for YAML inputs, so it is imported on first use and reported as a
+normal error when missing.
+"""
+
+import json
+from pathlib import Path
+from typing import Any
+
+from .errors import AxiomancerError
+
+
+def require_yaml() -> Any:
+    """Return the ``yaml`` module or raise a helpful error."""
+    try:
+        import yaml
+    except ImportError:
+        raise AxiomancerError(
+            "PyYAML is required for YAML files: python3 -m pip install pyyaml"
+        ) from None
+    return yaml
+
+
+def load_data_file(path: Path) -> Any:
+    """Load a JSON or YAML document, choosing the parser by file extension."""
+    try:
+        text = path.read_text(encoding="utf-8")
+    except OSError as exc:
+        raise AxiomancerError(f"Cannot read {path}: {exc.strerror}") from None
+
+    if path.suffix == ".json":
+        try:
+            return json.loads(text)
+        except ValueError as exc:
+            raise AxiomancerError(f"Invalid JSON in {path}: {exc}") from None
+
+    yaml = require_yaml()
+    # The libyaml loader is an order of magnitude faster on large manifests.
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    try:
+        return yaml.load(text, Loader=loader)
+    except yaml.YAMLError as exc:
+        raise AxiomancerError(f"Invalid YAML in {path}: {exc}") from None
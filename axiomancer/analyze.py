@@ -0,0 +1,578 @@
+"""Import-graph scanner and component-boundary engine for Phase 1 analysis.
+
+The tree is walked once, source files are parsed for imports in a process
+pool, and the imports are resolved against the scanned files into a module
+dependency graph. Modules are then grouped into candidate components by
+directory and every candidate is scored:
+
+``cohesion``
+    Share of the cluster's outgoing dependencies that stay inside it.
+``coupling``
+    Share of the other clusters it depends on or is used by.
+``instability``
+    ``Ce / (Ca + Ce)`` from the efferent and afferent cluster counts.
+
+Modules are files, except in Go where the package directory is the module.
+Imports that do not resolve to a scanned file are counted as external.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import posixpath
+import re
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from .errors import AnalysisError
+
+LANGUAGES = {
+    ".py": "python",
+    ".ts": "typescript",
+    ".tsx": "typescript",
+    ".mts": "typescript",
+    ".cts": "typescript",
+    ".js": "javascript",
+    ".jsx": "javascript",
+    ".mjs": "javascript",
+    ".cjs": "javascript",
+    ".rs": "rust",
+    ".go": "go",
+}
+
+# Manifests the resolvers need: crate roots and Go module paths.
+MANIFEST_FILES = ("Cargo.toml", "go.mod")
+
+SKIP_DIRS = frozenset(
+    {
+        "node_modules",
+        "vendor",
+        "target",
+        "dist",
+        "build",
+        "out",
+        "coverage",
+        "__pycache__",
+        "venv",
+        "env",
+        "site-packages",
+    }
+)
+
+# Leading directories that hold sources rather than name a component.
+SOURCE_ROOTS = frozenset({"src", "lib", "app", "pkg", "internal", "packages"})
+
+MAX_FILE_SIZE = 1024 * 1024
+SERIAL_THRESHOLD = 200
+
+_PY_IMPORT = re.compile(r"^\s*import\s+([\w.]+(?:\s*,\s*[\w.]+)*)", re.M)
+_PY_FROM = re.compile(r"^\s*from\s+(\.*[\w.]*)\s+import\s+(\([^)]*\)|[^\n#]+)", re.M)
+_JS_IMPORT = re.compile(
+    r"""(?:\bimport\s+(?:[\w*{}\s,$]+\s+from\s+)?|\bexport\s+[\w*{}\s,$]+\s+from\s+|"""
+    r"""\brequire\s*\(\s*|\bimport\s*\(\s*)['"]([^'"\n]+)['"]"""
+)
+_RS_USE = re.compile(r"^\s*(?:pub(?:\([^)]*\))?\s+)?use\s+([\w:]+)", re.M)
+_RS_MOD = re.compile(r"^\s*(?:pub(?:\([^)]*\))?\s+)?mod\s+(\w+)\s*;", re.M)
+_GO_IMPORT_BLOCK = re.compile(r"^import\s*\(([^)]*)\)", re.M)
+_GO_IMPORT_LINE = re.compile(r'^import\s+(?:[\w.]+\s+)?"([^"]+)"', re.M)
+_GO_QUOTED = re.compile(r'"([^"]+)"')
+_GO_MODULE = re.compile(r"^module\s+(\S+)", re.M)
+
+_JS_EXTENSIONS = (".ts", ".tsx", ".mts", ".cts", ".js", ".jsx", ".mjs", ".cjs")
+
+
+@dataclass(frozen=True)
+class FileImports:
+    """Raw import specifiers found in one source file."""
+
+    path: str
+    language: str
+    imports: Tuple[str, ...]
+    digest: str = ""
+
+
+@dataclass
+class ImportGraph:
+    """Module dependency graph of a scanned tree."""
+
+    modules: Dict[str, str] = field(default_factory=dict)
+    edges: Dict[str, Set[str]] = field(default_factory=dict)
+    external: Counter = field(default_factory=Counter)
+
+    @property
+    def edge_count(self) -> int:
+        return sum(len(targets) for targets in self.edges.values())
+
+
+@dataclass
+class Cluster:
+    """A candidate component and its boundary scores."""
+
+    id: str
+    modules: List[str]
+    languages: List[str]
+    internal_edges: int
+    outgoing_edges: int
+    incoming_edges: int
+    depends_on: List[str]
+    used_by: List[str]
+    cohesion: float
+    coupling: float
+    instability: float
+    cross_cutting: bool
+
+    def to_dict(self, include_modules: bool = False) -> Dict[str, Any]:
+        data = {
+            "id": self.id,
+            "modules": len(self.modules),
+            "languages": self.languages,
+            "internal_edges": self.internal_edges,
+            "outgoing_edges": self.outgoing_edges,
+            "incoming_edges": self.incoming_edges,
+            "cohesion": self.cohesion,
+            "coupling": self.coupling,
+            "instability": self.instability,
+            "cross_cutting": self.cross_cutting,
+            "depends_on": self.depends_on,
+            "used_by": self.used_by,
+        }
+        if include_modules:
+            data["module_paths"] = self.modules
+        return data
+
+
+def iter_source_files(root: Path) -> Iterator[str]:
+    """Yield root-relative POSIX paths of source files and resolver manifests."""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(
+            d for d in dirnames if not d.startswith(".") and d not in SKIP_DIRS
+        )
+        rel_dir = os.path.relpath(dirpath, root)
+        prefix = "" if rel_dir == "." else rel_dir.replace(os.sep, "/") + "/"
+        for name in sorted(filenames):
+            if name in MANIFEST_FILES or os.path.splitext(name)[1] in LANGUAGES:
+                yield prefix + name
+
+
+def is_source_path(path: str) -> bool:
+    """Whether a root-relative path is one ``iter_source_files`` would yield."""
+    *directories, name = path.split("/")
+    if any(d.startswith(".") or d in SKIP_DIRS for d in directories):
+        return False
+    return name in MANIFEST_FILES or posixpath.splitext(name)[1] in LANGUAGES
+
+
+def content_digest(data: bytes) -> str:
+    """Short content hash used to tell whether a file changed."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def parse_imports(language: str, text: str) -> Tuple[str, ...]:
+    """Extract raw import specifiers from source text.
+
+    Python ``from`` imports are recorded as ``module.name`` so that both
+    submodule and attribute imports can be resolved later.
+    """
+    found: List[str] = []
+    if language == "python":
+        for match in _PY_IMPORT.finditer(text):
+            found.extend(name.strip() for name in match.group(1).split(","))
+        for match in _PY_FROM.finditer(text):
+            module = match.group(1)
+            names = match.group(2).strip("() \t\r\n")
+            for name in names.split(","):
+                name = name.split(" as ")[0].strip()
+                if not name or name == "*" or not name.isidentifier():
+                    continue
+                joiner = "" if module.endswith(".") else "."
+                found.append(f"{module}{joiner}{name}")
+    elif language in ("typescript", "javascript"):
+        found.extend(match.group(1) for match in _JS_IMPORT.finditer(text))
+    elif language == "rust":
+        found.extend("mod::" + match.group(1) for match in _RS_MOD.finditer(text))
+        found.extend(match.group(1).rstrip(":") for match in _RS_USE.finditer(text))
+    elif language == "go":
+        for block in _GO_IMPORT_BLOCK.finditer(text):
+            found.extend(_GO_QUOTED.findall(block.group(1)))
+        found.extend(match.group(1) for match in _GO_IMPORT_LINE.finditer(text))
+    return tuple(dict.fromkeys(found))
+
+
+def parse_file(root: Path, path: str) -> Optional[FileImports]:
+    """Parse one source file, skipping unreadable and oversized files."""
+    language = LANGUAGES.get(posixpath.splitext(path)[1])
+    if language is None:
+        return None
+    try:
+        data = (root / path).read_bytes()
+    except OSError:
+        return None
+    digest = content_digest(data)
+    if len(data) > MAX_FILE_SIZE:
+        return FileImports(path, language, (), digest)
+    text = data.decode("utf-8", errors="replace")
+    return FileImports(path, language, parse_imports(language, text), digest)
+
+
+def _parse_batch(root: Path, paths: Sequence[str]) -> List[FileImports]:
+    parsed = (parse_file(root, path) for path in paths)
+    return [result for result in parsed if result is not None]
+
+
+def parse_files(
+    root: Path, paths: Sequence[str], workers: Optional[int] = None
+) -> List[FileImports]:
+    """Parse ``paths`` in a process pool; small inputs are parsed serially."""
+    sources = [path for path in paths if posixpath.basename(path) not in MANIFEST_FILES]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(sources) < SERIAL_THRESHOLD:
+        return _parse_batch(root, sources)
+
+    batch_size = max(16, len(sources) // (workers * 8))
+    batches = [
+        sources[start : start + batch_size]
+        for start in range(0, len(sources), batch_size)
+    ]
+    results: List[FileImports] = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for parsed in executor.map(_parse_batch, [root] * len(batches), batches):
+            results.extend(parsed)
+    return results
+
+
+class _Resolver:
+    """Resolves raw import specifiers against the set of scanned files."""
+
+    def __init__(self, root: Path, paths: Iterable[str]) -> None:
+        self.files = set(paths)
+        self.python_modules: Dict[str, str] = {}
+        self.cargo_dirs: List[str] = []
+        self.go_modules: List[Tuple[str, str]] = []
+        self.go_packages = {
+            posixpath.dirname(path) or "."
+            for path in self.files
+            if path.endswith(".go")
+        }
+
+        for path in sorted(self.files):
+            directory, name = posixpath.split(path)
+            if name == "Cargo.toml":
+                self.cargo_dirs.append(directory)
+            elif name == "go.mod":
+                module = self._read_go_module(root / path)
+                if module:
+                    self.go_modules.append((module, directory))
+            elif path.endswith(".py"):
+                self._index_python(path)
+
+        # Longest prefixes first so nested crates and modules win.
+        self.cargo_dirs.sort(key=len, reverse=True)
+        self.go_modules.sort(key=lambda item: len(item[0]), reverse=True)
+
+    @staticmethod
+    def _read_go_module(path: Path) -> Optional[str]:
+        try:
+            match = _GO_MODULE.search(path.read_text(encoding="utf-8"))
+        except OSError:
+            return None
+        return match.group(1) if match else None
+
+    def _index_python(self, path: str) -> None:
+        parts = path[: -len(".py")].split("/")
+        if parts[-1] == "__init__":
+            parts = parts[:-1]
+        # The import root is the directory above the outermost package
+        # (the chain of directories with an __init__.py), so
+        # "src/pkg/mod.py" is importable as "pkg.mod".
+        directories = path.split("/")[:-1]
+        start = len(directories)
+        while (
+            start > 0 and "/".join(directories[:start]) + "/__init__.py" in self.files
+        ):
+            start -= 1
+        for dotted in (".".join(parts[start:]), ".".join(parts)):
+            if dotted:
+                self.python_modules.setdefault(dotted, path)
+
+    def module_of(self, language: str, path: str) -> str:
+        """Return the graph node for a file; Go packages are directories."""
+        if language == "go":
+            return posixpath.dirname(path) or "."
+        return path
+
+    def resolve(self, source: FileImports, spec: str) -> Optional[str]:
+        """Return the target file (or Go package), or None for external."""
+        if source.language == "python":
+            return self._resolve_python(source.path, spec)
+        if source.language in ("typescript", "javascript"):
+            return self._resolve_js(source.path, spec)
+        if source.language == "rust":
+            return self._resolve_rust(source.path, spec)
+        if source.language == "go":
+            return self._resolve_go(spec)
+        return None
+
+    def _resolve_python(self, path: str, spec: str) -> Optional[str]:
+        dotted = spec
+        if spec.startswith("."):
+            level = len(spec) - len(spec.lstrip("."))
+            package = path[: -len(".py")].split("/")
+            package = package[:-1]
+            if level > 1:
+                package = package[: -(level - 1)] if level - 1 <= len(package) else []
+            dotted = ".".join(package + [spec[level:]]).strip(".")
+        parts = dotted.split(".")
+        for end in range(len(parts), 0, -1):
+            target = self.python_modules.get(".".join(parts[:end]))
+            if target is not None:
+                return target
+        return None
+
+    def _resolve_js(self, path: str, spec: str) -> Optional[str]:
+        if not spec.startswith("."):
+            return None
+        base = posixpath.normpath(posixpath.join(posixpath.dirname(path), spec))
+        candidates = [base]
+        stem, extension = posixpath.splitext(base)
+        if extension in (".js", ".jsx", ".mjs", ".cjs"):
+            # TypeScript sources are imported with their emitted .js name.
+            candidates.extend(stem + ext for ext in _JS_EXTENSIONS)
+        candidates.extend(base + ext for ext in _JS_EXTENSIONS)
+        candidates.extend(base + "/index" + ext for ext in _JS_EXTENSIONS)
+        for candidate in candidates:
+            if candidate in self.files:
+                return candidate
+        return None
+
+    def _rust_module_dir(self, path: str) -> str:
+        directory, name = posixpath.split(path)
+        if name in ("mod.rs", "lib.rs", "main.rs"):
+            return directory
+        return posixpath.join(directory, name[: -len(".rs")])
+
+    def _rust_file(self, directory: str, segments: Sequence[str]) -> Optional[str]:
+        found = None
+        for segment in segments:
+            base = posixpath.join(directory, segment)
+            for candidate in (base + ".rs", base + "/mod.rs"):
+                if candidate in self.files:
+                    found = candidate
+                    break
+            else:
+                break
+            directory = base
+        return found
+
+    def _resolve_rust(self, path: str, spec: str) -> Optional[str]:
+        if spec.startswith("mod::"):
+            return self._rust_file(self._rust_module_dir(path), [spec[len("mod::") :]])
+        segments = spec.split("::")
+        if segments[0] == "crate":
+            crate = next(
+                (d for d in self.cargo_dirs if path.startswith(d + "/" if d else "")),
+                None,
+            )
+            if crate is None:
+                return None
+            return self._rust_file(posixpath.join(crate, "src"), segments[1:])
+        directory = self._rust_module_dir(path)
+        if segments[0] == "self":
+            return self._rust_file(directory, segments[1:])
+        if segments[0] == "super":
+            while segments and segments[0] == "super":
+                directory = posixpath.dirname(directory)
+                segments = segments[1:]
+            return self._rust_file(directory, segments)
+        return None
+
+    def _resolve_go(self, spec: str) -> Optional[str]:
+        for module, directory in self.go_modules:
+            if spec == module or spec.startswith(module + "/"):
+                target = posixpath.join(directory, spec[len(module) :].lstrip("/"))
+                target = posixpath.normpath(target) if target else "."
+                if target in self.go_packages:
+                    return target
+        return None
+
+
+def external_name(language: str, spec: str) -> Optional[str]:
+    """Name of the third-party package an unresolved specifier refers to."""
+    if spec.startswith(".") or spec.startswith("mod::"):
+        return None
+    if language == "python":
+        return spec.split(".")[0]
+    if language in ("typescript", "javascript"):
+        parts = spec.split("/")
+        return "/".join(parts[:2]) if spec.startswith("@") else parts[0]
+    if language == "rust":
+        name = spec.split("::")[0]
+        return None if name in ("crate", "self", "super") else name
+    return spec
+
+
+def build_graph(
+    root: Path, paths: Sequence[str], parsed: Iterable[FileImports]
+) -> ImportGraph:
+    """Resolve parsed imports into a module dependency graph."""
+    resolver = _Resolver(root, paths)
+    graph = ImportGraph()
+    for source in parsed:
+        module = resolver.module_of(source.language, source.path)
+        graph.modules.setdefault(module, source.language)
+        targets = graph.edges.setdefault(module, set())
+        for spec in source.imports:
+            target = resolver.resolve(source, spec)
+            if target is None:
+                name = external_name(source.language, spec)
+                if name:
+                    graph.external[name] += 1
+            elif target != module:
+                targets.add(target)
+    return graph
+
+
+def scan(root: Path, workers: Optional[int] = None) -> ImportGraph:
+    """Walk ``root`` and build its import graph."""
+    if not root.is_dir():
+        raise AnalysisError(f"Not a directory: {root}")
+    paths = list(iter_source_files(root))
+    return build_graph(root, paths, parse_files(root, paths, workers))
+
+
+def cluster_key(module: str, depth: int = 1) -> str:
+    """Directory that names the candidate component a module belongs to.
+
+    Leading source roots (``src/``, ``lib/``, ...) are kept in the key but do
+    not count towards ``depth``; top-level files form the ``.`` cluster.
+    """
+    parts = module.split("/")
+    if posixpath.splitext(parts[-1])[1] in LANGUAGES:
+        parts = parts[:-1]
+    skipped = 0
+    while skipped < len(parts) and parts[skipped] in SOURCE_ROOTS:
+        skipped += 1
+    kept = parts[: skipped + depth]
+    return "/".join(kept) if kept else "."
+
+
+def _ratio(numerator: float, denominator: float) -> float:
+    return round(numerator / denominator, 3) if denominator else 0.0
+
+
+def find_clusters(graph: ImportGraph, depth: int = 1) -> List[Cluster]:
+    """Group modules into candidate components and score their boundaries."""
+    members: Dict[str, List[str]] = defaultdict(list)
+    for module in graph.modules:
+        members[cluster_key(module, depth)].append(module)
+
+    owner = {module: key for key, modules in members.items() for module in modules}
+    internal: Counter = Counter()
+    outgoing: Counter = Counter()
+    incoming: Counter = Counter()
+    depends_on: Dict[str, Set[str]] = defaultdict(set)
+    used_by: Dict[str, Set[str]] = defaultdict(set)
+    for module, targets in graph.edges.items():
+        source = owner[module]
+        for target in targets:
+            destination = owner.get(target, cluster_key(target, depth))
+            if destination == source:
+                internal[source] += 1
+            else:
+                outgoing[source] += 1
+                incoming[destination] += 1
+                depends_on[source].add(destination)
+                used_by[destination].add(source)
+
+    others = max(len(members) - 1, 1)
+    clusters = []
+    for key in sorted(members):
+        afferent, efferent = len(used_by[key]), len(depends_on[key])
+        clusters.append(
+            Cluster(
+                id=key,
+                modules=sorted(members[key]),
+                languages=sorted({graph.modules[m] for m in members[key]}),
+                internal_edges=internal[key],
+                outgoing_edges=outgoing[key],
+                incoming_edges=incoming[key],
+                depends_on=sorted(depends_on[key]),
+                used_by=sorted(used_by[key]),
+                cohesion=_ratio(internal[key], internal[key] + outgoing[key]),
+                coupling=_ratio(len(depends_on[key] | used_by[key]), others),
+                instability=_ratio(efferent, afferent + efferent),
+                # Used by most other clusters while using none: shared code
+                # such as utils/ rather than a component of its own.
+                cross_cutting=len(members) > 2
+                and afferent > others / 2
+                and efferent == 0,
+            )
+        )
+    return clusters
+
+
+def summarize(
+    root: Path,
+    graph: ImportGraph,
+    clusters: Sequence[Cluster],
+    include_edges: bool = False,
+    top_external: int = 25,
+) -> Dict[str, Any]:
+    """Compact, JSON-serializable analysis summary."""
+    summary: Dict[str, Any] = {
+        "root": str(root),
+        "modules": len(graph.modules),
+        "edges": graph.edge_count,
+        "languages": dict(Counter(graph.modules.values()).most_common()),
+        "clusters": [c.to_dict(include_modules=include_edges) for c in clusters],
+        "external_imports": dict(graph.external.most_common(top_external)),
+    }
+    if include_edges:
+        summary["module_edges"] = {
+            module: sorted(targets)
+            for module, targets in sorted(graph.edges.items())
+            if targets
+        }
+    return summary
+
+
+def register(subparsers: Any) -> None:
+    parser = subparsers.add_parser(
+        "analyze",
+        help="scan imports and propose component clusters",
+        description="Build the module dependency graph of a tree and print "
+        "candidate component clusters with cohesion and coupling scores.",
+    )
+    parser.add_argument(
+        "root", nargs="?", type=Path, default=Path("."), help="tree to scan"
+    )
+    parser.add_argument(
+        "--depth",
+        type=int,
+        default=1,
+        help="directory levels below source roots per cluster (default: 1)",
+    )
+    parser.add_argument(
+        "--workers", type=int, help="parser processes (default: CPU count)"
+    )
+    parser.add_argument(
+        "--edges", action="store_true", help="include module paths and edges"
+    )
+    parser.add_argument("--pretty", action="store_true", help="indent the JSON")
+    parser.set_defaults(func=run)
+
+
+def run(args: argparse.Namespace) -> int:
+    if args.depth < 1:
+        raise AnalysisError("--depth must be at least 1")
+    graph = scan(args.root, workers=args.workers)
+    clusters = find_clusters(graph, depth=args.depth)
+    summary = summarize(args.root, graph, clusters, include_edges=args.edges)
+    if args.pretty:
+        print(json.dumps(summary, indent=2))
+    else:
+        print(json.dumps(summary, separators=(",", ":")))
+    return 0
@@ -0,0 +1,73 @@
+"""Command line dispatcher for ``python3 -m axiomancer``.
+
+Each command module exposes ``register(subparsers)``, which adds its parser
+and sets ``func`` to a callable taking the parsed arguments and returning an
+exit status.
+"""
+
+import argparse
+import sys
+from typing import List, Optional
+
+from . import (
+    __version__,
+    analyze,
+    context,
+    detect,
+    evidence,
+    gates,
+    index,
+    manifest,
+    patch,
+    prompt,
+    render,
+    schedule,
+    trace,
+    validate,
+)
+from .errors import AxiomancerError
+
+COMMANDS = (
+    render,
+    analyze,
+    index,
+    manifest,
+    schedule,
+    validate,
+    prompt,
+    context,
+    evidence,
+    gates,
+    detect,
+    trace,
+    patch,
+)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the top-level parser with one subcommand per command module."""
+    parser = argparse.ArgumentParser(
+        prog="axiomancer",
+        description="Deterministic tooling for Axiomancer bootstraps.",
+    )
+    parser.add_argument(
+        "--version", action="version", version=f"%(prog)s {__version__}"
+    )
+    subparsers = parser.add_subparsers(dest="command", metavar="COMMAND")
+    subparsers.required = True
+    for module in COMMANDS:
+        module.register(subparsers)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the command line and return the process exit status."""
+    args = build_parser().parse_args(argv)
+    try:
+        if args.command == "trace":
+            return args.func(args)
+        with trace.span(f"cli.{args.command}"):
+            return args.func(args)
+    except AxiomancerError as exc:
+        print(f"❌ Error: {exc}", file=sys.stderr)
+        return 1
@@ -0,0 +1,416 @@
+"""Per-component context packs for ``summon``.
+
+``SYSTEM_ARCHITECTURE.md``, ``GLOSSARY.md``, ``STATUS_MANIFEST.yaml`` and the
+plans under ``plans/`` are indexed into ``.axiomancer_cache/context.json``:
+heading sections for the markdown documents, term entries for the glossary
+and one block per component for the manifest, all as byte ranges. A refresh
+re-reads only documents whose size or modification time changed and
+re-indexes only those whose content changed.
+
+A pack for one component is assembled by reading just the ranges it needs:
+its manifest entry, the architecture sections whose headings name it, the
+glossary entries for terms used there, and the plans of its direct
+dependencies, each cut at a section boundary to a token budget. Its size
+depends on the component and its direct dependencies, not on the size of
+the project.
+"""
+
+import argparse
+import json
+import os
+import re
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from . import state, trace
+from .analyze import content_digest
+from .manifest import Manifest, component_blocks
+from .prompt import CHARS_PER_TOKEN, estimate_tokens
+from .render import PLACEHOLDER_PATTERN
+from .sections import split_sections, update_fence
+
+INDEX_FILE = "context.json"
+INDEX_VERSION = 1
+ARCHITECTURE = "SYSTEM_ARCHITECTURE.md"
+GLOSSARY = "GLOSSARY.md"
+MANIFEST_NAME = "STATUS_MANIFEST.yaml"
+PLANS_DIR = "plans"
+DEFAULT_PLAN_BUDGET = 1500
+
+_TERM = re.compile(r"^(?:[-*][ \t]+)?\*\*(?P<term>[^*\n]+?)\*\*")
+
+
+def document_names(root: Path) -> List[str]:
+    """The indexed documents that exist under ``root``, plans last."""
+    names = [ARCHITECTURE, GLOSSARY, MANIFEST_NAME]
+    plans = root / PLANS_DIR
+    if plans.is_dir():
+        names += sorted(
+            f"{PLANS_DIR}/{entry.name}"
+            for entry in os.scandir(plans)
+            if entry.name.endswith(".md") and entry.is_file()
+        )
+    return [name for name in names if (root / name).is_file()]
+
+
+def glossary_entries(text: str) -> Dict[str, Tuple[int, int]]:
+    """Character range of every ``**Term**`` entry below a level 2+ heading.
+
+    An entry runs from its term to the next blank line, heading or term.
+    Terms that are still placeholders are skipped.
+    """
+    entries: Dict[str, Tuple[int, int]] = {}
+    current: Optional[Tuple[str, int]] = None
+    level = 0
+    offset = 0
+    fence: Optional[str] = None
+
+    def close(end: int) -> None:
+        if current is not None and current[0] not in entries:
+            entries[current[0]] = (current[1], end)
+
+    for line in text.splitlines(keepends=True):
+        opened, fence = fence, update_fence(fence, line)
+        if opened is None and fence is None:
+            stripped = line.strip()
+            heading = len(stripped) - len(stripped.lstrip("#"))
+            match = _TERM.match(line)
+            if not stripped or heading:
+                close(offset)
+                current = None
+                level = heading or level
+            elif match and level >= 2:
+                close(offset)
+                term = match.group("term").strip().rstrip(":").strip()
+                placeholder = PLACEHOLDER_PATTERN.search(term)
+                current = None if placeholder or not term else (term, offset)
+        offset += len(line)
+    close(offset)
+    return entries
+
+
+def _byte_offsets(text: str, offsets: Iterable[int]) -> Dict[int, int]:
+    """Map character offsets into ``text`` to offsets in its encoded bytes."""
+    if text.isascii():
+        return {offset: offset for offset in offsets}
+    mapping = {}
+    position = encoded = 0
+    for offset in sorted(set(offsets)):
+        encoded += len(text[position:offset].encode("utf-8", "surrogateescape"))
+        position = offset
+        mapping[offset] = encoded
+    return mapping
+
+
+def index_document(name: str, data: bytes) -> Dict[str, Any]:
+    """Sections, glossary terms or component blocks of one document, with
+    byte offsets.
+    """
+    text = data.decode("utf-8", "surrogateescape")
+    record: Dict[str, Any] = {}
+    if name == MANIFEST_NAME:
+        lines = text.splitlines(keepends=True)
+        starts = [0]
+        for line in lines:
+            starts.append(starts[-1] + len(line))
+        blocks = {
+            cid: (starts[first], starts[last])
+            for cid, (first, last) in component_blocks(lines).items()
+        }
+        to_bytes = _byte_offsets(text, [o for span in blocks.values() for o in span])
+        record["components"] = {
+            cid: [to_bytes[start], to_bytes[end]]
+            for cid, (start, end) in blocks.items()
+        }
+        return record
+
+    sections = split_sections(text)
+    terms = glossary_entries(text) if name == GLOSSARY else {}
+    to_bytes = _byte_offsets(
+        text,
+        [o for s in sections for o in (s.start, s.end)]
+        + [o for span in terms.values() for o in span],
+    )
+    record["sections"] = [
+        [s.level, s.title, to_bytes[s.start], to_bytes[s.end]] for s in sections
+    ]
+    if name == GLOSSARY:
+        record["terms"] = {
+            term: [to_bytes[start], to_bytes[end]]
+            for term, (start, end) in terms.items()
+        }
+    return record
+
+
+def load_context_index(root: Path) -> Optional[Dict[str, Any]]:
+    """Return the stored context index of ``root``, or None if absent or
+    outdated.
+    """
+    index = state.read_json(root / state.STATE_DIR_NAME / INDEX_FILE)
+    if not isinstance(index, dict) or index.get("version") != INDEX_VERSION:
+        return None
+    return index
+
+
+def update_context_index(
+    root: Path, full: bool = False
+) -> Tuple[Dict[str, Any], List[str]]:
+    """Refresh the context index of ``root``; returns it and the documents
+    that were re-indexed.
+    """
+    previous = {} if full else (load_context_index(root) or {}).get("documents", {})
+    documents: Dict[str, Any] = {}
+    reindexed = []
+    for name in document_names(root):
+        path = root / name
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        record = previous.get(name)
+        if (
+            record is not None
+            and record["size"] == stat.st_size
+            and record["mtime_ns"] == stat.st_mtime_ns
+        ):
+            documents[name] = record
+            continue
+        data = path.read_bytes()
+        digest = content_digest(data)
+        if record is None or record["digest"] != digest:
+            record = {"digest": digest, **index_document(name, data)}
+            reindexed.append(name)
+        documents[name] = {**record, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+    index = {"version": INDEX_VERSION, "documents": documents}
+    if documents != previous:
+        state.state_dir(root)
+        state.write_json(root / state.STATE_DIR_NAME / INDEX_FILE, index)
+    return index, reindexed
+
+
+def _read_ranges(path: Path, ranges: Sequence[Sequence[int]]) -> List[str]:
+    texts = []
+    with path.open("rb") as handle:
+        for start, end in ranges:
+            handle.seek(start)
+            texts.append(
+                handle.read(end - start).decode("utf-8", "surrogateescape").strip()
+            )
+    return texts
+
+
+def _subtrees(sections: Sequence[Sequence[Any]], chosen: Iterable[int]) -> List[Any]:
+    """Byte ranges of the chosen sections including their subsections,
+    skipping any that are nested in an earlier choice.
+    """
+    ranges: List[Any] = []
+    for index in sorted(chosen):
+        level, _, start, end = sections[index]
+        if ranges and start < ranges[-1][1]:
+            continue
+        for following in sections[index + 1 :]:
+            if following[0] <= level:
+                break
+            end = following[3]
+        ranges.append([start, end])
+    return ranges
+
+
+def _mentions(words: Iterable[str]) -> Optional["re.Pattern[str]"]:
+    alternatives = sorted({w for w in words if w}, key=len, reverse=True)
+    if not alternatives:
+        return None
+    return re.compile(
+        r"(?<!\w)(?:" + "|".join(map(re.escape, alternatives)) + r")(?!\w)",
+        re.IGNORECASE,
+    )
+
+
+@dataclass
+class ContextPart:
+    """One excerpt of a context pack."""
+
+    kind: str
+    source: str
+    title: str
+    text: str
+    truncated: bool = False
+
+    @property
+    def tokens(self) -> int:
+        return estimate_tokens(self.text)
+
+
+@dataclass
+class ContextPack:
+    """Everything a summon of one component needs from the project docs."""
+
+    component: str
+    name: str
+    parts: List[ContextPart] = field(default_factory=list)
+    missing: List[str] = field(default_factory=list)
+
+    @property
+    def tokens(self) -> int:
+        return estimate_tokens(self.render())
+
+    def render(self) -> str:
+        """The pack as one markdown document."""
+        title = f"{self.component} ({self.name})" if self.name else self.component
+        blocks = [f"# Context Pack: {title}"]
+        for part in self.parts:
+            heading = f"## {part.title} ({part.source})"
+            body = part.text
+            if part.kind == "manifest":
+                body = f"```yaml\n{body}\n```"
+            if part.truncated:
+                body += "\n\n[... truncated; read the full document if needed]"
+            blocks.append(f"{heading}\n\n{body}")
+        if self.missing:
+            blocks.append(
+                "## Not Found\n\n" + "\n".join(f"- {item}" for item in self.missing)
+            )
+        return "\n\n".join(blocks) + "\n"
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        for item, part in zip(data["parts"], self.parts):
+            item["tokens"] = part.tokens
+        data["tokens"] = self.tokens
+        return data
+
+
+def _plan_part(
+    root: Path, name: str, record: Dict[str, Any], budget: int
+) -> ContextPart:
+    """A dependency plan cut at a section boundary to ``budget`` tokens."""
+    sections = record["sections"]
+    end = sections[0][3] if sections else record["size"]
+    for section in sections[1:]:
+        if (section[3] - sections[0][2]) > budget * CHARS_PER_TOKEN:
+            break
+        end = section[3]
+    start = sections[0][2] if sections else 0
+    truncated = end < (sections[-1][3] if sections else record["size"])
+    (text,) = _read_ranges(root / name, [[start, end]])
+    if len(text) > budget * CHARS_PER_TOKEN:
+        text = text[: budget * CHARS_PER_TOKEN].rstrip()
+        truncated = True
+    return ContextPart("plan", name, "Dependency Plan", text, truncated)
+
+
+def build_pack(
+    root: Path,
+    component_id: str,
+    manifest: Optional[Manifest] = None,
+    index: Optional[Dict[str, Any]] = None,
+    plan_budget: int = DEFAULT_PLAN_BUDGET,
+) -> ContextPack:
+    """Assemble the context pack of ``component_id`` from the indexed docs."""
+    if manifest is None:
+        manifest = Manifest.load(root / MANIFEST_NAME)
+    component = manifest.get(component_id)
+    if index is None:
+        index, _ = update_context_index(root)
+    documents = index["documents"]
+    name = "" if PLACEHOLDER_PATTERN.search(component.name) else component.name
+    pack = ContextPack(component_id, name)
+
+    block = documents.get(MANIFEST_NAME, {}).get("components", {}).get(component_id)
+    if block is not None:
+        (text,) = _read_ranges(root / MANIFEST_NAME, [block])
+        pack.parts.append(
+            ContextPart("manifest", MANIFEST_NAME, "Manifest Entry", text)
+        )
+
+    architecture = documents.get(ARCHITECTURE)
+    names = _mentions([component_id, name])
+    if architecture is not None and names is not None:
+        sections = architecture["sections"]
+        chosen = [i for i, section in enumerate(sections) if names.search(section[1])]
+        ranges = _subtrees(sections, chosen)
+        for text in _read_ranges(root / ARCHITECTURE, ranges):
+            pack.parts.append(
+                ContextPart("architecture", ARCHITECTURE, "Architecture", text)
+            )
+        if not ranges:
+            pack.missing.append(f"no {ARCHITECTURE} heading names {component_id}")
+    elif architecture is None:
+        pack.missing.append(ARCHITECTURE)
+
+    glossary = documents.get(GLOSSARY)
+    if glossary is not None and glossary.get("terms"):
+        mentioned = "\n".join([name] + [part.text for part in pack.parts])
+        terms = _mentions(glossary["terms"])
+        used = {match.group(0).lower() for match in terms.finditer(mentioned)}
+        spans = sorted(
+            span for term, span in glossary["terms"].items() if term.lower() in used
+        )
+        if spans:
+            text = "\n\n".join(_read_ranges(root / GLOSSARY, spans))
+            pack.parts.append(ContextPart("glossary", GLOSSARY, "Glossary", text))
+
+    for dependency in component.dependencies:
+        plan = f"{PLANS_DIR}/{dependency}.md"
+        if plan in documents:
+            pack.parts.append(_plan_part(root, plan, documents[plan], plan_budget))
+        else:
+            pack.missing.append(plan)
+    return pack
+
+
+def register(subparsers: Any) -> None:
+    parser = subparsers.add_parser(
+        "context",
+        help="build a component's context pack for summon",
+        description="Index the architecture, glossary, manifest and plans by "
+        "section and print the parts one component's summon needs. Without a "
+        "component, only refresh the index.",
+    )
+    parser.add_argument("component", nargs="?", help="component id")
+    parser.add_argument("--root", type=Path, default=Path("."), help="project root")
+    parser.add_argument(
+        "--plan-budget",
+        type=int,
+        default=DEFAULT_PLAN_BUDGET,
+        metavar="TOKENS",
+        help="approximate tokens per dependency plan "
+        f"(default: {DEFAULT_PLAN_BUDGET})",
+    )
+    parser.add_argument("--full", action="store_true", help="re-index every document")
+    parser.add_argument(
+        "-o", "--output", type=Path, help="write the pack here instead of stdout"
+    )
+    parser.add_argument("--json", action="store_true", help="print JSON results")
+    parser.set_defaults(func=run)
+
+
+def run(args: argparse.Namespace) -> int:
+    index, reindexed = update_context_index(args.root, args.full)
+    if args.component is None:
+        documents = index["documents"]
+        summary = {
+            "documents": len(documents),
+            "reindexed": reindexed,
+            "sections": sum(len(d.get("sections", ())) for d in documents.values()),
+            "terms": len(documents.get(GLOSSARY, {}).get("terms", {})),
+            "components": len(documents.get(MANIFEST_NAME, {}).get("components", {})),
+        }
+        print(json.dumps(summary, indent=2 if args.json else None))
+        return 0
+
+    pack = build_pack(
+        args.root, args.component, index=index, plan_budget=args.plan_budget
+    )
+    trace.annotate(tokens=pack.tokens, reindexed=len(reindexed))
+    if args.output is not None:
+        state.write_text(args.output, pack.render())
+    if args.json:
+        print(json.dumps(pack.to_dict(), indent=2))
+    elif args.output is not None:
+        print(f"✅ Wrote {args.output}: ~{pack.tokens} tokens, {len(pack.parts)} parts")
+    else:
+        print(pack.render(), end="")
+    return 0
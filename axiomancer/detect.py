@@ -0,0 +1,548 @@
+"""Bounded project type detection for Phase 1 and mode detection.
+
+The tree is walked with ``os.scandir`` under a time budget and a file limit.
+Directories that ``.gitignore`` excludes, Git LFS files named in
+``.gitattributes``, dot directories and a deny-list of vendored and build
+directories (``node_modules``, ``target``, ...) are pruned without being
+entered. Pending directories are visited in a seeded random order after the
+root, so a walk cut short by the budget is still a sample of the whole tree
+rather than of its first few branches, and directories with very many files
+are sampled instead of listed in full.
+
+The result is a language histogram (files and bytes per language, scaled up
+for sampled directories), the manifests found (``package.json``,
+``pyproject.toml``, ``Cargo.toml``, ``go.mod``, ...) and the application and
+test frameworks their dependencies and the sampled file names point to.
+"""
+
+import argparse
+import fnmatch
+import json
+import os
+import random
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .analyze import SKIP_DIRS
+from .errors import AnalysisError
+
+DEFAULT_BUDGET = 2.0
+DEFAULT_MAX_FILES = 200_000
+DIR_SAMPLE = 512
+MAX_MANIFESTS = 32
+MANIFEST_BYTES = 256 * 1024
+SEED = 0
+
+DENY_DIRS = SKIP_DIRS | {
+    "bower_components",
+    "jspm_packages",
+    "site-packages",
+    "Pods",
+    "DerivedData",
+    "elm-stuff",
+    "_build",
+}
+
+LANGUAGES = {
+    ".py": "Python",
+    ".pyi": "Python",
+    ".ts": "TypeScript",
+    ".tsx": "TypeScript",
+    ".mts": "TypeScript",
+    ".cts": "TypeScript",
+    ".js": "JavaScript",
+    ".jsx": "JavaScript",
+    ".mjs": "JavaScript",
+    ".cjs": "JavaScript",
+    ".vue": "Vue",
+    ".svelte": "Svelte",
+    ".rs": "Rust",
+    ".go": "Go",
+    ".java": "Java",
+    ".kt": "Kotlin",
+    ".kts": "Kotlin",
+    ".scala": "Scala",
+    ".rb": "Ruby",
+    ".php": "PHP",
+    ".cs": "C#",
+    ".fs": "F#",
+    ".swift": "Swift",
+    ".m": "Objective-C",
+    ".c": "C",
+    ".h": "C",
+    ".cc": "C++",
+    ".cpp": "C++",
+    ".cxx": "C++",
+    ".hpp": "C++",
+    ".ex": "Elixir",
+    ".exs": "Elixir",
+    ".erl": "Erlang",
+    ".dart": "Dart",
+    ".lua": "Lua",
+    ".r": "R",
+    ".jl": "Julia",
+    ".hs": "Haskell",
+    ".ml": "OCaml",
+    ".clj": "Clojure",
+    ".sh": "Shell",
+    ".bash": "Shell",
+}
+
+MANIFESTS = {
+    "package.json": "JavaScript",
+    "deno.json": "TypeScript",
+    "tsconfig.json": "TypeScript",
+    "pyproject.toml": "Python",
+    "setup.py": "Python",
+    "setup.cfg": "Python",
+    "requirements.txt": "Python",
+    "Pipfile": "Python",
+    "Cargo.toml": "Rust",
+    "go.mod": "Go",
+    "pom.xml": "Java",
+    "build.gradle": "Java",
+    "build.gradle.kts": "Kotlin",
+    "Gemfile": "Ruby",
+    "composer.json": "PHP",
+    "mix.exs": "Elixir",
+    "pubspec.yaml": "Dart",
+    "Package.swift": "Swift",
+    "CMakeLists.txt": "C++",
+}
+
+# (dependency name, framework, kind) looked for in each manifest type.
+_JS = (
+    ("next", "Next.js", "web"),
+    ("react", "React", "web"),
+    ("vue", "Vue", "web"),
+    ("nuxt", "Nuxt", "web"),
+    ("@angular/core", "Angular", "web"),
+    ("svelte", "Svelte", "web"),
+    ("express", "Express", "web"),
+    ("fastify", "Fastify", "web"),
+    ("@nestjs/core", "NestJS", "web"),
+    ("electron", "Electron", "desktop"),
+    ("jest", "Jest", "test"),
+    ("vitest", "Vitest", "test"),
+    ("mocha", "Mocha", "test"),
+    ("jasmine", "Jasmine", "test"),
+    ("ava", "AVA", "test"),
+    ("@playwright/test", "Playwright", "test"),
+    ("cypress", "Cypress", "test"),
+)
+_PYTHON = (
+    ("django", "Django", "web"),
+    ("flask", "Flask", "web"),
+    ("fastapi", "FastAPI", "web"),
+    ("starlette", "Starlette", "web"),
+    ("aiohttp", "aiohttp", "web"),
+    ("tornado", "Tornado", "web"),
+    ("celery", "Celery", "worker"),
+    ("click", "Click", "cli"),
+    ("typer", "Typer", "cli"),
+    ("pytest", "pytest", "test"),
+    ("nose2", "nose2", "test"),
+    ("hypothesis", "Hypothesis", "test"),
+)
+FRAMEWORKS: Dict[str, Sequence[Tuple[str, str, str]]] = {
+    "package.json": _JS,
+    "deno.json": _JS,
+    "pyproject.toml": _PYTHON,
+    "setup.py": _PYTHON,
+    "setup.cfg": _PYTHON,
+    "requirements.txt": _PYTHON,
+    "Pipfile": _PYTHON,
+    "Cargo.toml": (
+        ("actix-web", "Actix Web", "web"),
+        ("axum", "Axum", "web"),
+        ("rocket", "Rocket", "web"),
+        ("warp", "Warp", "web"),
+        ("tokio", "Tokio", "runtime"),
+        ("clap", "clap", "cli"),
+        ("proptest", "proptest", "test"),
+    ),
+    "go.mod": (
+        ("github.com/gin-gonic/gin", "Gin", "web"),
+        ("github.com/labstack/echo", "Echo", "web"),
+        ("github.com/gofiber/fiber", "Fiber", "web"),
+        ("github.com/go-chi/chi", "chi", "web"),
+        ("github.com/spf13/cobra", "Cobra", "cli"),
+        ("github.com/stretchr/testify", "testify", "test"),
+        ("github.com/onsi/ginkgo", "Ginkgo", "test"),
+    ),
+    "Gemfile": (
+        ("rails", "Rails", "web"),
+        ("sinatra", "Sinatra", "web"),
+        ("rspec", "RSpec", "test"),
+        ("minitest", "Minitest", "test"),
+    ),
+    "pom.xml": (
+        ("spring-boot", "Spring Boot", "web"),
+        ("junit", "JUnit", "test"),
+    ),
+    "build.gradle": (
+        ("spring-boot", "Spring Boot", "web"),
+        ("junit", "JUnit", "test"),
+    ),
+    "composer.json": (
+        ("laravel/framework", "Laravel", "web"),
+        ("symfony/framework-bundle", "Symfony", "web"),
+        ("phpunit/phpunit", "PHPUnit", "test"),
+    ),
+    "mix.exs": (("phoenix", "Phoenix", "web"), ("ex_unit", "ExUnit", "test")),
+}
+FRAMEWORKS["build.gradle.kts"] = FRAMEWORKS["build.gradle"]
+
+# File names that identify a test framework on their own.
+TEST_FILES = (
+    ("conftest.py", "pytest"),
+    ("pytest.ini", "pytest"),
+    ("jest.config.*", "Jest"),
+    ("vitest.config.*", "Vitest"),
+    ("cypress.config.*", "Cypress"),
+    ("playwright.config.*", "Playwright"),
+    (".rspec", "RSpec"),
+    ("phpunit.xml*", "PHPUnit"),
+    ("*_test.go", "go test"),
+)
+BUILTIN_TESTS = {"Rust": "cargo test", "Go": "go test"}
+
+
+def _glob_regex(pattern: str) -> str:
+    parts = []
+    index = 0
+    while index < len(pattern):
+        if pattern.startswith("**/", index):
+            parts.append("(?:.*/)?")
+            index += 3
+        elif pattern.startswith("**", index):
+            parts.append(".*")
+            index += 2
+        elif pattern[index] == "*":
+            parts.append("[^/]*")
+            index += 1
+        elif pattern[index] == "?":
+            parts.append("[^/]")
+            index += 1
+        elif pattern[index] == "[" and "]" in pattern[index + 1 :]:
+            end = pattern.index("]", index + 1)
+            body = pattern[index + 1 : end].replace("\\", "\\\\")
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            parts.append(f"[{body}]")
+            index = end + 1
+        else:
+            parts.append(re.escape(pattern[index]))
+            index += 1
+    return "".join(parts)
+
+
+@dataclass(frozen=True)
+class IgnoreRule:
+    """One ``.gitignore`` pattern, relative to the directory it came from."""
+
+    base: str
+    regex: "re.Pattern[str]"
+    negate: bool
+    dir_only: bool
+
+    def matches(self, path: str, is_dir: bool) -> bool:
+        if self.dir_only and not is_dir:
+            return False
+        if self.base:
+            if not path.startswith(self.base + "/"):
+                return False
+            path = path[len(self.base) + 1 :]
+        return self.regex.match(path) is not None
+
+
+def parse_ignore(text: str, base: str = "") -> List[IgnoreRule]:
+    """Rules of a ``.gitignore`` file found in directory ``base``."""
+    rules = []
+    for line in text.splitlines():
+        line = line.rstrip()
+        if not line or line.startswith("#"):
+            continue
+        negate = line.startswith("!")
+        pattern = line[1:] if negate else line
+        pattern = pattern.replace("\\#", "#").replace("\\!", "!")
+        dir_only = pattern.endswith("/")
+        pattern = pattern.rstrip("/")
+        if not pattern:
+            continue
+        anchored = "/" in pattern
+        body = _glob_regex(pattern.lstrip("/"))
+        regex = re.compile(("^" if anchored else "^(?:.*/)?") + body + "$")
+        rules.append(IgnoreRule(base, regex, negate, dir_only))
+    return rules
+
+
+def parse_lfs(text: str) -> List[IgnoreRule]:
+    """Ignore rules for the files ``.gitattributes`` stores in Git LFS."""
+    patterns = [
+        line.split()[0]
+        for line in text.splitlines()
+        if "filter=lfs" in line.split()[1:] and not line.startswith("#")
+    ]
+    return parse_ignore("\n".join(patterns))
+
+
+def is_ignored(rules: Sequence[IgnoreRule], path: str, is_dir: bool) -> bool:
+    """Whether the last rule matching ``path`` excludes it."""
+    ignored = False
+    for rule in rules:
+        if rule.matches(path, is_dir):
+            ignored = not rule.negate
+    return ignored
+
+
+def _read(path: str, limit: int = MANIFEST_BYTES) -> str:
+    try:
+        with open(path, "rb") as handle:
+            return handle.read(limit).decode("utf-8", "replace")
+    except OSError:
+        return ""
+
+
+@dataclass
+class Detection:
+    """What a bounded walk found out about a tree."""
+
+    root: str
+    languages: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    manifests: List[str] = field(default_factory=list)
+    frameworks: List[Dict[str, str]] = field(default_factory=list)
+    test_frameworks: List[str] = field(default_factory=list)
+    stats: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def primary_language(self) -> Optional[str]:
+        """The language with the most bytes, or that of the shallowest
+        manifest when no source files were seen.
+        """
+        if not self.languages:
+            if not self.manifests:
+                return None
+            return MANIFESTS[self.manifests[0].rsplit("/", 1)[-1]]
+        return max(self.languages, key=lambda name: self.languages[name]["bytes"])
+
+    @property
+    def extension(self) -> Optional[str]:
+        primary = self.primary_language
+        if primary is None:
+            return None
+        return self.stats["extensions"].get(primary)
+
+    def to_dict(self) -> Dict[str, Any]:
+        total = sum(entry["bytes"] for entry in self.languages.values()) or 1
+        return {
+            "root": self.root,
+            "primary_language": self.primary_language,
+            "extension": self.extension,
+            "languages": [
+                {
+                    "language": name,
+                    "files": round(entry["files"]),
+                    "bytes": round(entry["bytes"]),
+                    "share": round(entry["bytes"] / total, 3),
+                }
+                for name, entry in sorted(
+                    self.languages.items(), key=lambda item: -item[1]["bytes"]
+                )
+            ],
+            "manifests": self.manifests,
+            "frameworks": self.frameworks,
+            "test_frameworks": self.test_frameworks,
+            "stats": {k: v for k, v in self.stats.items() if k != "extensions"},
+        }
+
+
+def _frameworks(root: Path, manifests: Sequence[str]) -> List[Dict[str, str]]:
+    found: Dict[str, Dict[str, str]] = {}
+    for path in manifests[:MAX_MANIFESTS]:
+        signatures = FRAMEWORKS.get(path.rsplit("/", 1)[-1])
+        if not signatures:
+            continue
+        text = _read(os.path.join(root, path)).lower()
+        for name, framework, kind in signatures:
+            pattern = r"(?<![\w@/.-])" + re.escape(name) + r"(?![\w/-])"
+            if framework not in found and re.search(pattern, text):
+                found[framework] = {"name": framework, "kind": kind, "evidence": path}
+    return list(found.values())
+
+
+def detect(
+    root: Path,
+    budget: float = DEFAULT_BUDGET,
+    max_files: int = DEFAULT_MAX_FILES,
+    use_gitignore: bool = True,
+) -> Detection:
+    """Walk ``root`` until done, ``budget`` seconds pass or ``max_files``
+    files are seen.
+    """
+    if not root.is_dir():
+        raise AnalysisError(f"Not a directory: {root}")
+    started = time.perf_counter()
+    deadline = started + budget
+    rng = random.Random(SEED)
+    base_rules: List[IgnoreRule] = []
+    if use_gitignore:
+        base_rules = parse_lfs(_read(os.path.join(root, ".gitattributes")))
+    pending: List[Tuple[str, str, Tuple[IgnoreRule, ...]]] = [
+        (str(root), "", tuple(base_rules))
+    ]
+    files: Counter = Counter()
+    sizes: Counter = Counter()
+    extensions: Dict[str, Counter] = {}
+    manifests: List[Tuple[int, str]] = []
+    tests: Dict[str, None] = {}
+    stats = Counter()
+    complete = True
+
+    while pending:
+        if time.perf_counter() > deadline or stats["files"] >= max_files:
+            complete = False
+            break
+        index = rng.randrange(len(pending))
+        pending[index], pending[-1] = pending[-1], pending[index]
+        directory, rel, rules = pending.pop()
+        try:
+            with os.scandir(directory) as scan:
+                entries = list(scan)
+        except OSError:
+            stats["unreadable"] += 1
+            continue
+        stats["directories"] += 1
+        prefix = rel + "/" if rel else ""
+        if use_gitignore:
+            for entry in entries:
+                if entry.name == ".gitignore" and entry.is_file():
+                    rules = rules + tuple(parse_ignore(_read(entry.path), rel))
+                    break
+
+        regular = []
+        for entry in entries:
+            path = prefix + entry.name
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+            if is_dir:
+                if entry.name.startswith(".") or entry.name in DENY_DIRS:
+                    stats["pruned"] += 1
+                elif rules and is_ignored(rules, path, True):
+                    stats["ignored"] += 1
+                else:
+                    pending.append((entry.path, path, rules))
+                continue
+            if rules and is_ignored(rules, path, False):
+                stats["ignored"] += 1
+                continue
+            if entry.name in MANIFESTS:
+                manifests.append((path.count("/"), path))
+            for pattern, framework in TEST_FILES:
+                if fnmatch.fnmatchcase(entry.name, pattern):
+                    tests[framework] = None
+            regular.append(entry)
+
+        stats["files"] += len(regular)
+        scale = 1.0
+        if len(regular) > DIR_SAMPLE:
+            scale = len(regular) / DIR_SAMPLE
+            regular = rng.sample(regular, DIR_SAMPLE)
+            stats["sampled_directories"] += 1
+        for entry in regular:
+            extension = os.path.splitext(entry.name)[1].lower()
+            language = LANGUAGES.get(extension)
+            if language is None:
+                continue
+            try:
+                size = entry.stat(follow_symlinks=False).st_size
+            except OSError:
+                continue
+            files[language] += scale
+            sizes[language] += size * scale
+            extensions.setdefault(language, Counter())[extension] += scale
+
+    manifests.sort()
+    manifest_paths = [path for _, path in manifests]
+    frameworks = _frameworks(root, manifest_paths)
+    test_frameworks = list(tests)
+    for framework in frameworks:
+        if framework["kind"] == "test" and framework["name"] not in tests:
+            test_frameworks.append(framework["name"])
+    for language, command in BUILTIN_TESTS.items():
+        if language in files and command not in test_frameworks:
+            test_frameworks.append(command)
+
+    detection = Detection(
+        root=str(root),
+        languages={
+            name: {"files": files[name], "bytes": sizes[name]} for name in files
+        },
+        manifests=manifest_paths,
+        frameworks=frameworks,
+        test_frameworks=test_frameworks,
+    )
+    detection.stats = {
+        "files": stats["files"],
+        "directories": stats["directories"],
+        "pruned": stats["pruned"],
+        "ignored": stats["ignored"],
+        "sampled_directories": stats["sampled_directories"],
+        "pending_directories": len(pending),
+        "complete": complete,
+        "seconds": round(time.perf_counter() - started, 3),
+        "extensions": {
+            name: counts.most_common(1)[0][0] for name, counts in extensions.items()
+        },
+    }
+    return detection
+
+
+def register(subparsers: Any) -> None:
+    parser = subparsers.add_parser(
+        "detect",
+        help="detect languages and frameworks within a time budget",
+        description="Walk a tree within a time budget, pruning ignored and "
+        "vendored directories, and print a language histogram, the manifests "
+        "found and framework and test-framework guesses.",
+    )
+    parser.add_argument(
+        "root", nargs="?", type=Path, default=Path("."), help="tree to scan"
+    )
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=DEFAULT_BUDGET,
+        metavar="SECONDS",
+        help=f"stop walking after this long (default: {DEFAULT_BUDGET})",
+    )
+    parser.add_argument(
+        "--max-files",
+        type=int,
+        default=DEFAULT_MAX_FILES,
+        help=f"stop walking after this many files (default: {DEFAULT_MAX_FILES})",
+    )
+    parser.add_argument(
+        "--no-gitignore",
+        action="store_true",
+        help="do not prune with .gitignore and .gitattributes",
+    )
+    parser.add_argument("--pretty", action="store_true", help="indent the JSON")
+    parser.set_defaults(func=run)
+
+
+def run(args: argparse.Namespace) -> int:
+    if args.budget <= 0:
+        raise AnalysisError("--budget must be positive")
+    detection = detect(args.root, args.budget, args.max_files, not args.no_gitignore)
+    if args.pretty:
+        print(json.dumps(detection.to_dict(), indent=2))
+    else:
+        print(json.dumps(detection.to_dict(), separators=(",", ":")))
+    return 0
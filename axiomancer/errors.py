@@ -0,0 +1,41 @@
+"""Exception types raised by the Axiomancer tooling."""
+
+
+class AxiomancerError(Exception):
+    """Base class for every error the command line reports to the user."""
+
+
+class TemplateError(AxiomancerError):
+    """A template or variables file could not be loaded or rendered."""
+
+
+class AnalysisError(AxiomancerError):
+    """A source tree could not be analyzed."""
+
+
+class ManifestError(AxiomancerError):
+    """A status manifest could not be loaded, queried or updated."""
+
+
+class ScheduleError(AxiomancerError):
+    """Components could not be scheduled or summoned."""
+
+
+class PromptError(AxiomancerError):
+    """The bootstrap prompt could not be assembled."""
+
+
+class EvidenceError(AxiomancerError):
+    """Evidence could not be recorded or retrieved."""
+
+
+class GateError(AxiomancerError):
+    """Quality gates could not be read or run."""
+
+
+class TraceError(AxiomancerError):
+    """Trace spans could not be recorded or read."""
+
+
+class PatchError(AxiomancerError):
+    """A document could not be patched section by section."""
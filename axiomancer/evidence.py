@@ -0,0 +1,397 @@
+"""Content-addressed store for test, coverage and quality-gate output.
+
+GRIMOIRE Phase 6 asks for the evidence behind every completion claim. Rather
+than pasting complete logs into plans, each command's output is kept as a
+compressed blob under ``.axiomancer_cache/evidence/objects/``, named by the
+hash of its content, and a structured summary (exit status, pass/fail
+counts, coverage, duration) is appended to ``evidence/index.json``. Plans
+and manifest entries cite ``evidence:<hash>``; the full output is printed
+again on demand with ``evidence show``.
+
+The store lives in the state directory, which git ignores, so references
+resolve only in the clone that recorded them; another clone or a CI run
+records its own evidence by running the commands again.
+
+Counts and coverage are read from the summary lines of common runners
+(pytest, unittest, Jest, Mocha, cargo, go and coverage.py, Istanbul,
+tarpaulin). Output they do not recognise is still stored, with the exit
+status as the only result.
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+import zlib
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, TextIO
+
+from . import state
+from .analyze import content_digest
+from .errors import EvidenceError
+
+EVIDENCE_DIR = "evidence"
+INDEX_FILE = "index.json"
+INDEX_VERSION = 1
+KINDS = ("test", "coverage", "quality", "performance", "other")
+REF_PREFIX = "evidence:"
+SHORT_ID = 12
+MIN_PREFIX = 4
+
+_COUNTS = {
+    "passed": re.compile(r"\b(\d+) (?:passed|passing)\b"),
+    "failed": re.compile(r"\b(\d+) (?:failed|failing)\b"),
+    "skipped": re.compile(r"\b(\d+) (?:skipped|ignored|pending)\b"),
+    "errors": re.compile(r"\b(\d+) errors?\b"),
+}
+_UNITTEST_RAN = re.compile(r"^Ran (\d+) tests? in ", re.M)
+_UNITTEST_FAILED = re.compile(r"^FAILED \((?P<details>[^)]*)\)", re.M)
+_GO_RESULT = re.compile(r"^\s*--- (PASS|FAIL|SKIP): ", re.M)
+_GO_PACKAGE_COVERAGE = re.compile(
+    r"^ok\s+\S+\s.*\bcoverage: (\d+(?:\.\d+)?)% of statements", re.M
+)
+_CARGO_RESULT = re.compile(
+    r"^test result: \w+\. (\d+) passed; (\d+) failed; (\d+) ignored", re.M
+)
+_COVERAGE = re.compile(
+    r"^TOTAL\s.*?(?P<total>\d+(?:\.\d+)?)%\s*$"
+    r"|^All files\s*\|\s*(?P<istanbul>\d+(?:\.\d+)?)"
+    r"|\bcoverage: (?P<go>\d+(?:\.\d+)?)% of statements"
+    r"|^(?P<tarpaulin>\d+(?:\.\d+)?)% coverage,"
+    r"|\bcoverage:? (?P<generic>\d+(?:\.\d+)?)%",
+    re.M | re.I,
+)
+
+
+def evidence_dir(root: Path) -> Path:
+    return root / state.STATE_DIR_NAME / EVIDENCE_DIR
+
+
+def summarize(output: str) -> Dict[str, Any]:
+    """Pass/fail counts and coverage found in a command's output.
+
+    The last occurrence of each figure wins, since runners print their
+    totals at the end. cargo prints one result line per test binary and
+    ``go test`` one line per package, so those are added up (go coverage is
+    the mean over the packages).
+    """
+    summary: Dict[str, Any] = {}
+    cargo = _CARGO_RESULT.findall(output)
+    if cargo:
+        for index, name in enumerate(("passed", "failed", "skipped")):
+            summary[name] = sum(int(counts[index]) for counts in cargo)
+    for name, pattern in _COUNTS.items():
+        if name in summary:
+            continue
+        matches = pattern.findall(output)
+        if matches:
+            summary[name] = int(matches[-1])
+    ran = _UNITTEST_RAN.findall(output)
+    if ran and "passed" not in summary:
+        failures = 0
+        failed = _UNITTEST_FAILED.findall(output)
+        if failed:
+            failures = sum(int(n) for n in re.findall(r"=(\d+)", failed[-1]))
+        summary["passed"] = int(ran[-1]) - failures
+        summary["failed"] = failures
+    if not summary:
+        results = _GO_RESULT.findall(output)
+        if results:
+            summary["passed"] = results.count("PASS")
+            summary["failed"] = results.count("FAIL")
+            summary["skipped"] = results.count("SKIP")
+    packages = _GO_PACKAGE_COVERAGE.findall(output)
+    coverage = list(_COVERAGE.finditer(output))
+    if packages:
+        summary["coverage"] = round(sum(map(float, packages)) / len(packages), 1)
+    elif coverage:
+        value = next(v for v in coverage[-1].groupdict().values() if v is not None)
+        summary["coverage"] = float(value)
+    return summary
+
+
+def store_blob(root: Path, data: bytes) -> str:
+    """Store ``data`` compressed under its content hash; returns the hash."""
+    digest = content_digest(data)
+    path = evidence_dir(root) / "objects" / digest[:2] / digest[2:]
+    if not path.exists():
+        state.state_dir(root)
+        state.write_bytes(path, zlib.compress(data, 9))
+    return digest
+
+
+def load_index(root: Path) -> List[Dict[str, Any]]:
+    """Every evidence record of ``root``, oldest first."""
+    index = state.read_json(evidence_dir(root) / INDEX_FILE)
+    if not isinstance(index, dict) or index.get("version") != INDEX_VERSION:
+        return []
+    return index["records"]
+
+
+def record(
+    root: Path,
+    output: bytes,
+    command: str,
+    exit_status: int = 0,
+    kind: str = "test",
+    component: Optional[str] = None,
+    duration: Optional[float] = None,
+) -> Dict[str, Any]:
+    """Store ``output`` and append its summary to the index."""
+    if kind not in KINDS:
+        raise EvidenceError(f"Unknown evidence kind: {kind}")
+    digest = store_blob(root, output)
+    entry: Dict[str, Any] = {
+        "id": digest,
+        "component": component,
+        "kind": kind,
+        "command": command,
+        "exit_status": exit_status,
+        "duration": None if duration is None else round(duration, 3),
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "bytes": len(output),
+        **summarize(output.decode("utf-8", "replace")),
+    }
+    directory = evidence_dir(root)
+    with state.file_lock(directory / "index.lock"):
+        records = load_index(root)
+        records.append(entry)
+        state.write_json(
+            directory / INDEX_FILE, {"version": INDEX_VERSION, "records": records}
+        )
+    return entry
+
+
+def run_command(
+    root: Path,
+    argv: List[str],
+    kind: str = "test",
+    component: Optional[str] = None,
+    echo: Optional[TextIO] = None,
+) -> Dict[str, Any]:
+    """Run a command in ``root``, echo its output and record it as evidence.
+
+    A single argument is run by the shell, so commands copied from the
+    project docs work unchanged. The output is echoed to ``echo`` (default:
+    stdout).
+    """
+    shell = len(argv) == 1
+    command = argv[0] if shell else subprocess.list2cmdline(argv)
+    started = time.perf_counter()
+    try:
+        result = subprocess.run(
+            argv[0] if shell else argv,
+            cwd=root,
+            shell=shell,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            check=False,
+        )
+    except OSError as exc:
+        raise EvidenceError(f"Cannot run {command}: {exc.strerror}") from None
+    duration = time.perf_counter() - started
+    echo = echo or sys.stdout
+    echo.buffer.write(result.stdout)
+    echo.flush()
+    return record(
+        root, result.stdout, command, result.returncode, kind, component, duration
+    )
+
+
+def resolve(root: Path, reference: str) -> str:
+    """Full hash of the blob an ``evidence:<prefix>`` reference names."""
+    prefix = (
+        reference[len(REF_PREFIX) :] if reference.startswith(REF_PREFIX) else reference
+    )
+    prefix = prefix.lower()
+    if len(prefix) < MIN_PREFIX or not re.fullmatch(r"[0-9a-f]+", prefix):
+        raise EvidenceError(f"Not an evidence reference: {reference}")
+    objects = evidence_dir(root) / "objects" / prefix[:2]
+    try:
+        names = os.listdir(objects)
+    except OSError:
+        names = []
+    matches = [prefix[:2] + name for name in names if name.startswith(prefix[2:])]
+    if not matches:
+        raise EvidenceError(
+            f"No evidence matches {reference} in this clone; the store in "
+            f"{state.STATE_DIR_NAME}/{EVIDENCE_DIR}/ is not committed, so run the "
+            "command again with 'evidence run' to record it here"
+        )
+    if len(matches) > 1:
+        raise EvidenceError(f"Evidence reference {reference} is ambiguous")
+    return matches[0]
+
+
+def read_blob(root: Path, reference: str) -> bytes:
+    """The full output stored under ``reference``."""
+    digest = resolve(root, reference)
+    path = evidence_dir(root) / "objects" / digest[:2] / digest[2:]
+    try:
+        return zlib.decompress(path.read_bytes())
+    except (OSError, zlib.error) as exc:
+        raise EvidenceError(f"Cannot read evidence {digest}: {exc}") from None
+
+
+def describe(entry: Dict[str, Any]) -> str:
+    """One-line result of a record, e.g. ``✅ 120 passed, 2 skipped``."""
+    mark = "✅" if entry["exit_status"] == 0 else "❌"
+    parts = [
+        f"{entry[name]} {name}"
+        for name in ("passed", "failed", "skipped", "errors")
+        if entry.get(name)
+    ]
+    if entry.get("coverage") is not None:
+        parts.append(f"{entry['coverage']:g}% coverage")
+    if not parts:
+        parts.append(f"exit status {entry['exit_status']}")
+    return f"{mark} {', '.join(parts)}"
+
+
+def markdown_table(records: List[Dict[str, Any]]) -> str:
+    """Evidence records as a table to paste into a plan."""
+    lines = [
+        "| Kind | Command | Result | Duration | Evidence |",
+        "| --- | --- | --- | --- | --- |",
+    ]
+    for entry in records:
+        duration = "" if entry["duration"] is None else f"{entry['duration']:.1f}s"
+        command = entry["command"].replace("|", "\\|")
+        lines.append(
+            f"| {entry['kind']} | `{command}` | {describe(entry)} | {duration} "
+            f"| `{REF_PREFIX}{entry['id'][:SHORT_ID]}` |"
+        )
+    return "\n".join(lines) + "\n"
+
+
+def latest(
+    records: List[Dict[str, Any]], component: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """The newest record per kind and command, optionally for one component."""
+    newest: Dict[Any, Dict[str, Any]] = {}
+    for entry in records:
+        if component is None or entry["component"] == component:
+            newest[entry["kind"], entry["command"]] = entry
+    return list(newest.values())
+
+
+def register(subparsers: Any) -> None:
+    parser = subparsers.add_parser(
+        "evidence",
+        help="record and retrieve command output as evidence",
+        description="Keep test, coverage and quality-gate output as "
+        "compressed, content-addressed blobs with a summary index, so plans "
+        "cite evidence:<hash> instead of pasting logs.",
+    )
+    parser.add_argument("--root", type=Path, default=Path("."), help="project root")
+    actions = parser.add_subparsers(dest="action", metavar="ACTION", required=True)
+
+    def recording(action: Any) -> None:
+        action.add_argument(
+            "--kind", choices=KINDS, default="test", help="(default: test)"
+        )
+        action.add_argument(
+            "--component",
+            default=os.environ.get("AXIOMANCER_COMPONENT"),
+            help="component id (default: $AXIOMANCER_COMPONENT)",
+        )
+        action.add_argument("--json", action="store_true", help="print JSON results")
+
+    run_parser = actions.add_parser("run", help="run a command and record its output")
+    recording(run_parser)
+    run_parser.add_argument(
+        "argv",
+        nargs=argparse.REMAINDER,
+        metavar="-- COMMAND",
+        help="command to run; a single argument is run by the shell",
+    )
+    add = actions.add_parser("add", help="record output that was already captured")
+    recording(add)
+    add.add_argument("--command", required=True, help="the command that was run")
+    add.add_argument("--exit-status", type=int, default=0)
+    add.add_argument("--duration", type=float, help="seconds the command took")
+    add.add_argument(
+        "file", type=Path, nargs="?", help="captured output (default: stdin)"
+    )
+
+    show = actions.add_parser("show", help="print the full output of a reference")
+    show.add_argument("reference", help="evidence:<hash> or a hash prefix")
+
+    listing = actions.add_parser("list", help="summarise the recorded evidence")
+    listing.add_argument("--component", help="only this component")
+    listing.add_argument(
+        "--all", action="store_true", help="every record, not just the newest"
+    )
+    output = listing.add_mutually_exclusive_group()
+    output.add_argument("--json", action="store_true", help="print JSON results")
+    output.add_argument(
+        "--markdown", action="store_true", help="print a table for a plan"
+    )
+    parser.set_defaults(func=run)
+
+
+def run(args: argparse.Namespace) -> int:
+    root = args.root
+    if args.action == "show":
+        sys.stdout.buffer.write(read_blob(root, args.reference))
+        sys.stdout.flush()
+        return 0
+
+    if args.action == "list":
+        records = load_index(root)
+        if args.all:
+            records = [
+                r
+                for r in records
+                if args.component is None or r["component"] == args.component
+            ]
+        else:
+            records = latest(records, args.component)
+        if args.json:
+            print(json.dumps(records, indent=2))
+        elif args.markdown:
+            print(markdown_table(records), end="")
+        else:
+            for entry in records:
+                print(
+                    f"{entry['id'][:SHORT_ID]}  {entry['kind']:<11} "
+                    f"{describe(entry)}  {entry['command']}"
+                )
+        return 0
+
+    if args.action == "run":
+        argv = args.argv[1:] if args.argv[:1] == ["--"] else args.argv
+        if not argv:
+            raise EvidenceError("No command to run")
+        # Keep stdout parseable when the record is printed as JSON
+        echo = sys.stderr if args.json else sys.stdout
+        entry = run_command(root, argv, args.kind, args.component, echo)
+        status = entry["exit_status"]
+    else:
+        try:
+            if args.file is None:
+                output = sys.stdin.buffer.read()
+            else:
+                output = args.file.read_bytes()
+        except OSError as exc:
+            raise EvidenceError(f"Cannot read {args.file}: {exc.strerror}") from None
+        entry = record(
+            root,
+            output,
+            args.command,
+            args.exit_status,
+            args.kind,
+            args.component,
+            args.duration,
+        )
+        status = 0
+    if args.json:
+        print(json.dumps(entry, indent=2))
+    else:
+        print(f"{REF_PREFIX}{entry['id'][:SHORT_ID]}  {describe(entry)}")
+    return status
@@ -0,0 +1,509 @@
+"""Cached, parallel runner for the Three Rings quality gates.
+
+Gate commands are read from the generated ``CONTRIBUTING.md``: the unit and
+integration test commands of the evidence section form the inner and middle
+rings, and the quality gate, coverage and quality commands form the outer
+ring. Only shell code blocks are read, and ``a; b`` on one line is two
+gates. Rings run in order and stop at the first failing ring; the gates of a
+ring run in parallel.
+
+A gate's verdict is cached in ``.axiomancer_cache/gates.json`` under a key
+made of its command, the version of its tool and the content of its input
+files. Formatters, linters and type checkers read known files, picked by
+suffix; test runners and any other commands may read anything, so every
+project file that git does not ignore is an input. A passing gate whose
+key is unchanged is not run again; failures are never cached, since they
+may come from the environment rather than the inputs. Output is kept in
+the evidence store either way.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import shlex
+import shutil
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterator, List, Optional, Tuple
+
+from . import evidence, state
+from .analyze import SKIP_DIRS, content_digest
+from .detect import IgnoreRule, is_ignored, parse_ignore
+from .errors import GateError
+from .render import PLACEHOLDER_PATTERN
+from .sections import split_sections, update_fence
+
+CACHE_FILE = "gates.json"
+CACHE_VERSION = 2  # 1 also cached failing verdicts
+DEFAULT_SOURCE = Path("CONTRIBUTING.md")
+RINGS = ("inner", "middle", "outer")
+OUTPUT_TAIL = 20
+
+# What the verdict of a formatter or linter depends on: file suffixes and
+# file names. Test runners (pytest, jest, cargo test, ...) read fixtures and
+# data of any kind, so they are deliberately absent and hash every file.
+_PYTHON = (
+    frozenset({".py", ".pyi", ".toml", ".cfg", ".ini"}),
+    frozenset({".flake8", ".pylintrc", "requirements.txt"}),
+)
+_JAVASCRIPT = (
+    frozenset(
+        {".js", ".jsx", ".mjs", ".cjs", ".ts", ".tsx", ".json", ".vue", ".svelte"}
+    ),
+    frozenset({".eslintrc", ".prettierrc", "yarn.lock"}),
+)
+_RUST = (frozenset({".rs", ".toml"}), frozenset({"Cargo.lock"}))
+_GO = (frozenset({".go", ".mod", ".sum"}), frozenset())
+TOOL_INPUTS: Dict[str, Tuple[FrozenSet[str], FrozenSet[str]]] = {
+    **dict.fromkeys(
+        (
+            "black",
+            "isort",
+            "flake8",
+            "ruff",
+            "mypy",
+            "pylint",
+            "bandit",
+        ),
+        _PYTHON,
+    ),
+    **dict.fromkeys(
+        ("eslint", "prettier", "tsc"),
+        _JAVASCRIPT,
+    ),
+    "rustfmt": _RUST,
+    **dict.fromkeys(("gofmt", "golangci-lint"), _GO),
+}
+
+_ENV_ASSIGNMENT = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*=")
+_SHELL_FENCES = frozenset({"bash", "sh", "shell", "zsh"})
+
+
+@dataclass
+class Gate:
+    """One command of one ring."""
+
+    ring: str
+    command: str
+
+
+@dataclass
+class GateResult:
+    """The verdict of a gate, fresh or cached."""
+
+    ring: str
+    command: str
+    passed: bool
+    returncode: int
+    seconds: float
+    cached: bool
+    evidence: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["seconds"] = round(self.seconds, 3)
+        return data
+
+
+def split_commands(line: str) -> List[str]:
+    """Split a shell line on ``;`` outside quotes."""
+    commands, current, quote = [], "", ""
+    for char in line:
+        if quote:
+            quote = "" if char == quote else quote
+        elif char in "'\"":
+            quote = char
+        elif char == ";":
+            commands.append(current)
+            current = ""
+            continue
+        current += char
+    commands.append(current)
+    return [command.strip() for command in commands if command.strip()]
+
+
+def _ring_for(heading: str, comment: str) -> Optional[str]:
+    heading, comment = heading.lower(), comment.lower()
+    if "unit test" in comment:
+        return "inner"
+    if "integration" in comment:
+        return "middle"
+    if "coverage" in comment or "quality" in comment:
+        return "outer"
+    for ring in RINGS:
+        if f"{ring} ring" in heading:
+            return ring
+    return None
+
+
+def parse_gates(text: str) -> List[Gate]:
+    """The gates defined in a generated ``CONTRIBUTING.md``, in ring order.
+
+    Commands still containing ``{{placeholders}}`` are skipped, and a
+    command listed twice belongs to the earlier ring.
+    """
+    gates: Dict[str, Gate] = {}
+    for section in split_sections(text):
+        fence: Optional[str] = None
+        language: Optional[str] = None
+        comment = ""
+        lines = text[section.start : section.end].splitlines()
+        for line in lines[1:] if section.level else lines:
+            stripped = line.strip()
+            opened, fence = fence, update_fence(fence, line)
+            if fence != opened:
+                language = stripped[len(fence) :].strip().lower() if fence else None
+                comment = ""
+                continue
+            if language not in _SHELL_FENCES or not stripped:
+                continue
+            if stripped.startswith("#"):
+                comment = stripped
+                continue
+            ring = _ring_for(section.title, comment)
+            if ring is None or PLACEHOLDER_PATTERN.search(stripped):
+                continue
+            for command in split_commands(stripped):
+                current = gates.get(command)
+                if current is None or RINGS.index(ring) < RINGS.index(current.ring):
+                    gates[command] = Gate(ring, command)
+    return sorted(gates.values(), key=lambda gate: RINGS.index(gate.ring))
+
+
+def tool_of(command: str) -> Tuple[str, List[str]]:
+    """The tool a command runs and the argv that prints its version."""
+    try:
+        words = shlex.split(command)
+    except ValueError:
+        words = command.split()
+    while words and _ENV_ASSIGNMENT.match(words[0]):
+        words = words[1:]
+    if not words:
+        return "", []
+    executable = words[0]
+    tool = os.path.basename(executable)
+    if tool.startswith("python") and words[1:2] == ["-m"] and len(words) > 2:
+        return words[2], [executable, "-m", words[2], "--version"]
+    return tool, [executable, "--version"]
+
+
+def iter_project_files(root: Path) -> Iterator[str]:
+    """Root-relative POSIX paths of every file outside skipped directories.
+
+    Files matched by a ``.gitignore`` are left out: they are build and test
+    output, which would otherwise change the key of the gate that wrote them.
+    """
+    rules: Dict[str, Tuple[IgnoreRule, ...]] = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        rel_dir = os.path.relpath(dirpath, root)
+        rel = "" if rel_dir == "." else rel_dir.replace(os.sep, "/")
+        prefix = rel + "/" if rel else ""
+        current = rules.get(rel, ())
+        if ".gitignore" in filenames:
+            try:
+                text = (Path(dirpath) / ".gitignore").read_text(encoding="utf-8")
+            except (OSError, UnicodeDecodeError):
+                text = ""
+            current = current + tuple(parse_ignore(text, rel))
+        dirnames[:] = sorted(
+            d
+            for d in dirnames
+            if not d.startswith(".")
+            and d not in SKIP_DIRS
+            and not is_ignored(current, prefix + d, True)
+        )
+        for name in dirnames:
+            rules[prefix + name] = current
+        for name in sorted(filenames):
+            if not is_ignored(current, prefix + name, False):
+                yield prefix + name
+
+
+class GateRunner:
+    """Runs gates against the cache of one project root."""
+
+    def __init__(self, root: Path, jobs: Optional[int] = None, force: bool = False):
+        self.root = root
+        self.jobs = jobs or os.cpu_count() or 1
+        self.force = force
+        cache = state.read_json(root / state.STATE_DIR_NAME / CACHE_FILE)
+        if not isinstance(cache, dict) or cache.get("version") != CACHE_VERSION:
+            cache = {}
+        self._old_files: Dict[str, Any] = cache.get("files", {})
+        self._old_tools: Dict[str, Any] = cache.get("tools", {})
+        self.results: Dict[str, Any] = cache.get("results", {})
+        self.files: Dict[str, Any] = {}
+        self.tools: Dict[str, Any] = {}
+
+    def _hash_files(self) -> None:
+        for path in iter_project_files(self.root):
+            try:
+                stat = os.stat(self.root / path)
+            except OSError:
+                continue
+            record = self._old_files.get(path)
+            if (
+                record is None
+                or record["size"] != stat.st_size
+                or record["mtime_ns"] != stat.st_mtime_ns
+            ):
+                try:
+                    data = (self.root / path).read_bytes()
+                except OSError:
+                    continue
+                record = {
+                    "size": stat.st_size,
+                    "mtime_ns": stat.st_mtime_ns,
+                    "digest": content_digest(data),
+                }
+            self.files[path] = record
+
+    def _tool_version(self, argv: List[str]) -> str:
+        """``--version`` output of a tool, re-run only when its executable
+        changes.
+        """
+        executable = shutil.which(argv[0], path=os.environ.get("PATH"))
+        if executable is None:
+            return "missing"
+        key = " ".join([executable] + argv[1:])
+        if key in self.tools:
+            return self.tools[key]["version"]
+        stat = os.stat(executable)
+        record = self._old_tools.get(key)
+        if (
+            record is None
+            or record["size"] != stat.st_size
+            or record["mtime_ns"] != stat.st_mtime_ns
+        ):
+            try:
+                result = subprocess.run(
+                    argv,
+                    cwd=self.root,
+                    stdin=subprocess.DEVNULL,
+                    capture_output=True,
+                    text=True,
+                    check=False,
+                    timeout=60,
+                )
+                version = (result.stdout + result.stderr).strip()
+            except (OSError, subprocess.TimeoutExpired):
+                version = "unknown"
+            record = {
+                "size": stat.st_size,
+                "mtime_ns": stat.st_mtime_ns,
+                "version": version,
+            }
+        self.tools[key] = record
+        return record["version"]
+
+    def key(self, gate: Gate) -> str:
+        """Hash of everything the verdict of ``gate`` depends on."""
+        tool, version_argv = tool_of(gate.command)
+        suffixes, names = TOOL_INPUTS.get(tool, (None, frozenset()))
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(gate.command.encode("utf-8") + b"\0")
+        version = self._tool_version(version_argv) if version_argv else ""
+        digest.update(version.encode("utf-8") + b"\0")
+        for path, record in self.files.items():
+            if suffixes is not None:
+                name = path.rsplit("/", 1)[-1]
+                if os.path.splitext(name)[1] not in suffixes and name not in names:
+                    continue
+            digest.update(f"{path}\0{record['digest']}\0".encode("utf-8"))
+        return digest.hexdigest()
+
+    def _run(self, gate: Gate, key: str) -> GateResult:
+        started = time.perf_counter()
+        result = subprocess.run(
+            gate.command,
+            shell=True,
+            cwd=self.root,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            check=False,
+        )
+        seconds = time.perf_counter() - started
+        blob = evidence.store_blob(self.root, result.stdout)
+        if result.returncode == 0:
+            self.results[gate.command] = {
+                "key": key,
+                "returncode": result.returncode,
+                "seconds": round(seconds, 3),
+                "evidence": blob,
+            }
+        else:
+            self.results.pop(gate.command, None)
+        return GateResult(
+            gate.ring,
+            gate.command,
+            result.returncode == 0,
+            result.returncode,
+            seconds,
+            False,
+            blob,
+        )
+
+    def run(
+        self, gates: List[Gate], keep_going: bool = False
+    ) -> Tuple[List[GateResult], Dict[str, Dict[str, Any]]]:
+        """Run ``gates`` ring by ring; returns the results and a per-ring
+        timing breakdown.
+        """
+        self._hash_files()
+        results: List[GateResult] = []
+        timings: Dict[str, Dict[str, Any]] = {}
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            for ring in RINGS:
+                members = [gate for gate in gates if gate.ring == ring]
+                if not members:
+                    continue
+                started = time.perf_counter()
+                keys = [self.key(gate) for gate in members]
+                pending = []
+                ring_results: List[Optional[GateResult]] = []
+                for gate, key in zip(members, keys):
+                    cached = self.results.get(gate.command)
+                    if not self.force and cached is not None and cached["key"] == key:
+                        ring_results.append(
+                            GateResult(
+                                ring,
+                                gate.command,
+                                cached["returncode"] == 0,
+                                cached["returncode"],
+                                cached["seconds"],
+                                True,
+                                cached["evidence"],
+                            )
+                        )
+                    else:
+                        pending.append(
+                            (len(ring_results), pool.submit(self._run, gate, key))
+                        )
+                        ring_results.append(None)
+                for position, future in pending:
+                    ring_results[position] = future.result()
+                done = [result for result in ring_results if result is not None]
+                results.extend(done)
+                timings[ring] = {
+                    "gates": len(done),
+                    "ran": len(pending),
+                    "cached": len(done) - len(pending),
+                    "passed": all(result.passed for result in done),
+                    "wall_seconds": round(time.perf_counter() - started, 3),
+                    "gate_seconds": round(
+                        sum(r.seconds for r in done if not r.cached), 3
+                    ),
+                    "saved_seconds": round(sum(r.seconds for r in done if r.cached), 3),
+                }
+                if not timings[ring]["passed"] and not keep_going:
+                    break
+        self._save()
+        return results, timings
+
+    def _save(self) -> None:
+        state.state_dir(self.root)
+        path = self.root / state.STATE_DIR_NAME / CACHE_FILE
+        with state.file_lock(path.with_suffix(".lock")):
+            state.write_json(
+                path,
+                {
+                    "version": CACHE_VERSION,
+                    "files": self.files,
+                    "tools": {**self._old_tools, **self.tools},
+                    "results": self.results,
+                },
+            )
+
+
+def _output_tail(root: Path, blob: str) -> str:
+    text = evidence.read_blob(root, blob).decode("utf-8", "replace")
+    return "\n".join(text.rstrip().splitlines()[-OUTPUT_TAIL:])
+
+
+def register(subparsers: Any) -> None:
+    parser = subparsers.add_parser(
+        "gates",
+        help="run the Three Rings quality gates, cached and in parallel",
+        description="Run the gate commands from CONTRIBUTING.md ring by ring, "
+        "in parallel within a ring, skipping gates whose command, tool "
+        "version and input files are unchanged since their last run.",
+    )
+    parser.add_argument("--root", type=Path, default=Path("."), help="project root")
+    parser.add_argument(
+        "--source",
+        type=Path,
+        help=f"gate definitions (default: ROOT/{DEFAULT_SOURCE})",
+    )
+    parser.add_argument(
+        "--ring", choices=RINGS, action="append", help="only these rings"
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, help="gates run at once (default: CPU count)"
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="run every gate, ignoring the cache"
+    )
+    parser.add_argument(
+        "--keep-going",
+        action="store_true",
+        help="run later rings even if an earlier one fails",
+    )
+    parser.add_argument(
+        "--list", action="store_true", help="print the gates without running them"
+    )
+    parser.add_argument("--json", action="store_true", help="print JSON results")
+    parser.set_defaults(func=run)
+
+
+def run(args: argparse.Namespace) -> int:
+    source = args.source or args.root / DEFAULT_SOURCE
+    try:
+        text = source.read_text(encoding="utf-8")
+    except OSError as exc:
+        raise GateError(f"Cannot read {source}: {exc.strerror}") from None
+    gates = [g for g in parse_gates(text) if not args.ring or g.ring in args.ring]
+    if not gates:
+        raise GateError(f"No gate commands found in {source}")
+    if args.list:
+        if args.json:
+            print(json.dumps([asdict(gate) for gate in gates], indent=2))
+        else:
+            for gate in gates:
+                print(f"{gate.ring:<7} {gate.command}")
+        return 0
+
+    runner = GateRunner(args.root, args.jobs, args.force)
+    results, timings = runner.run(gates, args.keep_going)
+    passed = all(result.passed for result in results) and len(results) == len(gates)
+    if args.json:
+        report = {
+            "passed": passed,
+            "gates": [result.to_dict() for result in results],
+            "rings": timings,
+        }
+        print(json.dumps(report, indent=2))
+        return 0 if passed else 1
+
+    for result in results:
+        mark = "✅" if result.passed else "❌"
+        note = "cached" if result.cached else f"{result.seconds:.2f}s"
+        print(f"{mark} {result.ring:<7} {note:>8}  {result.command}")
+        if not result.passed:
+            print(_output_tail(args.root, result.evidence))
+            print(f"   full output: {evidence.REF_PREFIX}{result.evidence}")
+    print("\nRing     gates  ran  cached     wall   saved")
+    for ring, timing in timings.items():
+        print(
+            f"{ring:<7} {timing['gates']:>6} {timing['ran']:>4} {timing['cached']:>7} "
+            f"{timing['wall_seconds']:>7.2f}s {timing['saved_seconds']:>6.2f}s"
+        )
+    skipped = len(gates) - len(results)
+    if skipped:
+        print(f"⏭️  {skipped} gates in later rings not run")
+    return 0 if passed else 1
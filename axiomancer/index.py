@@ -0,0 +1,418 @@
+"""Persisted analysis index for incremental re-analysis.
+
+The first run scans the tree like ``analyze`` and stores in
+``.axiomancer_cache/index.json`` every file's content hash and raw imports,
+the scored clusters and, for each file, the ``STATUS_MANIFEST.yaml``
+components whose ``location`` contains it. Later runs ask git which files
+changed since the indexed commit (comparing size and mtime outside git),
+together with the files that were uncommitted when the index was saved, since
+git no longer reports those once they are reverted. They re-parse only those,
+rebuild the graph from the stored imports and report which clusters,
+components and document sections are stale.
+"""
+
+import argparse
+import json
+import os
+import posixpath
+import subprocess
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+from . import state
+from .analyze import (
+    MANIFEST_FILES,
+    FileImports,
+    ImportGraph,
+    build_graph,
+    cluster_key,
+    content_digest,
+    find_clusters,
+    is_source_path,
+    iter_source_files,
+    parse_files,
+    summarize,
+)
+from .errors import AnalysisError
+from .manifest import Manifest
+from .patch import anchored_sections
+from .render import GENERATED_DOCUMENTS
+
+INDEX_FILE = "index.json"
+INDEX_VERSION = 2
+MANIFEST_NAME = "STATUS_MANIFEST.yaml"
+
+# Documents whose sections describe components and can go stale.
+DOCUMENTS = tuple(name for name in GENERATED_DOCUMENTS if name.endswith(".md"))
+
+
+@dataclass
+class IndexUpdate:
+    """What one refresh of the index found."""
+
+    full: bool
+    parsed: int
+    changed: List[str]
+    deleted: List[str]
+    stale_clusters: List[str]
+    stale_components: List[str]
+    stale_sections: List[Dict[str, Any]]
+    seconds: float
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["seconds"] = round(self.seconds, 3)
+        return data
+
+
+def load_index(root: Path) -> Optional[Dict[str, Any]]:
+    """Return the stored index of ``root``, or None if absent or outdated."""
+    index = state.read_json(root / state.STATE_DIR_NAME / INDEX_FILE)
+    if not isinstance(index, dict) or index.get("version") != INDEX_VERSION:
+        return None
+    return index
+
+
+def _git(root: Path, *args: str) -> Optional[str]:
+    try:
+        result = subprocess.run(
+            ["git", "-C", str(root), *args],
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+    except OSError:
+        return None
+    return result.stdout if result.returncode == 0 else None
+
+
+def git_head(root: Path) -> Optional[str]:
+    """Commit checked out in ``root``, or None outside a git work tree."""
+    output = _git(root, "rev-parse", "--verify", "--quiet", "HEAD")
+    return output.strip() if output else None
+
+
+def git_changed_paths(root: Path, commit: str) -> Optional[Set[str]]:
+    """Paths under ``root`` changed since ``commit``, including uncommitted
+    and untracked files, or None if git cannot tell (e.g. after a rebase).
+    """
+    diff = _git(root, "diff", "-z", "--name-only", "--no-renames", "--relative", commit)
+    untracked = _git(root, "ls-files", "-z", "--others", "--exclude-standard")
+    if diff is None or untracked is None:
+        return None
+    return {path for path in (diff + untracked).split("\0") if path}
+
+
+def _stat_changed_paths(root: Path, files: Mapping[str, Dict[str, Any]]) -> Set[str]:
+    changed = set()
+    for path in iter_source_files(root):
+        record = files.get(path)
+        try:
+            stat = os.stat(root / path)
+        except OSError:
+            continue
+        if (
+            record is None
+            or record["size"] != stat.st_size
+            or record["mtime_ns"] != stat.st_mtime_ns
+        ):
+            changed.add(path)
+    return changed
+
+
+def load_components(path: Path) -> Dict[str, Dict[str, Any]]:
+    """Components of a status manifest keyed by id, with name and location."""
+    return {
+        component.id: {"name": component.name, "location": component.location}
+        for component in Manifest.load(path).components.values()
+    }
+
+
+def _locations(value: Any) -> List[str]:
+    values = value if isinstance(value, list) else [value]
+    locations = []
+    for location in values:
+        if not isinstance(location, str) or not location.strip():
+            continue
+        if "{{" in location:
+            continue
+        locations.append(posixpath.normpath(location.strip()))
+    return locations
+
+
+def component_owners(
+    paths: Iterable[str], components: Mapping[str, Dict[str, Any]]
+) -> Dict[str, List[str]]:
+    """Map each path to the components whose location is it or an ancestor."""
+    by_location: Dict[str, List[str]] = {}
+    for component_id, entry in components.items():
+        for location in _locations(entry.get("location")):
+            by_location.setdefault(location, []).append(component_id)
+
+    owners = {}
+    for path in paths:
+        parts = path.split("/")
+        candidates = ["."] + ["/".join(parts[:end]) for end in range(1, len(parts) + 1)]
+        found = [cid for c in candidates for cid in by_location.get(c, ())]
+        if found:
+            owners[path] = sorted(set(found))
+    return owners
+
+
+def stale_sections(
+    root: Path,
+    documents: Sequence[str],
+    components: Mapping[str, Dict[str, Any]],
+    stale: Iterable[str],
+) -> List[Dict[str, Any]]:
+    """Sections of ``documents`` that mention a stale component by id, name
+    or location.
+    """
+    needles = {
+        component_id: [
+            needle
+            for needle in [component_id, components[component_id]["name"]]
+            + _locations(components[component_id]["location"])
+            if needle and needle != "."
+        ]
+        for component_id in stale
+        if component_id in components
+    }
+    found = []
+    for document in documents:
+        try:
+            text = (root / document).read_text(encoding="utf-8")
+        except OSError:
+            continue
+        for section in anchored_sections(text):
+            # Anchor lines are left out: anchors are often component ids
+            body = section.title + "\n" + text[section.body : section.end]
+            hits = sorted(
+                component_id
+                for component_id, words in needles.items()
+                if any(word in body for word in words)
+            )
+            if hits:
+                found.append(
+                    {
+                        "document": document,
+                        "heading": section.title,
+                        "anchor": section.anchor,
+                        "line": section.line,
+                        "components": hits,
+                    }
+                )
+    return found
+
+
+def _record(root: Path, path: str, parsed: Optional[FileImports]) -> Optional[Dict]:
+    """Index record for ``path``; manifests are hashed here, sources by parsing."""
+    try:
+        stat = os.stat(root / path)
+        digest = parsed.digest if parsed else content_digest((root / path).read_bytes())
+    except OSError:
+        return None
+    return {
+        "hash": digest,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "language": parsed.language if parsed else None,
+        "imports": list(parsed.imports) if parsed else [],
+    }
+
+
+def _module_of(path: str) -> str:
+    return (posixpath.dirname(path) or ".") if path.endswith(".go") else path
+
+
+def graph_from_index(root: Path, index: Mapping[str, Any]) -> ImportGraph:
+    """Rebuild the import graph from stored imports without reading sources."""
+    files = index["files"]
+    sources = [
+        FileImports(path, record["language"], tuple(record["imports"]), record["hash"])
+        for path, record in sorted(files.items())
+        if record["language"]
+    ]
+    return build_graph(root, sorted(files), sources)
+
+
+def update_index(
+    root: Path,
+    manifest: Optional[Path] = None,
+    documents: Sequence[str] = DOCUMENTS,
+    depth: int = 1,
+    workers: Optional[int] = None,
+    full: bool = False,
+) -> Tuple[Dict[str, Any], ImportGraph, IndexUpdate]:
+    """Bring the index of ``root`` up to date and save it.
+
+    A full scan happens when there is no usable index, when ``depth``
+    differs from the indexed one or when ``full`` is set.
+    """
+    started = time.perf_counter()
+    if not root.is_dir():
+        raise AnalysisError(f"Not a directory: {root}")
+    if depth < 1:
+        raise AnalysisError("--depth must be at least 1")
+
+    previous = None if full else load_index(root)
+    if previous is not None and previous.get("depth") != depth:
+        previous = None
+    files: Dict[str, Dict[str, Any]] = dict(previous["files"]) if previous else {}
+    head = git_head(root)
+
+    reported: Optional[Set[str]] = None
+    if previous is None:
+        candidates: Optional[Set[str]] = set(iter_source_files(root))
+    else:
+        candidates = None
+        if previous.get("commit") and head:
+            reported = git_changed_paths(root, previous["commit"])
+            if reported is not None:
+                candidates = {path for path in reported if is_source_path(path)}
+                candidates.update(previous.get("dirty", ()))
+        if candidates is None:
+            candidates = _stat_changed_paths(root, files)
+
+    deleted = sorted(path for path in files if not (root / path).is_file())
+    for path in deleted:
+        del files[path]
+
+    ordered = sorted(path for path in candidates if (root / path).is_file())
+    parsed = {result.path: result for result in parse_files(root, ordered, workers)}
+    changed = []
+    for path in ordered:
+        is_manifest = posixpath.basename(path) in MANIFEST_FILES
+        if not is_manifest and path not in parsed:
+            continue
+        record = _record(root, path, None if is_manifest else parsed[path])
+        if record is None:
+            continue
+        old = files.get(path)
+        if old is None or old["hash"] != record["hash"]:
+            changed.append(path)
+        files[path] = record
+
+    if head and (reported is None or previous["commit"] != head):
+        reported = git_changed_paths(root, head)
+    dirty = sorted(
+        path for path in reported or () if is_source_path(path) and path in files
+    )
+    index: Dict[str, Any] = {
+        "version": INDEX_VERSION,
+        "commit": head,
+        "depth": depth,
+        "files": files,
+        "dirty": dirty,
+    }
+    graph = graph_from_index(root, index)
+    clusters = {
+        cluster.id: cluster.to_dict(include_modules=True)
+        for cluster in find_clusters(graph, depth)
+    }
+    old_clusters = previous["clusters"] if previous else {}
+    stale_clusters = {
+        cluster_key(_module_of(path), depth)
+        for path in changed + deleted
+        if posixpath.basename(path) not in MANIFEST_FILES
+    }
+    stale_clusters.update(
+        cluster_id
+        for cluster_id in set(clusters) | set(old_clusters)
+        if clusters.get(cluster_id) != old_clusters.get(cluster_id)
+    )
+
+    manifest = manifest or root / MANIFEST_NAME
+    components = load_components(manifest) if manifest.is_file() else {}
+    owners = component_owners(files, components)
+    old_owners = previous.get("owners", {}) if previous else {}
+    stale_components = sorted(
+        {
+            component_id
+            for path in changed + deleted
+            for component_id in owners.get(path, old_owners.get(path, ()))
+        }
+    )
+
+    index.update(
+        {
+            "components": {
+                component_id: entry["location"]
+                for component_id, entry in components.items()
+            },
+            "owners": owners,
+            "clusters": clusters,
+        }
+    )
+    state.write_json(state.state_dir(root) / INDEX_FILE, index)
+
+    update = IndexUpdate(
+        full=previous is None,
+        parsed=len(parsed),
+        changed=changed,
+        deleted=deleted,
+        stale_clusters=sorted(stale_clusters),
+        stale_components=stale_components,
+        stale_sections=stale_sections(root, documents, components, stale_components),
+        seconds=time.perf_counter() - started,
+    )
+    return index, graph, update
+
+
+def register(subparsers: Any) -> None:
+    parser = subparsers.add_parser(
+        "index",
+        help="incrementally re-analyze and report stale components",
+        description="Update the persisted analysis index, re-parsing only the "
+        "files git reports as changed, and print which clusters, components "
+        "and document sections are stale.",
+    )
+    parser.add_argument(
+        "root", nargs="?", type=Path, default=Path("."), help="project root"
+    )
+    parser.add_argument(
+        "--manifest",
+        type=Path,
+        help=f"status manifest mapping components to locations "
+        f"(default: ROOT/{MANIFEST_NAME})",
+    )
+    parser.add_argument(
+        "--depth",
+        type=int,
+        default=1,
+        help="directory levels below source roots per cluster (default: 1)",
+    )
+    parser.add_argument(
+        "--workers", type=int, help="parser processes (default: CPU count)"
+    )
+    parser.add_argument(
+        "--full", action="store_true", help="ignore the stored index and rescan"
+    )
+    parser.add_argument(
+        "--summary",
+        action="store_true",
+        help="include the full analysis summary, as printed by analyze",
+    )
+    parser.add_argument("--pretty", action="store_true", help="indent the JSON")
+    parser.set_defaults(func=run)
+
+
+def run(args: argparse.Namespace) -> int:
+    index, graph, update = update_index(
+        args.root,
+        manifest=args.manifest,
+        depth=args.depth,
+        workers=args.workers,
+        full=args.full,
+    )
+    report = update.to_dict()
+    if args.summary:
+        clusters = find_clusters(graph, depth=args.depth)
+        report["analysis"] = summarize(args.root, graph, clusters)
+    if args.pretty:
+        print(json.dumps(report, indent=2))
+    else:
+        print(json.dumps(report, separators=(",", ":")))
+    return 0
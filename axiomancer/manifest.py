@@ -0,0 +1,578 @@
+"""Indexed queries over ``STATUS_MANIFEST.yaml`` and computed metrics.
+
+The manifest is loaded once into an in-memory dependency graph with
+dependents, status buckets and strongly connected components indexed up
+front, so status questions are dictionary lookups rather than re-reads of
+the file. Parsed components are cached in ``.axiomancer_cache/`` by content
+hash because YAML parsing dominates for manifests with thousands of
+components.
+
+The ``metrics`` counts and ``risks.dependency_bottlenecks`` are recomputed
+from the graph and written back with line edits, leaving comments, ordering
+and every other value in the file untouched.
+"""
+
+import argparse
+import json
+import re
+import threading
+from collections import Counter
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from . import state
+from ._yaml import load_data_file
+from .analyze import content_digest
+from .errors import ManifestError
+
+STATUSES = ("PLANNED", "IN_PROGRESS", "USER_REVIEW", "COMPLETED")
+DEFAULT_MANIFEST = Path("STATUS_MANIFEST.yaml")
+CACHE_FILE = "manifest.json"
+LOCK_FILE = "manifest.lock"
+CACHE_VERSION = 2
+
+# Incomplete components blocking at least this many others are bottlenecks.
+BOTTLENECK_MIN_BLOCKED = 2
+BOTTLENECK_LIMIT = 5
+
+_TOP_LEVEL = re.compile(r"^([A-Za-z_][\w-]*):")
+_ENTRY = re.compile(
+    r"^(?P<indent>\s+)(?P<quote>[\"']?)(?P<key>[\w.-]+)(?P=quote):"
+    r"[ \t]*(?P<value>[^#\n]*?)(?P<comment>[ \t]+#.*)?$"
+)
+
+
+@dataclass(frozen=True)
+class Component:
+    """One entry of the ``components`` mapping."""
+
+    id: str
+    name: str
+    status: str
+    dependencies: Tuple[str, ...]
+    location: Any = None
+
+
+def _as_list(value: Any) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple)):
+        return [str(item) for item in value]
+    return [str(value)]
+
+
+def parse_phases(data: Any) -> Dict[str, List[str]]:
+    """Component ids listed under each entry of the ``phases`` block."""
+    phases = data.get("phases") if isinstance(data, dict) else None
+    if not isinstance(phases, dict):
+        return {}
+    return {
+        str(name): _as_list(entry.get("components"))
+        for name, entry in phases.items()
+        if isinstance(entry, dict)
+    }
+
+
+def parse_components(data: Any, source: str = "manifest") -> List[Component]:
+    """Build components from a parsed manifest document."""
+    components = data.get("components") if isinstance(data, dict) else None
+    if not isinstance(components, dict):
+        raise ManifestError(f"No components mapping in {source}")
+    parsed = []
+    for component_id, entry in components.items():
+        if not isinstance(entry, dict):
+            raise ManifestError(
+                f"Component {component_id} in {source} is not a mapping"
+            )
+        parsed.append(
+            Component(
+                id=str(component_id),
+                name=str(entry.get("name") or ""),
+                status=str(entry.get("status") or "PLANNED"),
+                dependencies=tuple(_as_list(entry.get("dependencies"))),
+                location=entry.get("location"),
+            )
+        )
+    return parsed
+
+
+class Manifest:
+    """A status manifest indexed for dependency and status queries.
+
+    ``order`` lists strongly connected components of the dependency graph
+    with every component's dependencies before it; cycles are the groups
+    with more than one member or a self-dependency.
+    """
+
+    def __init__(
+        self,
+        components: Sequence[Component],
+        path: Optional[Path] = None,
+        phases: Optional[Mapping[str, List[str]]] = None,
+    ):
+        self.path = path
+        self.phases = dict(phases or {})
+        self.components: Dict[str, Component] = {c.id: c for c in components}
+        self.dependents: Dict[str, List[str]] = {cid: [] for cid in self.components}
+        self.missing: Dict[str, List[str]] = {}
+        self.by_status: Dict[str, List[str]] = {}
+        for component in self.components.values():
+            self.by_status.setdefault(component.status, []).append(component.id)
+            for dependency in component.dependencies:
+                if dependency in self.dependents:
+                    self.dependents[dependency].append(component.id)
+                else:
+                    self.missing.setdefault(component.id, []).append(dependency)
+        self.order = self._strongly_connected()
+        self._ready: Optional[List[str]] = None
+        self._blocked: Optional[Dict[str, int]] = None
+
+    @classmethod
+    def load(cls, path: Path = DEFAULT_MANIFEST, cache: bool = True) -> "Manifest":
+        """Load a manifest file, reusing the parsed cache when unchanged."""
+        try:
+            digest = content_digest(path.read_bytes())
+        except OSError as exc:
+            raise ManifestError(f"Cannot read {path}: {exc.strerror}") from None
+        cache_path = path.parent / state.STATE_DIR_NAME / CACHE_FILE
+        if cache:
+            cached = state.read_json(cache_path)
+            if (
+                isinstance(cached, dict)
+                and cached.get("version") == CACHE_VERSION
+                and cached.get("digest") == digest
+            ):
+                components = [
+                    Component(**{**item, "dependencies": tuple(item["dependencies"])})
+                    for item in cached["components"]
+                ]
+                return cls(components, path, cached["phases"])
+
+        data = load_data_file(path)
+        components = parse_components(data, str(path))
+        phases = parse_phases(data)
+        if cache:
+            state.state_dir(path.parent)
+            state.write_json(
+                cache_path,
+                {
+                    "version": CACHE_VERSION,
+                    "digest": digest,
+                    "components": [
+                        {**asdict(c), "location": _json_safe(c.location)}
+                        for c in components
+                    ],
+                    "phases": phases,
+                },
+            )
+        return cls(components, path, phases)
+
+    def _strongly_connected(self) -> List[List[str]]:
+        # Iterative Tarjan, so deep dependency chains cannot hit the
+        # recursion limit.
+        index_of: Dict[str, int] = {}
+        low: Dict[str, int] = {}
+        stack: List[str] = []
+        on_stack = set()
+        groups: List[List[str]] = []
+
+        def visit(node: str) -> None:
+            index_of[node] = low[node] = len(index_of)
+            stack.append(node)
+            on_stack.add(node)
+
+        for start in self.components:
+            if start in index_of:
+                continue
+            visit(start)
+            work = [(start, iter(self.components[start].dependencies))]
+            while work:
+                node, children = work[-1]
+                for child in children:
+                    if child not in self.components:
+                        continue
+                    if child not in index_of:
+                        visit(child)
+                        work.append((child, iter(self.components[child].dependencies)))
+                        break
+                    if child in on_stack:
+                        low[node] = min(low[node], index_of[child])
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        low[parent] = min(low[parent], low[node])
+                    if low[node] == index_of[node]:
+                        group = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            group.append(member)
+                            if member == node:
+                                break
+                        groups.append(group)
+        return groups
+
+    def is_complete(self, component_id: str) -> bool:
+        return self.components[component_id].status == "COMPLETED"
+
+    def get(self, component_id: str) -> Component:
+        try:
+            return self.components[component_id]
+        except KeyError:
+            raise ManifestError(f"Unknown component: {component_id}") from None
+
+    def ready(self) -> List[str]:
+        """PLANNED components whose dependencies are all COMPLETED."""
+        if self._ready is None:
+            self._ready = [
+                cid
+                for cid in self.by_status.get("PLANNED", ())
+                if cid not in self.missing
+                and all(self.is_complete(d) for d in self.components[cid].dependencies)
+            ]
+        return self._ready
+
+    def _closure(
+        self, component_id: str, edges: Mapping[str, Sequence[str]]
+    ) -> List[str]:
+        self.get(component_id)
+        seen = {component_id}
+        pending = [component_id]
+        while pending:
+            for neighbour in edges[pending.pop()]:
+                if neighbour in self.components and neighbour not in seen:
+                    seen.add(neighbour)
+                    pending.append(neighbour)
+        seen.discard(component_id)
+        return sorted(seen)
+
+    def dependents_of(self, component_id: str, transitive: bool = False) -> List[str]:
+        """Components that depend on ``component_id``."""
+        if transitive:
+            return self._closure(component_id, self.dependents)
+        return sorted(self.dependents[self.get(component_id).id])
+
+    def dependencies_of(self, component_id: str, transitive: bool = False) -> List[str]:
+        """Components ``component_id`` depends on."""
+        if transitive:
+            deps = {cid: c.dependencies for cid, c in self.components.items()}
+            return self._closure(component_id, deps)
+        return sorted(self.get(component_id).dependencies)
+
+    def cycles(self) -> List[List[str]]:
+        """Dependency cycles, each as a sorted list of component ids."""
+        return [
+            sorted(group)
+            for group in self.order
+            if len(group) > 1 or group[0] in self.components[group[0]].dependencies
+        ]
+
+    def _require_acyclic(self) -> None:
+        cycles = self.cycles()
+        if cycles:
+            raise ManifestError(
+                "Dependency cycle: " + " -> ".join(cycles[0] + cycles[0][:1])
+            )
+
+    def critical_path(self) -> List[str]:
+        """Longest chain of incomplete components, dependencies first.
+
+        Its length is the minimum number of sequential implementation waves
+        left before every component can be COMPLETED.
+        """
+        self._require_acyclic()
+        best: Dict[str, Tuple[int, Optional[str]]] = {}
+        for group in self.order:
+            cid = group[0]
+            if self.is_complete(cid):
+                continue
+            length, previous = 1, None
+            for dependency in self.components[cid].dependencies:
+                if dependency in best and best[dependency][0] + 1 > length:
+                    length, previous = best[dependency][0] + 1, dependency
+            best[cid] = (length, previous)
+        if not best:
+            return []
+        node: Optional[str] = max(best, key=lambda cid: (best[cid][0], cid))
+        path = []
+        while node is not None:
+            path.append(node)
+            node = best[node][1]
+        return path[::-1]
+
+    def blocked_counts(self) -> Dict[str, int]:
+        """Number of incomplete components each incomplete one transitively blocks.
+
+        Reachability sets are integer bitsets propagated from dependents to
+        dependencies over ``order``, which keeps this near-linear for
+        manifests with thousands of components.
+        """
+        if self._blocked is None:
+            bit = {cid: 1 << position for position, cid in enumerate(self.components)}
+            incomplete = 0
+            for cid in self.components:
+                if not self.is_complete(cid):
+                    incomplete |= bit[cid]
+            reach: Dict[str, int] = {}
+            for group in reversed(self.order):
+                shared = 0
+                for cid in group:
+                    for dependent in self.dependents[cid]:
+                        shared |= reach.get(dependent, 0) | bit[dependent]
+                for cid in group:
+                    reach[cid] = shared & ~bit[cid]
+            self._blocked = {
+                cid: bin(reach[cid] & incomplete).count("1")
+                for cid in self.components
+                if not self.is_complete(cid)
+            }
+        return self._blocked
+
+    def bottlenecks(self, limit: int = BOTTLENECK_LIMIT) -> List[str]:
+        """Incomplete components that block the most other work."""
+        blocked = self.blocked_counts()
+        ranked = sorted(
+            (cid for cid, count in blocked.items() if count >= BOTTLENECK_MIN_BLOCKED),
+            key=lambda cid: (-blocked[cid], cid),
+        )
+        return ranked[:limit]
+
+    def metrics(self) -> Dict[str, Any]:
+        """Status counts in the shape of the manifest's ``metrics`` block."""
+        counts = Counter(c.status for c in self.components.values())
+        total = len(self.components)
+        return {
+            "total_components": total,
+            "completed_components": counts["COMPLETED"],
+            "in_progress_components": counts["IN_PROGRESS"],
+            "user_review_components": counts["USER_REVIEW"],
+            "planned_components": counts["PLANNED"],
+            "completion_percentage": (
+                round(100 * counts["COMPLETED"] / total) if total else 0
+            ),
+        }
+
+
+def _json_safe(value: Any) -> Any:
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if isinstance(value, (list, tuple)):
+        return [_json_safe(item) for item in value]
+    return str(value)
+
+
+def _block_bounds(lines: Sequence[str], key: str) -> Optional[Tuple[int, int]]:
+    """Line range of a top-level mapping, from its key to the next one."""
+    start = None
+    for number, line in enumerate(lines):
+        match = _TOP_LEVEL.match(line)
+        if match is None:
+            continue
+        if start is not None:
+            return start, number
+        if match.group(1) == key:
+            start = number
+    return (start, len(lines)) if start is not None else None
+
+
+def _replace_value(line: str, match: "re.Match[str]", value: str) -> str:
+    body = line.rstrip("\r\n")
+    return (
+        body[: match.start("value")]
+        + value
+        + (match.group("comment") or "")
+        + line[len(body) :]
+    )
+
+
+def set_block_values(text: str, key: str, values: Mapping[str, str]) -> str:
+    """Replace scalar values under the top-level ``key`` mapping in place.
+
+    Only keys already present at the block's first indentation level are
+    changed; trailing comments and everything outside the block are kept.
+    """
+    lines = text.splitlines(keepends=True)
+    bounds = _block_bounds(lines, key)
+    if bounds is None:
+        raise ManifestError(f"No {key} section in manifest")
+    indent = None
+    for number in range(bounds[0] + 1, bounds[1]):
+        line = lines[number]
+        body = line.rstrip("\r\n")
+        match = _ENTRY.match(body)
+        if match is None:
+            continue
+        if indent is None:
+            indent = match.group("indent")
+        if match.group("indent") != indent or match.group("key") not in values:
+            continue
+        value = values[match.group("key")]
+        if match.group("value").endswith("%"):
+            value += "%"
+        lines[number] = _replace_value(line, match, value)
+    return "".join(lines)
+
+
+def component_blocks(lines: Sequence[str]) -> Dict[str, Tuple[int, int]]:
+    """Line range of every entry of the ``components`` mapping.
+
+    A range runs from the entry's key to its last non-blank, non-comment
+    line, so comments introducing the next entry are not included.
+    """
+    bounds = _block_bounds(lines, "components")
+    if bounds is None:
+        return {}
+    starts = []
+    entry_indent = None
+    for number in range(bounds[0] + 1, bounds[1]):
+        match = _ENTRY.match(lines[number].rstrip("\r\n"))
+        if match is None:
+            continue
+        if entry_indent is None:
+            entry_indent = match.group("indent")
+        if match.group("indent") == entry_indent:
+            starts.append((match.group("key"), number))
+    blocks = {}
+    for index, (component_id, start) in enumerate(starts):
+        end = starts[index + 1][1] if index + 1 < len(starts) else bounds[1]
+        while end > start + 1 and lines[end - 1].strip()[:1] in ("", "#"):
+            end -= 1
+        blocks[component_id] = (start, end)
+    return blocks
+
+
+def set_status(text: str, component_id: str, status: str) -> str:
+    """Return ``text`` with the ``status`` of one component replaced."""
+    if status not in STATUSES:
+        raise ManifestError(f"Unknown status: {status}")
+    lines = text.splitlines(keepends=True)
+    bounds = _block_bounds(lines, "components")
+    if bounds is None:
+        raise ManifestError("No components section in manifest")
+    entry_indent = field_indent = None
+    inside = False
+    for number in range(bounds[0] + 1, bounds[1]):
+        match = _ENTRY.match(lines[number].rstrip("\r\n"))
+        if match is None:
+            continue
+        indent = match.group("indent")
+        if entry_indent is None:
+            entry_indent = indent
+        if indent == entry_indent:
+            if inside:
+                break
+            inside = match.group("key") == component_id
+        elif inside and field_indent in (None, indent):
+            field_indent = indent
+            if match.group("key") == "status":
+                lines[number] = _replace_value(lines[number], match, status)
+                return "".join(lines)
+    raise ManifestError(f"Cannot find the status of {component_id} in manifest")
+
+
+_status_lock = threading.Lock()
+
+
+def update_status(path: Path, changes: Mapping[str, str]) -> None:
+    """Apply status transitions to a manifest file atomically.
+
+    Safe to call from several threads and processes at once: updates are
+    serialized by a lock and each one re-reads the file, so none is lost.
+    """
+    lock = state.state_dir(path.parent) / LOCK_FILE
+    with _status_lock, state.file_lock(lock):
+        try:
+            text = path.read_text(encoding="utf-8")
+        except OSError as exc:
+            raise ManifestError(f"Cannot read {path}: {exc.strerror}") from None
+        for component_id, status in changes.items():
+            text = set_status(text, component_id, status)
+        state.write_text(path, text)
+
+
+def update_metrics(text: str, manifest: Manifest) -> str:
+    """Return ``text`` with recomputed metrics and dependency bottlenecks."""
+    metrics = {key: str(value) for key, value in manifest.metrics().items()}
+    text = set_block_values(text, "metrics", metrics)
+    if _block_bounds(text.splitlines(), "risks") is not None:
+        text = set_block_values(
+            text,
+            "risks",
+            {"dependency_bottlenecks": json.dumps(manifest.bottlenecks())},
+        )
+    return text
+
+
+QUERIES = (
+    "ready",
+    "dependents",
+    "dependencies",
+    "critical-path",
+    "cycles",
+    "bottlenecks",
+    "metrics",
+)
+
+
+def register(subparsers: Any) -> None:
+    parser = subparsers.add_parser(
+        "manifest",
+        help="query STATUS_MANIFEST.yaml and recompute its metrics",
+        description="Answer dependency and status questions from the status "
+        "manifest and recompute its metrics and dependency bottlenecks.",
+    )
+    parser.add_argument("query", choices=QUERIES, help="question to answer")
+    parser.add_argument(
+        "component", nargs="?", help="component id for dependents/dependencies"
+    )
+    parser.add_argument(
+        "--manifest",
+        type=Path,
+        default=DEFAULT_MANIFEST,
+        help=f"manifest file (default: {DEFAULT_MANIFEST})",
+    )
+    parser.add_argument(
+        "--transitive",
+        action="store_true",
+        help="follow dependents/dependencies all the way",
+    )
+    parser.add_argument(
+        "--write",
+        action="store_true",
+        help="with metrics: write the metrics and bottlenecks into the manifest",
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="always parse the manifest afresh"
+    )
+    parser.set_defaults(func=run)
+
+
+def run(args: argparse.Namespace) -> int:
+    manifest = Manifest.load(args.manifest, cache=not args.no_cache)
+    if args.query in ("dependents", "dependencies") and not args.component:
+        raise ManifestError(f"{args.query} needs a component id")
+
+    result: Any
+    if args.query == "ready":
+        result = manifest.ready()
+    elif args.query == "dependents":
+        result = manifest.dependents_of(args.component, args.transitive)
+    elif args.query == "dependencies":
+        result = manifest.dependencies_of(args.component, args.transitive)
+    elif args.query == "critical-path":
+        result = manifest.critical_path()
+    elif args.query == "cycles":
+        result = manifest.cycles()
+    elif args.query == "bottlenecks":
+        blocked = manifest.blocked_counts()
+        result = {cid: blocked[cid] for cid in manifest.bottlenecks()}
+    else:
+        result = manifest.metrics()
+        result["dependency_bottlenecks"] = manifest.bottlenecks()
+        if args.write:
+            text = args.manifest.read_text(encoding="utf-8")
+            state.write_text(args.manifest, update_metrics(text, manifest))
+    print(json.dumps(result, indent=2))
+    return 0 if args.query != "cycles" or not result else 1
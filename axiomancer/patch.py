@@ -0,0 +1,622 @@
+"""Section-level updates of generated documents.
+
+Generated markdown carries an anchor line under every heading::
+
+    ## Data Flow
+    <!-- anchor: data-flow sha: 3f2a9c01b7e4 -->
+
+The anchor names the section for good, even when its heading is reworded,
+and ``sha`` is the digest of the section's text (up to the next heading) as
+last written, so sections edited by hand since then show up as ``edited``.
+
+``apply`` takes a fragment holding only what changed: whole sections (a
+heading with its subsections) for markdown, component entries for
+``STATUS_MANIFEST.yaml``. Sections are matched by anchor, else by heading;
+matched ones are replaced and the rest are added. The result is parsed
+again and every other section or entry must come out byte-identical before
+anything is written, so an update costs in proportion to the change rather
+than to the document.
+"""
+
+import argparse
+import json
+import re
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Collection,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from . import state, trace
+from ._yaml import require_yaml
+from .analyze import content_digest
+from .errors import ManifestError, PatchError
+from .manifest import LOCK_FILE, component_blocks, parse_components
+from .prompt import estimate_tokens
+from .sections import split_sections
+
+HASH_LENGTH = 12
+MANIFEST_SUFFIXES = (".yaml", ".yml")
+
+_ANCHOR_LINE = re.compile(
+    r"[ \t]*<!-- anchor: (?P<anchor>[^\s>]+) sha: (?:(?P<sha>[0-9a-f]+) )?-->[ \t]*"
+    r"(?:\r?\n|\Z)"
+)
+_SLUG = re.compile(r"[^a-z0-9]+")
+_TOP_LEVEL = re.compile(r"^([A-Za-z_][\w-]*):")
+
+
+@dataclass(frozen=True)
+class Anchored:
+    """A heading section of a document and its anchor.
+
+    Offsets are as in ``sections.Section``; ``head_end`` is the end of the
+    heading line and ``body`` the end of its anchor line (``head_end`` when
+    there is none, in which case ``sha`` is None and the anchor is derived
+    from the heading).
+    """
+
+    anchor: str
+    level: int
+    title: str
+    line: int
+    start: int
+    head_end: int
+    body: int
+    end: int
+    sha: Optional[str]
+
+
+def section_digest(body: str) -> str:
+    """Digest recorded in the anchor line of a section with text ``body``.
+
+    Trailing whitespace is left out, so appending a section after this one
+    does not make it look edited.
+    """
+    return content_digest(body.rstrip().encode("utf-8"))[:HASH_LENGTH]
+
+
+def slugify(title: str) -> str:
+    """Anchor for a heading: lowercase words joined by dashes."""
+    return _SLUG.sub("-", title.lower()).strip("-") or "section"
+
+
+def _unique(anchor: str, taken: Set[str]) -> str:
+    candidate, number = anchor, 1
+    while candidate in taken:
+        number += 1
+        candidate = f"{anchor}-{number}"
+    taken.add(candidate)
+    return candidate
+
+
+def anchored_sections(text: str) -> List[Anchored]:
+    """The heading sections of ``text`` with their anchors.
+
+    Sections without an anchor line get the slug of their heading, numbered
+    where it is already taken.
+    """
+    found = []
+    for section in split_sections(text):
+        if not section.level:
+            continue
+        newline = text.find("\n", section.start, section.end)
+        head_end = section.end if newline < 0 else newline + 1
+        match = _ANCHOR_LINE.match(text, head_end, section.end)
+        found.append((section, head_end, match))
+
+    taken = {match.group("anchor") for _, _, match in found if match}
+    anchored = []
+    for section, head_end, match in found:
+        anchored.append(
+            Anchored(
+                anchor=(
+                    match.group("anchor")
+                    if match
+                    else _unique(slugify(section.title), taken)
+                ),
+                level=section.level,
+                title=section.title,
+                line=section.line,
+                start=section.start,
+                head_end=head_end,
+                body=match.end() if match else head_end,
+                end=section.end,
+                sha=(match.group("sha") or "") if match else None,
+            )
+        )
+    return anchored
+
+
+def subtree_end(sections: Sequence[Anchored], index: int, length: int) -> int:
+    """End of section ``index`` together with its subsections."""
+    level = sections[index].level
+    for later in sections[index + 1 :]:
+        if later.level <= level:
+            return later.start
+    return length
+
+
+def section_state(text: str, section: Anchored) -> str:
+    """``ok``, ``edited`` since its digest was written, or ``unstamped``."""
+    if section.sha is None:
+        return "unstamped"
+    if section.sha != section_digest(text[section.body : section.end]):
+        return "edited"
+    return "ok"
+
+
+def stamp(text: str, only: Optional[Collection[str]] = None) -> str:
+    """Return ``text`` with anchor lines holding current digests.
+
+    With ``only``, just the sections with those anchors are stamped and all
+    other bytes are left as they are.
+    """
+    sections = anchored_sections(text)
+    if not sections:
+        return text
+    pieces = [text[: sections[0].start]]
+    for section in sections:
+        heading = text[section.start : section.head_end]
+        if only is not None and section.anchor not in only:
+            pieces.append(text[section.start : section.end])
+            continue
+        if not heading.endswith("\n"):
+            heading += "\n"
+        newline = "\r\n" if heading.endswith("\r\n") else "\n"
+        digest = section_digest(text[section.body : section.end])
+        pieces.append(heading)
+        pieces.append(f"<!-- anchor: {section.anchor} sha: {digest} -->{newline}")
+        pieces.append(text[section.body : section.end])
+    return "".join(pieces)
+
+
+def _anchor_line(anchor: str) -> str:
+    return f"<!-- anchor: {anchor} sha: -->\n"
+
+
+def _match(
+    sections: Sequence[Anchored], part: Anchored, by_anchor: Dict[str, int]
+) -> Optional[int]:
+    """Index of the document section a fragment section replaces, if any."""
+    if part.sha is not None:
+        return by_anchor.get(part.anchor)
+    same = [
+        index
+        for index, section in enumerate(sections)
+        if section.level == part.level and section.title == part.title
+    ]
+    if len(same) > 1:
+        raise PatchError(
+            f"Several sections are titled {part.title!r}; "
+            "include the anchor line of the one to replace"
+        )
+    return same[0] if same else None
+
+
+def patch_markdown(
+    text: str, fragment: str, after: Optional[str] = None
+) -> Tuple[str, List[str], List[str], int]:
+    """Replace or add the top-level sections of ``fragment`` in ``text``.
+
+    Returns the new text, the anchors of the replaced and of the added
+    sections and the number of sections left as they were. New sections go
+    after the section (and subsections) anchored ``after``, or at the end of
+    the document. Raises ``PatchError`` unless every other section is
+    unchanged in the result.
+    """
+    sections = anchored_sections(text)
+    by_anchor = {section.anchor: index for index, section in enumerate(sections)}
+    parts = anchored_sections(fragment)
+    if not parts or fragment[: parts[0].start].strip():
+        raise PatchError("A patch must start with the heading of a section")
+    top = parts[0].level
+    if any(part.level < top for part in parts):
+        raise PatchError("A patch must start with its highest-level heading")
+    if after is not None and after not in by_anchor:
+        raise PatchError(f"No section anchored {after!r}")
+
+    # Top-level sections of the fragment and the document ranges they replace
+    roots = [index for index, part in enumerate(parts) if part.level == top]
+    edits = []
+    for position, index in enumerate(roots):
+        end = roots[position + 1] if position + 1 < len(roots) else len(parts)
+        target = _match(sections, parts[index], by_anchor)
+        if target is None:
+            start = stop = (
+                subtree_end(sections, by_anchor[after], len(text))
+                if after is not None
+                else len(text)
+            )
+        else:
+            start, stop = sections[target].start, subtree_end(
+                sections, target, len(text)
+            )
+        edits.append((start, stop, target, parts[index:end]))
+
+    replaced = sorted(
+        (start, stop) for start, stop, target, _ in edits if target is not None
+    )
+    for (_, first_stop), (second_start, _) in zip(replaced, replaced[1:]):
+        if second_start < first_stop:
+            raise PatchError("A patch cannot replace a section and its subsections")
+
+    def kept(section: Anchored) -> bool:
+        return not any(start <= section.start < stop for start, stop in replaced)
+
+    taken = {section.anchor for section in sections if kept(section)}
+    changed, added, touched = [], [], set()
+    bodies = []
+    for start, stop, target, subtree in edits:
+        old = sections[target].anchor if target is not None else None
+        previous = {
+            section.title: section.anchor
+            for section in sections
+            if start <= section.start < stop and section.anchor != old
+        }
+        pieces = []
+        for number, part in enumerate(subtree):
+            if number == 0 and old is not None:
+                anchor = _unique(old, taken)
+            elif part.sha is not None:
+                anchor = _unique(part.anchor, taken)
+            else:
+                anchor = _unique(previous.get(part.title, slugify(part.title)), taken)
+            if number == 0:
+                (changed if old is not None else added).append(anchor)
+            touched.add(anchor)
+            heading = fragment[part.start : part.head_end].rstrip("\r\n")
+            pieces.append(heading + "\n" + _anchor_line(anchor))
+            pieces.append(fragment[part.body : part.end])
+        body = "".join(pieces).rstrip()
+        if target is not None:
+            original = text[start:stop]
+            body += original[len(original.rstrip()) :]
+        elif start < len(text):
+            body += "\n\n"
+        else:
+            body += "\n"
+            if text and not text.endswith("\n\n"):
+                body = ("\n" if text.endswith("\n") else "\n\n") + body
+        bodies.append((start, stop, body))
+
+    result = text
+    # Back to front, and in patch order where sections go to the same place
+    for start, stop, body in reversed(sorted(bodies, key=lambda edit: edit[0])):
+        result = result[:start] + body + result[stop:]
+    result = stamp(result, only=touched)
+    _verify_markdown(text, sections, result, kept, touched)
+    return result, changed, added, sum(1 for section in sections if kept(section))
+
+
+def _verify_markdown(
+    text: str,
+    sections: Sequence[Anchored],
+    result: str,
+    kept: Callable[[Anchored], bool],
+    touched: Set[str],
+) -> None:
+    """Raise unless the sections a patch did not touch are unchanged."""
+    after = anchored_sections(result)
+    anchors = [section.anchor for section in after]
+    if len(set(anchors)) != len(anchors):
+        raise PatchError("The patch would give two sections the same anchor")
+    before_start = sections[0].start if sections else len(text)
+    after_start = after[0].start if after else len(result)
+    if text[:before_start] != result[:after_start] and sections:
+        raise PatchError("The patch would change the text before the first heading")
+    new = {
+        section.anchor: result[section.start : section.end]
+        for section in after
+        if section.anchor not in touched
+    }
+    for section in sections:
+        if not kept(section):
+            continue
+        old = text[section.start : section.end]
+        current = new.pop(section.anchor, None)
+        # Appending a section may add a blank line to the last one
+        if current is None or not (
+            current == old
+            or section.end == len(text)
+            and current.startswith(old)
+            and not current[len(old) :].strip()
+        ):
+            raise PatchError(
+                f"The patch would change section {section.anchor!r} "
+                f"(line {section.line}); check the patch for unclosed code fences"
+            )
+    if new:
+        raise PatchError(
+            "The patch would add unexpected sections: " + ", ".join(sorted(new))
+        )
+
+
+def _entry_indent(lines: Sequence[str], blocks: Dict[str, Tuple[int, int]]) -> str:
+    if not blocks:
+        return "  "
+    first = lines[min(start for start, _ in blocks.values())]
+    return first[: len(first) - len(first.lstrip())]
+
+
+def patch_manifest(text: str, fragment: str) -> Tuple[str, List[str], List[str], int]:
+    """Replace or add the component entries of ``fragment`` in a manifest.
+
+    The fragment holds entries as they appear under ``components:`` (the
+    key itself may be included). Returns the new text, the ids of the
+    replaced and of the added components and the number of components left
+    as they were. Raises ``PatchError`` unless the
+    result is a valid manifest in which every other line is unchanged.
+    """
+    lines = text.splitlines(keepends=True)
+    blocks = component_blocks(lines)
+    header = next(
+        (number for number, line in enumerate(lines) if line.startswith("components:")),
+        None,
+    )
+    if header is None:
+        raise PatchError("No components section in manifest")
+
+    patch_lines = fragment.splitlines(keepends=True)
+    keys = {match.group(1) for match in map(_TOP_LEVEL.match, patch_lines) if match}
+    top_level = {match.group(1) for match in map(_TOP_LEVEL.match, lines) if match}
+    if keys & top_level - {"components"}:
+        raise PatchError("Only components entries can be patched")
+    if "components" not in keys:
+        # Bare entries: nest them under a components key of their own
+        patch_lines = ["components:\n"] + [
+            "  " + line if line.strip() else line for line in patch_lines
+        ]
+    elif len(keys) > 1:
+        raise PatchError("Only components entries can be patched")
+    entries = component_blocks(patch_lines)
+    if not entries:
+        raise PatchError("The patch has no component entries")
+
+    indent = _entry_indent(lines, blocks)
+    patch_indent = _entry_indent(patch_lines, entries)
+    edits = []
+    changed, added = [], []
+    insert_at = max((end for _, end in blocks.values()), default=header + 1)
+    # Keep the blank lines between entries if the manifest has them
+    spaced = any(
+        start > header + 1 and not lines[start - 1].strip()
+        for start, _ in blocks.values()
+    )
+    for component_id, (start, end) in entries.items():
+        block = []
+        for line in patch_lines[start:end]:
+            if line.startswith(patch_indent):
+                line = indent + line[len(patch_indent) :]
+            block.append(line if line.endswith("\n") else line + "\n")
+        if component_id in blocks:
+            edits.append((*blocks[component_id], block))
+            changed.append(component_id)
+        else:
+            edits.append((insert_at, insert_at, ["\n"] * spaced + block))
+            added.append(component_id)
+    if lines and not lines[-1].endswith("\n") and insert_at == len(lines) and added:
+        lines[-1] += "\n"
+
+    result = list(lines)
+    for start, stop, block in reversed(sorted(edits, key=lambda edit: edit[0])):
+        result[start:stop] = block
+    new_text = "".join(result)
+    tail = len(lines) - max(insert_at, max(stop for _, stop, _ in edits))
+
+    new_blocks = component_blocks(result)
+    for component_id, (start, stop) in blocks.items():
+        if component_id in changed:
+            continue
+        new_start, new_stop = new_blocks.get(component_id, (0, 0))
+        if result[new_start:new_stop] != lines[start:stop]:
+            raise PatchError(f"The patch would change component {component_id}")
+    if result[: header + 1] != lines[: header + 1] or (
+        tail and result[-tail:] != lines[-tail:]
+    ):
+        raise PatchError("The patch would change the manifest outside components")
+    yaml = require_yaml()
+    try:
+        parsed = {
+            component.id for component in parse_components(yaml.safe_load(new_text))
+        }
+    except yaml.YAMLError as exc:
+        raise PatchError(f"The patched manifest is not valid YAML: {exc}") from None
+    except ManifestError as exc:
+        raise PatchError(f"The patched manifest is invalid: {exc}") from None
+    missing = set(changed + added) - parsed
+    if missing:
+        raise PatchError("Components lost by the patch: " + ", ".join(sorted(missing)))
+    return new_text, changed, added, len(blocks) - len(changed)
+
+
+def is_manifest(path: Path) -> bool:
+    return path.suffix in MANIFEST_SUFFIXES
+
+
+def list_sections(path: Path, text: str) -> List[Dict[str, Any]]:
+    """Anchor (or component id), size and state of every section of a file."""
+    if is_manifest(path):
+        lines = text.splitlines(keepends=True)
+        return [
+            {
+                "anchor": component_id,
+                "line": start + 1,
+                "tokens": estimate_tokens("".join(lines[start:end])),
+                "sha": section_digest("".join(lines[start:end])),
+                "state": "ok",
+            }
+            for component_id, (start, end) in component_blocks(lines).items()
+        ]
+    rows = []
+    for section in anchored_sections(text):
+        rows.append(
+            {
+                "anchor": section.anchor,
+                "level": section.level,
+                "title": section.title,
+                "line": section.line,
+                "tokens": estimate_tokens(text[section.start : section.end]),
+                "sha": section.sha,
+                "state": section_state(text, section),
+            }
+        )
+    return rows
+
+
+def show(path: Path, text: str, anchors: Sequence[str]) -> str:
+    """The text of the named sections with their subsections, or entries."""
+    pieces = []
+    if is_manifest(path):
+        lines = text.splitlines(keepends=True)
+        blocks = component_blocks(lines)
+        for anchor in anchors:
+            if anchor not in blocks:
+                raise PatchError(f"No component {anchor!r} in {path}")
+            pieces.append("".join(lines[slice(*blocks[anchor])]))
+        return "".join(pieces)
+    sections = anchored_sections(text)
+    by_anchor = {section.anchor: index for index, section in enumerate(sections)}
+    for anchor in anchors:
+        if anchor not in by_anchor:
+            raise PatchError(f"No section anchored {anchor!r} in {path}")
+        index = by_anchor[anchor]
+        pieces.append(
+            text[sections[index].start : subtree_end(sections, index, len(text))]
+        )
+    return "".join(pieces)
+
+
+def _read(path: Path) -> str:
+    try:
+        return path.read_text(encoding="utf-8")
+    except OSError as exc:
+        raise PatchError(f"Cannot read {path}: {exc.strerror}") from None
+
+
+def apply(
+    path: Path, fragment: str, after: Optional[str] = None, dry_run: bool = False
+) -> Dict[str, Any]:
+    """Patch ``path`` with ``fragment`` and write it unless ``dry_run``."""
+    if is_manifest(path):
+        if after is not None:
+            raise PatchError("--after applies to markdown sections only")
+        lock = state.state_dir(path.parent) / LOCK_FILE
+        with state.file_lock(lock):
+            text = _read(path)
+            result, changed, added, unchanged = patch_manifest(text, fragment)
+            if not dry_run and result != text:
+                state.write_text(path, result)
+    else:
+        text = _read(path)
+        result, changed, added, unchanged = patch_markdown(text, fragment, after)
+        if not dry_run and result != text:
+            state.write_text(path, result)
+    summary = {
+        "file": str(path),
+        "replaced": changed,
+        "added": added,
+        "unchanged": unchanged,
+        "patch_bytes": len(fragment.encode("utf-8")),
+        "document_bytes": len(result.encode("utf-8")),
+        "written": not dry_run and result != text,
+    }
+    trace.annotate(
+        replaced=len(changed), added=len(added), unchanged=summary["unchanged"]
+    )
+    return summary
+
+
+def register(subparsers: Any) -> None:
+    parser = subparsers.add_parser(
+        "patch",
+        help="update single sections of generated documents",
+        description="List, show and replace single sections of generated "
+        "markdown (by anchor) or STATUS_MANIFEST.yaml entries (by component "
+        "id), verifying that everything else stays byte-identical.",
+    )
+    actions = parser.add_subparsers(dest="action", metavar="ACTION", required=True)
+    listing = actions.add_parser("list", help="anchors, sizes and edit state")
+    listing.add_argument("file", type=Path)
+    listing.add_argument("--json", action="store_true", help="print JSON results")
+    showing = actions.add_parser("show", help="print sections by anchor")
+    showing.add_argument("file", type=Path)
+    showing.add_argument("anchors", nargs="+", metavar="ANCHOR")
+    stamping = actions.add_parser(
+        "stamp", help="add anchors and record section digests"
+    )
+    stamping.add_argument("files", type=Path, nargs="+", metavar="FILE")
+    applying = actions.add_parser("apply", help="replace or add sections")
+    applying.add_argument("file", type=Path)
+    applying.add_argument(
+        "--from",
+        dest="source",
+        type=Path,
+        help="file with the changed sections (default: stdin)",
+    )
+    applying.add_argument(
+        "--after", metavar="ANCHOR", help="put new sections after this section"
+    )
+    applying.add_argument(
+        "--dry-run", action="store_true", help="verify without writing"
+    )
+    applying.add_argument("--json", action="store_true", help="print JSON results")
+    parser.set_defaults(func=run)
+
+
+def run(args: argparse.Namespace) -> int:
+    if args.action == "stamp":
+        for path in args.files:
+            if is_manifest(path):
+                raise PatchError(
+                    f"{path}: manifest entries are addressed by component id"
+                )
+            text = _read(path)
+            stamped = stamp(text)
+            if stamped != text:
+                state.write_text(path, stamped)
+            print(f"{path}: {len(anchored_sections(stamped))} sections anchored")
+        return 0
+
+    if args.action == "list":
+        rows = list_sections(args.file, _read(args.file))
+        if args.json:
+            print(json.dumps(rows, indent=2))
+            return 0
+        for row in rows:
+            indent = "  " * (row.get("level", 1) - 1)
+            print(
+                f"{row['line']:>5}  {row['state']:<9} {row['tokens']:>6} tok  "
+                f"{indent}{row['anchor']}"
+            )
+        return 0
+
+    if args.action == "show":
+        sys.stdout.write(show(args.file, _read(args.file), args.anchors))
+        return 0
+
+    fragment = _read(args.source) if args.source else sys.stdin.read()
+    summary = apply(args.file, fragment, args.after, args.dry_run)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return 0
+    verb = "Verified" if args.dry_run else "Patched"
+    parts = [
+        f"replaced {', '.join(summary['replaced'])}" if summary["replaced"] else "",
+        f"added {', '.join(summary['added'])}" if summary["added"] else "",
+    ]
+    print(
+        f"{verb} {args.file}: {'; '.join(part for part in parts if part)}; "
+        f"{summary['unchanged']} other "
+        f"{'components' if is_manifest(args.file) else 'sections'} unchanged"
+    )
+    return 0
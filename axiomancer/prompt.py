@@ -0,0 +1,279 @@
+"""Mode-aware assembler for the bootstrap prompt.
+
+``axiomancer.md`` is divided into sections by marker comments on lines of
+their own::
+
+    <!-- section: new-project | modes: new | phases: conception -->
+
+A section runs to the next marker. ``modes`` and ``phases`` restrict where
+it is included; a section without them is always included. ``templates``
+names the templates a section's instructions work from. They are listed at
+the end of the assembled prompt to be read when that step is reached, or
+expanded in place with ``inline``, instead of being read up front.
+
+Mode ``auto`` keeps every section and is the full command. Token counts are
+estimated at four characters per token; they are for comparing assemblies,
+not for billing.
+"""
+
+import argparse
+import json
+import re
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from . import state, trace
+from .errors import PromptError
+from .render import DEFAULT_TEMPLATE_DIR
+
+MODES = ("auto", "new", "existing")
+PHASES = ("conception", "analysis", "customize", "generate", "validate", "cleanup")
+DEFAULT_SOURCE = Path(".axiomantic") / "commands" / "axiomancer.md"
+CHARS_PER_TOKEN = 4
+
+_MARKER = re.compile(r"^<!--\s*section:(?P<spec>.*?)-->[ \t]*(?:\n|$)", re.M)
+_LIST_SEPARATOR = re.compile(r"[,\s]+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of ``text``."""
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+@dataclass(frozen=True)
+class PromptSection:
+    """One addressable part of the prompt, without its marker line."""
+
+    id: str
+    text: str
+    modes: FrozenSet[str] = frozenset()
+    phases: FrozenSet[str] = frozenset()
+    templates: Tuple[str, ...] = ()
+
+    @property
+    def tokens(self) -> int:
+        return estimate_tokens(self.text)
+
+    def wanted(self, mode: str, phase: Optional[str] = None) -> bool:
+        """Whether the section belongs in the prompt for ``mode`` and ``phase``."""
+        if self.modes and mode != "auto" and mode not in self.modes:
+            return False
+        return phase is None or not self.phases or phase in self.phases
+
+
+def _parse_marker(spec: str, source: str) -> Dict[str, Any]:
+    section_id, *fields = [field.strip() for field in spec.split("|")]
+    if not section_id:
+        raise PromptError(f"{source}: section marker without an id")
+    parsed: Dict[str, Any] = {"id": section_id}
+    for field in fields:
+        key, _, value = field.partition(":")
+        key = key.strip()
+        values = [item for item in _LIST_SEPARATOR.split(value) if item]
+        if key == "modes":
+            unknown = set(values) - set(MODES)
+            parsed["modes"] = frozenset(values)
+        elif key == "phases":
+            unknown = set(values) - set(PHASES)
+            parsed["phases"] = frozenset(values)
+        elif key == "templates":
+            unknown = set()
+            parsed["templates"] = tuple(values)
+        else:
+            raise PromptError(f"{source}: unknown field {key!r} in {section_id}")
+        if unknown:
+            raise PromptError(
+                f"{source}: unknown {key} in {section_id}: "
+                + ", ".join(sorted(unknown))
+            )
+    return parsed
+
+
+def parse_sections(text: str, source: str = "prompt") -> List[PromptSection]:
+    """Split marked-up prompt text into its sections, in document order.
+
+    Text before the first marker, if any, is an unconditional ``preamble``.
+    """
+    matches = list(_MARKER.finditer(text))
+    sections = []
+    if not matches or text[: matches[0].start()].strip():
+        end = matches[0].start() if matches else len(text)
+        sections.append(PromptSection("preamble", text[:end]))
+    seen = set()
+    for match, following in zip(matches, matches[1:] + [None]):
+        fields = _parse_marker(match.group("spec"), source)
+        if fields["id"] in seen:
+            raise PromptError(f"{source}: duplicate section {fields['id']}")
+        seen.add(fields["id"])
+        end = following.start() if following is not None else len(text)
+        sections.append(PromptSection(text=text[match.end() : end], **fields))
+    return sections
+
+
+@dataclass
+class Assembly:
+    """An assembled prompt and what went into it."""
+
+    mode: str
+    phase: Optional[str]
+    text: str
+    sections: List[PromptSection]
+    templates: Dict[str, int]
+    inline: bool
+    source_tokens: int
+
+    @property
+    def tokens(self) -> int:
+        return estimate_tokens(self.text)
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "phase": self.phase,
+            "tokens": self.tokens,
+            "source_tokens": self.source_tokens,
+            "sections": [
+                {"id": section.id, "tokens": section.tokens}
+                for section in self.sections
+            ],
+            "templates": [
+                {"name": name, "tokens": tokens, "inlined": self.inline}
+                for name, tokens in self.templates.items()
+            ],
+        }
+
+
+def _template_appendix(
+    templates: Dict[str, str], template_dir: Path, inline: bool
+) -> str:
+    if not inline:
+        listing = "".join(
+            f"- `{name}` (~{estimate_tokens(text)} tokens)\n"
+            for name, text in templates.items()
+        )
+        return (
+            "\n## Templates for This Run\n\n"
+            f"Read these from `{template_dir.as_posix()}/` when the step that "
+            f"uses them is reached, not before:\n\n{listing}"
+        )
+    parts = []
+    for name, text in templates.items():
+        if not name.endswith(".md"):
+            fence = "```"
+            while fence in text:
+                fence += "`"
+            language = Path(name).suffix.lstrip(".")
+            text = f"{fence}{language}\n{text.rstrip()}\n{fence}\n"
+        parts.append(f"\n## Template: {name}\n\n{text.rstrip()}\n")
+    return "".join(parts)
+
+
+def assemble(
+    text: str,
+    mode: str = "auto",
+    phase: Optional[str] = None,
+    template_dir: Path = DEFAULT_TEMPLATE_DIR,
+    inline: bool = False,
+    source: str = "prompt",
+) -> Assembly:
+    """Assemble the prompt for ``mode`` and, optionally, a single ``phase``."""
+    if mode not in MODES:
+        raise PromptError(f"Unknown mode: {mode}")
+    if phase is not None and phase not in PHASES:
+        raise PromptError(f"Unknown phase: {phase}")
+    sections = parse_sections(text, source)
+    chosen = [section for section in sections if section.wanted(mode, phase)]
+    if phase is not None and not any(phase in section.phases for section in chosen):
+        raise PromptError(f"Phase {phase} does not apply to mode {mode}")
+
+    names: List[str] = []
+    for section in chosen:
+        names.extend(name for name in section.templates if name not in names)
+    templates = {}
+    for name in names:
+        path = template_dir / name
+        try:
+            templates[name] = path.read_text(encoding="utf-8")
+        except OSError as exc:
+            raise PromptError(f"Cannot read template {path}: {exc}") from exc
+
+    body = "".join(section.text for section in chosen).rstrip("\n") + "\n"
+    if templates:
+        body += _template_appendix(templates, template_dir, inline)
+    return Assembly(
+        mode=mode,
+        phase=phase,
+        text=body,
+        sections=chosen,
+        templates={name: estimate_tokens(value) for name, value in templates.items()},
+        inline=inline,
+        source_tokens=estimate_tokens("".join(section.text for section in sections)),
+    )
+
+
+def register(subparsers: Any) -> None:
+    parser = subparsers.add_parser(
+        "prompt",
+        help="assemble the bootstrap prompt for one mode or phase",
+        description="Assemble axiomancer.md from only the sections a mode "
+        "(and optionally a single phase) needs, and report token estimates.",
+    )
+    parser.add_argument(
+        "--mode",
+        choices=MODES,
+        default="auto",
+        help="project mode; auto keeps every section (default: auto)",
+    )
+    parser.add_argument(
+        "--phase", choices=PHASES, help="only the sections for this phase"
+    )
+    parser.add_argument(
+        "--source",
+        type=Path,
+        default=DEFAULT_SOURCE,
+        help=f"marked-up prompt (default: {DEFAULT_SOURCE})",
+    )
+    parser.add_argument(
+        "--templates",
+        type=Path,
+        default=DEFAULT_TEMPLATE_DIR,
+        help=f"template directory (default: {DEFAULT_TEMPLATE_DIR})",
+    )
+    parser.add_argument(
+        "--inline",
+        action="store_true",
+        help="expand the needed templates instead of listing them",
+    )
+    parser.add_argument(
+        "-o", "--output", type=Path, help="write the prompt here instead of stdout"
+    )
+    parser.add_argument(
+        "--json", action="store_true", help="print the token report as JSON"
+    )
+    parser.set_defaults(func=run)
+
+
+def run(args: argparse.Namespace) -> int:
+    try:
+        text = args.source.read_text(encoding="utf-8")
+    except OSError as exc:
+        raise PromptError(f"Cannot read {args.source}: {exc}") from exc
+    assembly = assemble(
+        text, args.mode, args.phase, args.templates, args.inline, str(args.source)
+    )
+    trace.annotate(mode=args.mode, tokens=assembly.tokens)
+    if args.output is not None:
+        state.write_text(args.output, assembly.text)
+    if args.json:
+        print(json.dumps(assembly.report(), indent=2))
+    elif args.output is not None:
+        print(
+            f"✅ Wrote {args.output}: ~{assembly.tokens} tokens "
+            f"({len(assembly.sections)} sections, full prompt "
+            f"~{assembly.source_tokens} tokens)"
+        )
+    else:
+        sys.stdout.write(assembly.text)
+    return 0
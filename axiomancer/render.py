@@ -0,0 +1,276 @@
+"""Deterministic renderer for the ``{{VARIABLE}}`` placeholders in templates.
+
+Templates are compiled once into alternating literal and placeholder
+segments and cached by the SHA-256 of their content, so rendering a whole
+documentation set is a single string join per file. The assistant only has
+to produce the variables file; the boilerplate is never re-emitted.
+
+Placeholders without a value are left untouched, which keeps the
+lower-case runtime placeholders (``{{component}}``, ``{{test_summary}}``)
+that are meant to be filled in during ``summon``.
+
+In YAML templates, values are escaped for the double-quoted scalars they
+sit in, and a placeholder that makes up a whole quoted scalar
+(``"{{NAME}}"``) is replaced by the quoted value, or by a flow sequence or
+mapping for list and mapping values.
+"""
+
+import argparse
+import hashlib
+import json
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, List, Mapping, Sequence, Tuple
+
+from . import trace
+from ._yaml import load_data_file
+from .errors import TemplateError
+
+PLACEHOLDER_PATTERN = re.compile(r"\{\{\s*([A-Za-z_][A-Za-z0-9_]*)\s*\}\}")
+UNESCAPED_QUOTE = re.compile(r'(?<!\\)"')
+
+DEFAULT_TEMPLATE_DIR = Path(".axiomantic") / "templates"
+
+# Documents produced by Phase 3 of axiomancer.md. SUMMONER.md and
+# PROJECT_BOOTSTRAP.md are instructions for the assistant, not outputs.
+GENERATED_DOCUMENTS = (
+    "AGENT.md",
+    "SYSTEM_ARCHITECTURE.md",
+    "CONTRIBUTING.md",
+    "GRIMOIRE.md",
+    "STATUS_MANIFEST.yaml",
+    "GLOSSARY.md",
+)
+
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    """A template split into literals and the placeholders between them.
+
+    ``literals`` always has exactly one more element than ``names``; the
+    original placeholder text is kept in ``tokens`` so unresolved
+    placeholders are written back byte-for-byte. ``quoted`` tells for each
+    placeholder whether it sits inside a double-quoted string on its line.
+    """
+
+    digest: str
+    literals: Tuple[str, ...]
+    names: Tuple[str, ...]
+    tokens: Tuple[str, ...]
+    quoted: Tuple[bool, ...]
+
+    @property
+    def placeholders(self) -> FrozenSet[str]:
+        """Every distinct placeholder name used by the template."""
+        return frozenset(self.names)
+
+    def render(
+        self, variables: Mapping[str, Any], yaml: bool = False
+    ) -> Tuple[str, List[str]]:
+        """Substitute ``variables`` and return the text and unresolved names.
+
+        With ``yaml`` set, values inside double-quoted scalars are escaped.
+        """
+        parts = [self.literals[0]]
+        unresolved = []
+        for index, name in enumerate(self.names):
+            literal = self.literals[index + 1]
+            if name not in variables:
+                unresolved.append(name)
+                parts.append(self.tokens[index])
+            elif not (yaml and self.quoted[index]):
+                parts.append(format_value(variables[name]))
+            elif parts[-1].endswith('"') and literal.startswith('"'):
+                # The whole scalar: write it with its own quotes, or unquoted
+                # in flow syntax for lists and mappings
+                value = variables[name]
+                if not isinstance(value, (list, dict)):
+                    value = format_value(value)
+                parts[-1] = parts[-1][:-1]
+                parts.append(json.dumps(value, ensure_ascii=False))
+                literal = literal[1:]
+            else:
+                quoted = json.dumps(format_value(variables[name]), ensure_ascii=False)
+                parts.append(quoted[1:-1])
+            parts.append(literal)
+        return "".join(parts), unresolved
+
+
+@dataclass(frozen=True)
+class RenderResult:
+    """Outcome of rendering one template."""
+
+    template: str
+    output: Path
+    unresolved: Tuple[str, ...]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "template": self.template,
+            "output": str(self.output),
+            "unresolved": list(self.unresolved),
+        }
+
+
+_compiled: Dict[str, CompiledTemplate] = {}
+
+
+def compile_template(text: str) -> CompiledTemplate:
+    """Compile ``text``, reusing a previous compilation of identical content."""
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    compiled = _compiled.get(digest)
+    if compiled is not None:
+        return compiled
+
+    literals = []
+    names = []
+    tokens = []
+    quoted = []
+    position = 0
+    for match in PLACEHOLDER_PATTERN.finditer(text):
+        literals.append(text[position : match.start()])
+        names.append(match.group(1))
+        tokens.append(match.group(0))
+        line = text[text.rfind("\n", 0, match.start()) + 1 : match.start()]
+        quoted.append(len(UNESCAPED_QUOTE.findall(line)) % 2 == 1)
+        position = match.end()
+    literals.append(text[position:])
+
+    compiled = CompiledTemplate(
+        digest, tuple(literals), tuple(names), tuple(tokens), tuple(quoted)
+    )
+    _compiled[digest] = compiled
+    return compiled
+
+
+def format_value(value: Any) -> str:
+    """Convert a variables-file value to the text substituted into templates.
+
+    Scalars are written as-is (booleans in YAML spelling); lists and
+    mappings become JSON, which is also valid YAML flow syntax for
+    placeholders such as ``{{DEPENDENCY_BOTTLENECKS}}``.
+    """
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+
+def load_variables(path: Path) -> Dict[str, Any]:
+    """Load a flat YAML or JSON mapping of placeholder names to values.
+
+    Values are kept as loaded; rendering formats them with ``format_value``.
+    """
+    data = load_data_file(path)
+    if data is None:
+        return {}
+    if not isinstance(data, dict):
+        raise TemplateError(f"{path} must contain a mapping of variable names")
+    variables = {}
+    for name, value in data.items():
+        if not isinstance(name, str) or not PLACEHOLDER_PATTERN.fullmatch(
+            "{{" + name + "}}"
+        ):
+            raise TemplateError(f"Invalid variable name in {path}: {name!r}")
+        variables[name] = value
+    return variables
+
+
+def render_documents(
+    variables: Mapping[str, Any],
+    template_dir: Path = DEFAULT_TEMPLATE_DIR,
+    output_dir: Path = Path("."),
+    names: Sequence[str] = GENERATED_DOCUMENTS,
+    strict: bool = False,
+) -> List[RenderResult]:
+    """Render ``names`` from ``template_dir`` into ``output_dir`` in one pass.
+
+    With ``strict`` set, nothing is written if any placeholder is left
+    unresolved.
+    """
+    rendered = []
+    for name in names:
+        source = template_dir / name
+        try:
+            text = source.read_text(encoding="utf-8")
+        except OSError as exc:
+            raise TemplateError(
+                f"Cannot read template {source}: {exc.strerror}"
+            ) from None
+        output, unresolved = compile_template(text).render(
+            variables, yaml=source.suffix in (".yaml", ".yml")
+        )
+        result = RenderResult(name, output_dir / name, tuple(sorted(set(unresolved))))
+        rendered.append((result, output))
+
+    if strict:
+        missing = sorted({n for result, _ in rendered for n in result.unresolved})
+        if missing:
+            raise TemplateError("Unresolved placeholders: " + ", ".join(missing))
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for result, output in rendered:
+        result.output.write_text(output, encoding="utf-8")
+    return [result for result, _ in rendered]
+
+
+def register(subparsers: Any) -> None:
+    parser = subparsers.add_parser(
+        "render",
+        help="render templates from a variables file",
+        description="Render the generated documents from a YAML or JSON "
+        "variables file in a single pass.",
+    )
+    parser.add_argument("variables", type=Path, help="YAML or JSON variables file")
+    parser.add_argument(
+        "--templates",
+        type=Path,
+        default=DEFAULT_TEMPLATE_DIR,
+        help="template directory (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=Path("."),
+        help="directory to write documents to (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--only",
+        action="append",
+        metavar="NAME",
+        help="render only this template (repeatable)",
+    )
+    parser.add_argument(
+        "--strict",
+        action="store_true",
+        help="fail without writing if any placeholder is unresolved",
+    )
+    parser.add_argument("--json", action="store_true", help="print JSON results")
+    parser.set_defaults(func=run)
+
+
+def run(args: argparse.Namespace) -> int:
+    results = render_documents(
+        load_variables(args.variables),
+        template_dir=args.templates,
+        output_dir=args.output,
+        names=args.only or GENERATED_DOCUMENTS,
+        strict=args.strict,
+    )
+    trace.annotate(files_written=len(results))
+    if args.json:
+        print(json.dumps([result.to_dict() for result in results], indent=2))
+        return 0
+    for result in results:
+        if result.unresolved:
+            print(
+                f"⚠️  {result.output}: {len(result.unresolved)} unresolved "
+                f"({', '.join(result.unresolved)})"
+            )
+        else:
+            print(f"✅ {result.output}")
+    return 0
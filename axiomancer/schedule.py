@@ -0,0 +1,356 @@
+"""Parallel summon scheduler over the component dependency DAG.
+
+The selected components are layered into topological waves. Every
+component is summoned as soon as its dependencies inside the selection have
+succeeded, with at most ``workers`` summons running at once. Each summon
+runs in its own ``git worktree`` on a ``summon/<component>`` branch that
+starts from the base commit with the branches of its in-run dependencies
+merged in, so dependents build on the code they need.
+
+Status transitions (``PLANNED`` -> ``IN_PROGRESS`` -> ``USER_REVIEW``, or back
+to ``PLANNED`` on failure) are applied only to the manifest of the main
+checkout, through the locked atomic update in :mod:`axiomancer.manifest`.
+Changes a summon makes to its own copy of the manifest are not committed.
+A failed summon removes its worktree and branch, so the component can be
+scheduled again; its log is kept.
+"""
+
+import argparse
+import json
+import os
+import shlex
+import subprocess
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+from . import state
+from .errors import ManifestError, ScheduleError
+from .manifest import DEFAULT_MANIFEST, Manifest, update_status
+
+DEFAULT_COMMAND = 'claude -p "summon {component}"'
+BRANCH_PREFIX = "summon/"
+WORKTREES_DIR = "worktrees"
+LOGS_DIR = "summons"
+
+
+@dataclass
+class SummonResult:
+    """Outcome of one component's summon."""
+
+    component: str
+    outcome: str
+    seconds: float = 0.0
+    branch: Optional[str] = None
+    worktree: Optional[str] = None
+    log: Optional[str] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {key: value for key, value in asdict(self).items() if value is not None}
+        data["seconds"] = round(self.seconds, 3)
+        return data
+
+
+def select(
+    manifest: Manifest, components: Sequence[str] = (), phase: Optional[str] = None
+) -> List[str]:
+    """Components to schedule: the given ids, a phase's PLANNED components,
+    or every PLANNED component.
+    """
+    if components:
+        selected = list(components)
+        for component_id in selected:
+            if manifest.get(component_id).status != "PLANNED":
+                raise ScheduleError(
+                    f"{component_id} is {manifest.components[component_id].status}, "
+                    "not PLANNED"
+                )
+        return selected
+    if phase is not None:
+        if phase not in manifest.phases:
+            raise ScheduleError(f"Unknown phase: {phase}")
+        members = manifest.phases[phase]
+        for component_id in members:
+            manifest.get(component_id)
+    else:
+        members = list(manifest.components)
+    return [cid for cid in members if manifest.components[cid].status == "PLANNED"]
+
+
+def plan_waves(manifest: Manifest, selected: Sequence[str]) -> List[List[str]]:
+    """Layer ``selected`` into waves of mutually independent components.
+
+    Dependencies outside the selection must already be COMPLETED.
+    """
+    chosen = set(selected)
+    blocked = {
+        cid: [
+            dep
+            for dep in manifest.components[cid].dependencies
+            if dep not in chosen
+            and (dep not in manifest.components or not manifest.is_complete(dep))
+        ]
+        for cid in selected
+    }
+    blocked = {cid: deps for cid, deps in blocked.items() if deps}
+    if blocked:
+        details = "; ".join(
+            f"{cid} needs {', '.join(deps)}" for cid, deps in sorted(blocked.items())
+        )
+        raise ScheduleError(f"Dependencies are not COMPLETED: {details}")
+
+    pending = {
+        cid: {dep for dep in manifest.components[cid].dependencies if dep in chosen}
+        for cid in selected
+    }
+    waves = []
+    while pending:
+        wave = sorted(cid for cid, deps in pending.items() if not deps)
+        if not wave:
+            raise ScheduleError(
+                "Dependency cycle between: " + ", ".join(sorted(pending))
+            )
+        waves.append(wave)
+        for cid in wave:
+            del pending[cid]
+        for deps in pending.values():
+            deps.difference_update(wave)
+    return waves
+
+
+def _git(cwd: Path, *args: str) -> str:
+    result = subprocess.run(
+        ["git", *args], cwd=cwd, capture_output=True, text=True, check=False
+    )
+    if result.returncode != 0:
+        message = result.stderr.strip().splitlines()
+        raise ScheduleError(
+            f"git {args[0]} failed: {message[-1] if message else result.returncode}"
+        )
+    return result.stdout
+
+
+class Scheduler:
+    """Runs summons for one project root and manifest."""
+
+    def __init__(
+        self,
+        root: Path,
+        manifest_path: Path,
+        command: Sequence[str],
+        workers: int = 2,
+        base: str = "HEAD",
+    ) -> None:
+        if workers < 1:
+            raise ScheduleError("--workers must be at least 1")
+        self.root = root
+        self.manifest_path = manifest_path
+        self.command = list(command)
+        self.workers = workers
+        self.base = base
+        # git does not lock .git/worktrees; add and remove them one at a time
+        self._git_lock = threading.Lock()
+        try:
+            self.manifest_in_tree: Optional[str] = (
+                manifest_path.resolve().relative_to(root.resolve()).as_posix()
+            )
+        except ValueError:
+            self.manifest_in_tree = None
+
+    def run(
+        self, manifest: Manifest, waves: Sequence[Sequence[str]]
+    ) -> List[SummonResult]:
+        """Summon every component of ``waves``; results are in wave order."""
+        _git(self.root, "rev-parse", "--verify", "--quiet", self.base)
+        order = [cid for wave in waves for cid in wave]
+        chosen = set(order)
+        waiting = {
+            cid: {d for d in manifest.components[cid].dependencies if d in chosen}
+            for cid in order
+        }
+        in_run = {cid: sorted(deps) for cid, deps in waiting.items()}
+        dependents: Dict[str, List[str]] = {cid: [] for cid in order}
+        for cid, deps in waiting.items():
+            for dep in deps:
+                dependents[dep].append(cid)
+
+        results: Dict[str, SummonResult] = {}
+        started: Set[str] = set()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            running: Dict[Future, str] = {}
+
+            def start_ready() -> None:
+                for cid in order:
+                    if cid not in started and cid not in results and not waiting[cid]:
+                        started.add(cid)
+                        running[pool.submit(self.summon, cid, in_run[cid])] = cid
+
+            start_ready()
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    cid = running.pop(future)
+                    results[cid] = future.result()
+                    if results[cid].outcome == "succeeded":
+                        for dependent in dependents[cid]:
+                            waiting[dependent].discard(cid)
+                    else:
+                        self._skip_dependents(cid, dependents, results)
+                start_ready()
+        return [results[cid] for cid in order]
+
+    @staticmethod
+    def _skip_dependents(
+        failed: str, dependents: Dict[str, List[str]], results: Dict[str, SummonResult]
+    ) -> None:
+        pending = list(dependents[failed])
+        while pending:
+            cid = pending.pop()
+            if cid not in results:
+                results[cid] = SummonResult(
+                    cid, "skipped", error=f"dependency {failed} did not succeed"
+                )
+                pending.extend(dependents[cid])
+
+    def summon(self, component: str, dependencies: Sequence[str]) -> SummonResult:
+        """Run one summon in a fresh worktree and record its status."""
+        started = time.perf_counter()
+        directory = state.state_dir(self.root)
+        worktree = directory / WORKTREES_DIR / component
+        log = directory / LOGS_DIR / f"{component}.log"
+        log.parent.mkdir(parents=True, exist_ok=True)
+        branch = BRANCH_PREFIX + component
+        result = SummonResult(
+            component, "succeeded", branch=branch, worktree=str(worktree), log=str(log)
+        )
+
+        created = False
+        try:
+            update_status(self.manifest_path, {component: "IN_PROGRESS"})
+            with self._git_lock:
+                _git(
+                    self.root, "worktree", "add", "-b", branch, str(worktree), self.base
+                )
+            created = True
+            for dependency in dependencies:
+                _git(worktree, "merge", "--no-edit", BRANCH_PREFIX + dependency)
+            argv = [arg.replace("{component}", component) for arg in self.command]
+            env = dict(os.environ, AXIOMANCER_COMPONENT=component)
+            with log.open("w", encoding="utf-8") as handle:
+                returncode = subprocess.run(
+                    argv,
+                    cwd=worktree,
+                    env=env,
+                    stdin=subprocess.DEVNULL,
+                    stdout=handle,
+                    stderr=subprocess.STDOUT,
+                    check=False,
+                ).returncode
+            if returncode != 0:
+                raise ScheduleError(f"summon command exited with status {returncode}")
+            self._commit(worktree, component)
+            update_status(self.manifest_path, {component: "USER_REVIEW"})
+        except (ScheduleError, ManifestError, OSError) as exc:
+            result.outcome = "failed"
+            result.error = str(exc)
+            result.branch = result.worktree = None
+            if created:
+                self._discard(worktree, branch)
+            try:
+                update_status(self.manifest_path, {component: "PLANNED"})
+            except (ManifestError, OSError):
+                pass
+        result.seconds = time.perf_counter() - started
+        return result
+
+    def _discard(self, worktree: Path, branch: str) -> None:
+        # Best effort: the summon has already failed with a better message.
+        with self._git_lock:
+            for args in (
+                ["worktree", "remove", "--force", str(worktree)],
+                ["branch", "-D", branch],
+            ):
+                subprocess.run(
+                    ["git", *args], cwd=self.root, capture_output=True, check=False
+                )
+
+    def _commit(self, worktree: Path, component: str) -> None:
+        pathspec = ["."]
+        if self.manifest_in_tree:
+            pathspec.append(f":(exclude){self.manifest_in_tree}")
+        _git(worktree, "add", "-A", "--", *pathspec)
+        staged = subprocess.run(
+            ["git", "diff", "--cached", "--quiet"], cwd=worktree, check=False
+        )
+        if staged.returncode != 0:
+            _git(worktree, "commit", "-q", "-m", f"Summon {component}")
+
+
+def register(subparsers: Any) -> None:
+    parser = subparsers.add_parser(
+        "schedule",
+        help="summon independent components in parallel worktrees",
+        description="Layer PLANNED components into dependency waves and summon "
+        "independent ones concurrently, each in its own git worktree.",
+    )
+    parser.add_argument(
+        "components", nargs="*", help="component ids (default: all PLANNED)"
+    )
+    parser.add_argument("--phase", help="schedule the PLANNED components of a phase")
+    parser.add_argument(
+        "--manifest",
+        type=Path,
+        default=DEFAULT_MANIFEST,
+        help=f"manifest file (default: {DEFAULT_MANIFEST})",
+    )
+    parser.add_argument(
+        "--root", type=Path, default=Path("."), help="git repository root"
+    )
+    parser.add_argument(
+        "-j", "--workers", type=int, default=2, help="concurrent summons (default: 2)"
+    )
+    parser.add_argument(
+        "--command",
+        default=DEFAULT_COMMAND,
+        help="summon command run in each worktree; {component} is replaced "
+        f"(default: {DEFAULT_COMMAND})",
+    )
+    parser.add_argument(
+        "--base", default="HEAD", help="commit the worktrees start from"
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="print the waves without running"
+    )
+    parser.set_defaults(func=run)
+
+
+def run(args: argparse.Namespace) -> int:
+    if args.components and args.phase:
+        raise ScheduleError("Give component ids or --phase, not both")
+    manifest = Manifest.load(args.manifest)
+    waves = plan_waves(manifest, select(manifest, args.components, args.phase))
+    if args.dry_run:
+        print(json.dumps({"waves": waves}, indent=2))
+        return 0
+
+    started = time.perf_counter()
+    scheduler = Scheduler(
+        args.root,
+        args.manifest,
+        shlex.split(args.command),
+        workers=args.workers,
+        base=args.base,
+    )
+    results = scheduler.run(manifest, waves)
+    report = {
+        "waves": waves,
+        "workers": args.workers,
+        "seconds": round(time.perf_counter() - started, 3),
+        "results": [result.to_dict() for result in results],
+    }
+    print(json.dumps(report, indent=2))
+    return 0 if all(result.outcome == "succeeded" for result in results) else 1
@@ -0,0 +1,70 @@
+"""Heading-level structure of generated markdown documents."""
+
+import re
+from dataclasses import dataclass
+from typing import List, Optional
+
+_HEADING = re.compile(r"^(#{1,6})[ \t]+(.+?)[ \t#]*$")
+_FENCE = re.compile(r"^ {0,3}(`{3,}|~{3,})")
+
+
+@dataclass(frozen=True)
+class Section:
+    """A heading and the text up to the next heading of any level.
+
+    ``start`` and ``end`` are character offsets into the document, ``line``
+    is the 1-based line of the heading.
+    """
+
+    level: int
+    title: str
+    line: int
+    start: int
+    end: int
+
+
+def update_fence(fence: Optional[str], line: str) -> Optional[str]:
+    """The code fence marker open after ``line``, given the one open before.
+
+    A fence only closes on a line of the same character, at least as long as
+    the opening marker and with nothing after it, so a shorter or different
+    marker inside a block is part of its content.
+    """
+    match = _FENCE.match(line)
+    if match is None:
+        return fence
+    marker = match.group(1)
+    if fence is None:
+        return marker
+    if marker[0] == fence[0] and len(marker) >= len(fence):
+        if not line.strip()[len(marker) :].strip():
+            return None
+    return fence
+
+
+def split_sections(text: str) -> List[Section]:
+    """Split markdown into sections, ignoring ``#`` lines inside code fences.
+
+    Text before the first heading is returned as a level-0 section with an
+    empty title when it is not blank.
+    """
+    headings = []
+    offset = 0
+    fence: Optional[str] = None
+    for number, line in enumerate(text.splitlines(keepends=True), start=1):
+        opened, fence = fence, update_fence(fence, line)
+        if opened is None and fence is None:
+            match = _HEADING.match(line.rstrip("\r\n"))
+            if match:
+                headings.append(
+                    (len(match.group(1)), match.group(2).strip(), number, offset)
+                )
+        offset += len(line)
+
+    sections = []
+    if text[: headings[0][3] if headings else len(text)].strip():
+        sections.append(Section(0, "", 1, 0, headings[0][3] if headings else len(text)))
+    for index, (level, title, number, start) in enumerate(headings):
+        end = headings[index + 1][3] if index + 1 < len(headings) else len(text)
+        sections.append(Section(level, title, number, start, end))
+    return sections
@@ -0,0 +1,88 @@
+"""Per-project state kept between tool runs.
+
+Indexes and caches live in ``.axiomancer_cache/`` at the project root. Unlike
+``.axiomantic/`` it survives the post-bootstrap cleanup, so later
+``summon`` and update runs can reuse it. The directory ignores itself, so it
+never shows up in ``git status``.
+"""
+
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the in-process locks apply.
+    fcntl = None  # type: ignore[assignment]
+
+STATE_DIR_NAME = ".axiomancer_cache"
+
+# Read once at import: os.umask can only be queried by setting it, which is
+# not safe once worker threads are running.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def state_dir(root: Path) -> Path:
+    """Return the state directory under ``root``, creating it on first use."""
+    path = root / STATE_DIR_NAME
+    if not path.is_dir():
+        path.mkdir(parents=True, exist_ok=True)
+        (path / ".gitignore").write_text("# Created by axiomancer\n*\n")
+    return path
+
+
+def read_json(path: Path, default: Any = None) -> Any:
+    """Load a JSON file, returning ``default`` if it is missing or corrupt."""
+    try:
+        with path.open(encoding="utf-8") as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return default
+
+
+def write_bytes(path: Path, data: bytes) -> None:
+    """Replace ``path`` atomically: readers see the old or the new file, never
+    half of one.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+        if path.exists():
+            os.chmod(tmp_name, path.stat().st_mode & 0o7777)
+        else:
+            # mkstemp creates 0600; give new files the usual permissions.
+            os.chmod(tmp_name, 0o666 & ~_UMASK)
+        os.replace(tmp_name, path)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+
+
+def write_text(path: Path, text: str) -> None:
+    """Write UTF-8 text atomically, without newline translation."""
+    write_bytes(path, text.encode("utf-8"))
+
+
+def write_json(path: Path, data: Any) -> None:
+    """Write compact JSON atomically."""
+    write_text(path, json.dumps(data, separators=(",", ":"), sort_keys=True))
+
+
+@contextmanager
+def file_lock(path: Path) -> Iterator[None]:
+    """Hold an exclusive advisory lock on ``path`` for the ``with`` block."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a") as handle:
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_UN)
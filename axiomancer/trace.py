@@ -0,0 +1,313 @@
+"""JSONL tracing of installs, bootstrap phases and tool runs.
+
+Tracing is off unless ``AXIOMANCER_TRACE`` names a file. Each finished span
+is then appended to it as one JSON line::
+
+    {"trace": "...", "span": "cli.prompt", "start": 1700000000.12,
+     "duration": 0.041, "status": "ok", "attrs": {"tokens": 4812}}
+
+``install.sh`` writes its own spans (``install.fetch``, ``install.store``,
+``install.target``, ...) to the same file, every command of this package is
+a ``cli.<command>`` span, and ``trace begin``/``trace end`` bracket the
+phases of a bootstrap, which happen in the assistant rather than in any one
+process. A trace id groups the spans of one run (see ``trace_id``).
+
+``trace report`` aggregates any number of trace files into per-span
+percentiles and attribute means.
+"""
+
+import argparse
+import json
+import os
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from . import state
+from .errors import TraceError
+
+TRACE_ENV = "AXIOMANCER_TRACE"
+TRACE_ID_ENV = "AXIOMANCER_TRACE_ID"
+PERCENTILES = (50, 90, 99)
+
+_active: List[Dict[str, Any]] = []
+
+
+def trace_path() -> Optional[Path]:
+    """The trace file, or None when tracing is off."""
+    value = os.environ.get(TRACE_ENV)
+    return Path(value).absolute() if value else None
+
+
+def trace_id(new: bool = False) -> str:
+    """Id of the current run, or of a ``new`` one.
+
+    The id is taken from ``AXIOMANCER_TRACE_ID``, else from the ``.id`` file
+    next to the trace, which ``install.sh`` and ``trace begin --new`` write
+    so that separate commands of one bootstrap share a run.
+    """
+    value = "" if new else os.environ.get(TRACE_ID_ENV, "")
+    path = trace_path()
+    id_file = None if path is None else path.with_name(path.name + ".id")
+    if not value and not new and id_file is not None:
+        try:
+            value = id_file.read_text(encoding="utf-8").strip()
+        except OSError:
+            pass
+    if not value:
+        value = uuid.uuid4().hex[:16]
+        if id_file is not None:
+            state.write_text(id_file, value + "\n")
+    os.environ[TRACE_ID_ENV] = value
+    return value
+
+
+def _io_counters() -> Dict[str, int]:
+    """Bytes this process has read and written so far, where the OS says."""
+    try:
+        with open("/proc/self/io", encoding="ascii") as handle:
+            fields = dict(line.split(": ") for line in handle.read().splitlines())
+    except (OSError, ValueError):
+        return {}
+    return {"bytes_read": int(fields["rchar"]), "bytes_written": int(fields["wchar"])}
+
+
+def write_span(path: Path, record: Dict[str, Any]) -> None:
+    """Append one span. A single short ``O_APPEND`` write, so concurrent
+    writers do not interleave.
+    """
+    line = json.dumps(record, separators=(",", ":"), sort_keys=True) + "\n"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o666)
+    try:
+        os.write(fd, line.encode("utf-8"))
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Dict[str, Any]]:
+    """Time the ``with`` block as span ``name`` if tracing is on.
+
+    Yields the span's attributes, which the block (or ``annotate``) may add
+    to. A block that raises is recorded with status ``error``.
+    """
+    path = trace_path()
+    if path is None:
+        yield attrs
+        return
+    started = time.time()
+    clock = time.perf_counter()
+    before = _io_counters()
+    _active.append(attrs)
+    status = "ok"
+    try:
+        yield attrs
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        _active.pop()
+        after = _io_counters()
+        for key, value in after.items():
+            attrs.setdefault(key, value - before[key])
+        record = {
+            "trace": trace_id(),
+            "span": name,
+            "start": round(started, 6),
+            "duration": round(time.perf_counter() - clock, 6),
+            "status": status,
+            "attrs": attrs,
+        }
+        write_span(path, record)
+
+
+def annotate(**attrs: Any) -> None:
+    """Add attributes to the innermost open span, if any."""
+    if _active:
+        _active[-1].update(attrs)
+
+
+def _open_spans_path(path: Path) -> Path:
+    return path.with_name(path.name + ".open")
+
+
+def begin(name: str, attrs: Dict[str, Any], new_run: bool = False) -> None:
+    """Open span ``name`` of the current run, or of a new one; ``end``
+    records it.
+    """
+    path = trace_path()
+    if path is None:
+        return
+    if new_run:
+        trace_id(new=True)
+    pending = _open_spans_path(path)
+    with state.file_lock(pending.with_name(pending.name + ".lock")):
+        spans = state.read_json(pending, {})
+        spans[f"{trace_id()}/{name}"] = {"start": time.time(), "attrs": attrs}
+        state.write_json(pending, spans)
+
+
+def end(name: str, attrs: Dict[str, Any], status: str = "ok") -> Optional[float]:
+    """Close span ``name`` opened by ``begin``; returns its duration."""
+    path = trace_path()
+    if path is None:
+        return None
+    pending = _open_spans_path(path)
+    with state.file_lock(pending.with_name(pending.name + ".lock")):
+        spans = state.read_json(pending, {})
+        opened = spans.pop(f"{trace_id()}/{name}", None)
+        if opened is None:
+            raise TraceError(f"Span {name} was not begun in trace {trace_id()}")
+        state.write_json(pending, spans)
+    duration = time.time() - opened["start"]
+    record = {
+        "trace": trace_id(),
+        "span": name,
+        "start": round(opened["start"], 6),
+        "duration": round(duration, 6),
+        "status": status,
+        "attrs": {**opened["attrs"], **attrs},
+    }
+    write_span(path, record)
+    return duration
+
+
+def read_spans(paths: Iterable[Path]) -> Iterator[Dict[str, Any]]:
+    """Spans from trace files, and from the ``*.jsonl`` files of directories.
+
+    Lines that are not complete spans (a run killed mid-write) are skipped.
+    """
+    for path in paths:
+        files = sorted(path.glob("*.jsonl")) if path.is_dir() else [path]
+        for file in files:
+            try:
+                handle = file.open(encoding="utf-8")
+            except OSError as exc:
+                raise TraceError(f"Cannot read {file}: {exc.strerror}") from None
+            with handle:
+                for line in handle:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if isinstance(record, dict) and "span" in record:
+                        yield record
+
+
+def percentile(ordered: List[float], percent: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    rank = max(1, -(-len(ordered) * percent // 100))
+    return ordered[int(rank) - 1]
+
+
+def report(spans: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Per span name: count, failures, duration percentiles and the mean of
+    every numeric attribute.
+    """
+    durations: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    sums: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+    counts: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    traces = set()
+    for record in spans:
+        name = record["span"]
+        traces.add(record.get("trace"))
+        durations[name].append(float(record.get("duration", 0)))
+        if record.get("status", "ok") != "ok":
+            errors[name] += 1
+        for key, value in (record.get("attrs") or {}).items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                sums[name][key] += value
+                counts[name][key] += 1
+
+    rows = {}
+    for name in sorted(durations):
+        ordered = sorted(durations[name])
+        rows[name] = {
+            "count": len(ordered),
+            "errors": errors.get(name, 0),
+            **{f"p{p}": round(percentile(ordered, p), 6) for p in PERCENTILES},
+            "max": round(ordered[-1], 6),
+            "total": round(sum(ordered), 6),
+            "attrs": {
+                key: round(total / counts[name][key], 3)
+                for key, total in sorted(sums.get(name, {}).items())
+            },
+        }
+    return {"traces": len(traces), "spans": rows}
+
+
+def _attributes(pairs: Optional[List[str]]) -> Dict[str, Any]:
+    attrs: Dict[str, Any] = {}
+    for pair in pairs or ():
+        key, separator, value = pair.partition("=")
+        if not separator or not key:
+            raise TraceError(f"Attributes are KEY=VALUE, got {pair!r}")
+        try:
+            attrs[key] = json.loads(value)
+        except ValueError:
+            attrs[key] = value
+    return attrs
+
+
+def register(subparsers: Any) -> None:
+    parser = subparsers.add_parser(
+        "trace",
+        help="record bootstrap phase spans and report trace percentiles",
+        description=f"Spans are written to the JSONL file named by ${TRACE_ENV}; "
+        "without it, begin and end do nothing.",
+    )
+    actions = parser.add_subparsers(dest="action", metavar="ACTION", required=True)
+    for action, text in (("begin", "open a span"), ("end", "close a span")):
+        sub = actions.add_parser(action, help=text)
+        sub.add_argument("name", help="span name, e.g. phase.analysis")
+        sub.add_argument(
+            "--attr", action="append", metavar="KEY=VALUE", help="span attribute"
+        )
+        if action == "begin":
+            sub.add_argument(
+                "--new", action="store_true", help="start a new run (trace id)"
+            )
+        else:
+            sub.add_argument("--status", choices=("ok", "error"), default="ok")
+    summary = actions.add_parser("report", help="percentiles per span")
+    summary.add_argument(
+        "paths", type=Path, nargs="+", help="trace files or directories of them"
+    )
+    summary.add_argument("--json", action="store_true", help="print JSON results")
+    parser.set_defaults(func=run)
+
+
+def run(args: argparse.Namespace) -> int:
+    if args.action == "begin":
+        begin(args.name, _attributes(args.attr), args.new)
+        return 0
+    if args.action == "end":
+        end(args.name, _attributes(args.attr), args.status)
+        return 0
+
+    result = report(read_spans(args.paths))
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return 0
+    if not result["spans"]:
+        print("No spans found")
+        return 0
+    print(f"{result['traces']} traces")
+    print(
+        f"{'span':<28} {'count':>6} {'errors':>6} "
+        + " ".join(f"{'p' + str(p):>9}" for p in PERCENTILES)
+        + f" {'max':>9}  means"
+    )
+    for name, row in result["spans"].items():
+        means = ", ".join(f"{key}={value:g}" for key, value in row["attrs"].items())
+        print(
+            f"{name:<28} {row['count']:>6} {row['errors']:>6} "
+            + " ".join(f"{row['p' + str(p)]:>8.3f}s" for p in PERCENTILES)
+            + f" {row['max']:>8.3f}s  {means}"
+        )
+    return 0
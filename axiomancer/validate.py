@@ -0,0 +1,273 @@
+"""Phase 4.5 template-completion validator.
+
+Every generated document is read once, line by line, and checked for
+leftover bootstrap placeholders and unbalanced code fences. The manifest is
+then parsed from the lines already read and checked for dependency ids
+that do not resolve, dependency cycles, phases naming unknown components
+and component ``location`` paths that do not exist.
+
+Lower-case placeholders such as ``{{component}}`` are filled at summon time
+and are not reported. A ``location`` that does not exist yet is only a
+warning for ``PLANNED`` components, whose code may still be to come.
+"""
+
+import argparse
+import json
+import re
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from . import trace
+from ._yaml import require_yaml
+from .errors import ManifestError
+from .manifest import Manifest, parse_components, parse_phases
+from .render import GENERATED_DOCUMENTS, PLACEHOLDER_PATTERN
+from .sections import update_fence
+
+MANIFEST_NAME = "STATUS_MANIFEST.yaml"
+OPTIONAL_DOCUMENTS = frozenset({"GLOSSARY.md"})
+
+_KEY = re.compile(r"^\s+[\"']?([\w.-]+)[\"']?:")
+
+
+@dataclass(frozen=True)
+class Issue:
+    """One validation finding; ``line`` is 1-based when known."""
+
+    document: str
+    line: Optional[int]
+    severity: str
+    check: str
+    message: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    def __str__(self) -> str:
+        where = f"{self.document}:{self.line}" if self.line else self.document
+        return f"{where}: {self.message}"
+
+
+def is_runtime_placeholder(name: str) -> bool:
+    """Lower-case placeholders are left for summon time by design."""
+    return name.islower()
+
+
+def scan_lines(
+    document: str, lines: Iterable[str], allowed: Iterable[str] = ()
+) -> List[Issue]:
+    """Check a document's lines for placeholders and, in markdown, fences."""
+    allowed = set(allowed)
+    markdown = document.endswith(".md")
+    issues = []
+    fence: Optional[Tuple[str, int]] = None
+    for number, line in enumerate(lines, start=1):
+        for match in PLACEHOLDER_PATTERN.finditer(line):
+            name = match.group(1)
+            if name in allowed or is_runtime_placeholder(name):
+                continue
+            issues.append(
+                Issue(
+                    document,
+                    number,
+                    "error",
+                    "placeholder",
+                    f"unresolved placeholder {{{{{name}}}}}",
+                )
+            )
+        if markdown:
+            marker = update_fence(fence[0] if fence else None, line)
+            if marker is None:
+                fence = None
+            elif fence is None:
+                fence = (marker, number)
+    if fence is not None:
+        issues.append(
+            Issue(document, fence[1], "error", "markdown", "code fence is never closed")
+        )
+    return issues
+
+
+def check_manifest(
+    root: Path, document: str, text: str, key_lines: Dict[str, int]
+) -> List[Issue]:
+    """Parse the manifest and check its components resolve."""
+    yaml = require_yaml()
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    try:
+        data = yaml.load(text, Loader=loader)
+    except yaml.YAMLError as exc:
+        mark = getattr(exc, "problem_mark", None)
+        line = mark.line + 1 if mark is not None else None
+        problem = getattr(exc, "problem", None) or str(exc)
+        return [Issue(document, line, "error", "yaml", f"invalid YAML: {problem}")]
+    try:
+        manifest = Manifest(parse_components(data, document), phases=parse_phases(data))
+    except ManifestError as exc:
+        return [Issue(document, None, "error", "yaml", str(exc))]
+
+    issues = []
+    for component_id, missing in sorted(manifest.missing.items()):
+        issues.append(
+            Issue(
+                document,
+                key_lines.get(component_id),
+                "error",
+                "dependency",
+                f"{component_id} depends on unknown {', '.join(missing)}",
+            )
+        )
+    for cycle in manifest.cycles():
+        issues.append(
+            Issue(
+                document,
+                key_lines.get(cycle[0]),
+                "error",
+                "dependency",
+                "dependency cycle: " + " -> ".join(cycle + cycle[:1]),
+            )
+        )
+    for phase, members in sorted(manifest.phases.items()):
+        unknown = [cid for cid in members if cid not in manifest.components]
+        if unknown:
+            issues.append(
+                Issue(
+                    document,
+                    key_lines.get(phase),
+                    "error",
+                    "dependency",
+                    f"phase {phase} lists unknown {', '.join(unknown)}",
+                )
+            )
+
+    for component in manifest.components.values():
+        line = key_lines.get(component.id)
+        locations = component.location
+        if not isinstance(locations, list):
+            locations = [locations]
+        locations = [loc for loc in locations if isinstance(loc, str) and loc.strip()]
+        if not locations:
+            issues.append(
+                Issue(
+                    document,
+                    line,
+                    "warning",
+                    "location",
+                    f"{component.id} has no location",
+                )
+            )
+        for location in locations:
+            if PLACEHOLDER_PATTERN.search(location) or (root / location).exists():
+                continue
+            planned = component.status == "PLANNED"
+            issues.append(
+                Issue(
+                    document,
+                    line,
+                    "warning" if planned else "error",
+                    "location",
+                    f"{component.id} location {location} does not exist",
+                )
+            )
+    return issues
+
+
+def validate(
+    root: Path,
+    documents: Sequence[str] = GENERATED_DOCUMENTS,
+    allowed: Iterable[str] = (),
+) -> List[Issue]:
+    """Validate the generated documents under ``root``."""
+    allowed = set(allowed)
+    issues: List[Issue] = []
+    for document in documents:
+        path = root / document
+        is_manifest = document == MANIFEST_NAME
+        collected: List[str] = []
+        key_lines: Dict[str, int] = {}
+
+        def lines(handle: Iterable[str]) -> Iterable[str]:
+            for number, line in enumerate(handle, start=1):
+                if is_manifest:
+                    collected.append(line)
+                    match = _KEY.match(line)
+                    if match:
+                        key_lines.setdefault(match.group(1), number)
+                yield line
+
+        try:
+            with path.open(encoding="utf-8", errors="replace") as handle:
+                found = scan_lines(document, lines(handle), allowed)
+        except OSError:
+            optional = document in OPTIONAL_DOCUMENTS
+            issues.append(
+                Issue(
+                    document,
+                    None,
+                    "warning" if optional else "error",
+                    "missing",
+                    "document is missing",
+                )
+            )
+            continue
+        issues.extend(found)
+        if is_manifest:
+            checked = check_manifest(root, document, "".join(collected), key_lines)
+            if any(issue.check == "placeholder" for issue in found):
+                # Bare {{X}} values are not valid YAML; the placeholders
+                # reported above are the cause, not a separate problem.
+                checked = [issue for issue in checked if issue.check != "yaml"]
+            issues.extend(checked)
+    return issues
+
+
+def register(subparsers: Any) -> None:
+    parser = subparsers.add_parser(
+        "validate",
+        help="check generated documents are complete (Phase 4.5)",
+        description="Check the generated documents for leftover placeholders "
+        "and broken markdown, and the status manifest for unresolved "
+        "dependencies and locations.",
+    )
+    parser.add_argument(
+        "root", nargs="?", type=Path, default=Path("."), help="project root"
+    )
+    parser.add_argument(
+        "--only",
+        action="append",
+        metavar="NAME",
+        help="validate only this document (repeatable)",
+    )
+    parser.add_argument(
+        "--allow",
+        action="append",
+        default=[],
+        metavar="PLACEHOLDER",
+        help="placeholder name that may remain (repeatable)",
+    )
+    parser.add_argument("--json", action="store_true", help="print JSON results")
+    parser.set_defaults(func=run)
+
+
+def run(args: argparse.Namespace) -> int:
+    documents = args.only or GENERATED_DOCUMENTS
+    issues = validate(args.root, documents, args.allow)
+    errors = sum(1 for issue in issues if issue.severity == "error")
+    trace.annotate(files_read=len(documents), errors=errors)
+    if args.json:
+        report = {
+            "ok": not errors,
+            "documents": list(documents),
+            "errors": errors,
+            "warnings": len(issues) - errors,
+            "issues": [issue.to_dict() for issue in issues],
+        }
+        print(json.dumps(report, indent=2))
+    else:
+        for issue in issues:
+            icon = "❌" if issue.severity == "error" else "⚠️ "
+            print(f"{icon} {issue}")
+        if not errors:
+            print(f"✅ {len(documents)} documents valid")
+    return 1 if errors else 0
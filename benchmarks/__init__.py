@@ -0,0 +1 @@
+"""Performance benchmarks for the installer and the axiomancer tooling."""
@@ -0,0 +1,7 @@
+"""Entry point for ``python3 -m benchmarks``."""
+
+import sys
+
+from .suite import main
+
+sys.exit(main())
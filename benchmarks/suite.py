@@ -0,0 +1,424 @@
+"""Install, render and manifest benchmarks with baseline comparison.
+
+Every benchmark is timed ``repeat`` times and reported by its median. Raw
+seconds depend on the machine, so each run also times a fixed CPU-bound
+calibration workload and comparisons use seconds per calibration unit:
+a baseline recorded on a laptop can be checked on a CI runner. A benchmark
+regresses when its normalized median exceeds the baseline's by more than
+the tolerance and by more than ``NOISE_FLOOR`` seconds.
+
+Usage::
+
+    python3 -m benchmarks                 # run and compare with the baseline
+    python3 -m benchmarks --save          # run and record a new baseline
+    python3 -m benchmarks --quick --only manifest
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from axiomancer import render
+from axiomancer.manifest import Manifest
+
+REPO = Path(__file__).resolve().parent.parent
+
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+FORMAT_VERSION = 1
+DEFAULT_TOLERANCE = 0.5
+NOISE_FLOOR = 0.02
+FLEET_JOBS = 4
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    """A named, timed callable; ``setup`` runs untimed before every call and
+    its result is passed to ``run``.
+    """
+
+    name: str
+    run: Callable[[Any], None]
+    setup: Callable[[], Any] = lambda: None
+
+
+def calibrate(repeat: int = 7) -> float:
+    """Fastest seconds of a fixed hashing and sorting workload.
+
+    The minimum rather than the median: interference only ever slows the
+    workload down, so the fastest run best reflects the machine.
+    """
+    data = bytes(range(256)) * 4096
+
+    def workload(_: Any) -> None:
+        digests = [hashlib.sha256(data[i:] + data[:i]).digest() for i in range(64)]
+        sorted(str(n * 7919 % 100003) for n in range(100000))
+        del digests
+
+    return min(measure(workload, 1) for _ in range(repeat))
+
+
+def measure(
+    run: Callable[[Any], None], repeat: int, setup: Callable[[], Any] = lambda: None
+) -> float:
+    """Median wall time of ``repeat`` calls to ``run``."""
+    timings = []
+    for _ in range(repeat):
+        prepared = setup()
+        started = time.perf_counter()
+        run(prepared)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+# Installer benchmarks -------------------------------------------------------
+
+
+def _run_install(args: Sequence[str], store: Path) -> None:
+    result = subprocess.run(
+        ["bash", str(REPO / "install.sh"), *args],
+        capture_output=True,
+        text=True,
+        env=dict(os.environ, AXIOMANCER_STORE_DIR=str(store)),
+        check=False,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"install.sh {' '.join(args)} failed:\n{result.stdout}")
+
+
+def _run_remote_install(target: Path, url: str, cache_dir: Path) -> None:
+    script = (REPO / "install.sh").read_text()
+    env = dict(
+        os.environ,
+        AXIOMANCER_BUNDLE_URL=url,
+        AXIOMANCER_CACHE_DIR=str(cache_dir),
+        AXIOMANCER_STORE_DIR=str(cache_dir / "store"),
+    )
+    result = subprocess.run(
+        ["bash", "-s", "--", str(target)],
+        input=script,
+        capture_output=True,
+        text=True,
+        env=env,
+        check=False,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"remote install failed:\n{result.stdout}")
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+@contextmanager
+def bundle_server(workdir: Path) -> Iterator[str]:
+    """Build a release bundle and serve it over local HTTP; yields its URL."""
+    served = workdir / "served"
+    subprocess.run(
+        ["bash", str(REPO / "build-bundle.sh"), "0.0.0-bench"],
+        cwd=REPO,
+        env=dict(os.environ, DIST_DIR=str(served)),
+        capture_output=True,
+        check=True,
+    )
+    handler = partial(_QuietHandler, directory=str(served))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/axiomancer.tar.gz"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def install_benchmarks(
+    workdir: Path, url: str, fleet_sizes: Sequence[int]
+) -> List[Benchmark]:
+    counter = iter(range(1 << 30))
+
+    def fresh(count: int = 1) -> List[Path]:
+        base = workdir / f"run-{next(counter)}"
+        targets = [base / f"target-{n}" for n in range(count)]
+        for target in targets:
+            target.mkdir(parents=True)
+        return targets
+
+    store = workdir / "store"
+    warm_cache = workdir / "warm-cache"
+    _run_install([str(fresh()[0])], store)
+    _run_remote_install(fresh()[0], url, warm_cache)
+    benchmarks = [
+        Benchmark("install.local", lambda t: _run_install([str(t[0])], store), fresh),
+        Benchmark(
+            "install.local.no-store",
+            lambda t: _run_install(["--no-store", str(t[0])], store),
+            fresh,
+        ),
+        Benchmark(
+            "install.remote.cold",
+            lambda t: _run_remote_install(t[0], url, t[0].parent / "cache"),
+            fresh,
+        ),
+        Benchmark(
+            "install.remote.warm",
+            lambda t: _run_remote_install(t[0], url, warm_cache),
+            fresh,
+        ),
+    ]
+    for size in fleet_sizes:
+        benchmarks.append(
+            Benchmark(
+                f"install.fleet[{size}]",
+                lambda t: _run_install(["-j", str(FLEET_JOBS), *map(str, t)], store),
+                partial(fresh, size),
+            )
+        )
+    return benchmarks
+
+
+# Tooling benchmarks ---------------------------------------------------------
+
+
+def synthetic_templates(directory: Path, scale: int) -> List[str]:
+    """Write every shipped template repeated ``scale`` times."""
+    directory.mkdir(parents=True, exist_ok=True)
+    names = []
+    for source in sorted((REPO / "templates").iterdir()):
+        (directory / source.name).write_text(source.read_text() * scale)
+        names.append(source.name)
+    return names
+
+
+def synthetic_variables() -> Dict[str, str]:
+    """A value for every placeholder in the shipped templates."""
+    names = set()
+    for source in (REPO / "templates").iterdir():
+        names.update(render.compile_template(source.read_text()).placeholders)
+    return {name: f"value of {name.lower()}" for name in sorted(names)}
+
+
+def synthetic_manifest(size: int) -> str:
+    """A manifest of ``size`` components in layers of ten, each depending on
+    two components of the previous layer.
+    """
+    statuses = ("COMPLETED", "IN_PROGRESS", "PLANNED", "PLANNED")
+    lines = ["components:"]
+    for n in range(size):
+        deps = [f"c{n - 10 - k}" for k in range(2) if n - 10 - k >= 0]
+        lines += [
+            f"  c{n}:",
+            f'    name: "Component {n}"',
+            f"    status: {statuses[n * 4 // size]}",
+            f"    dependencies: {json.dumps(deps)}",
+            f'    location: "src/c{n}"',
+        ]
+    return "\n".join(lines) + "\n"
+
+
+def tool_benchmarks(
+    workdir: Path, render_scales: Sequence[int], manifest_sizes: Sequence[int]
+) -> List[Benchmark]:
+    variables = synthetic_variables()
+    benchmarks = []
+    for scale in render_scales:
+        templates = workdir / f"templates-{scale}"
+        names = synthetic_templates(templates, scale)
+
+        def render_cold(
+            _: Any, templates: Path = templates, names: List[str] = names
+        ) -> None:
+            render._compiled.clear()
+            render.render_documents(variables, templates, workdir / "out", names)
+
+        benchmarks.append(Benchmark(f"render[{scale}x]", render_cold))
+    for size in manifest_sizes:
+        path = workdir / f"manifest-{size}.yaml"
+        path.write_text(synthetic_manifest(size))
+
+        def load(_: Any, path: Path = path) -> None:
+            Manifest.load(path, cache=False)
+
+        def query(manifest: Manifest) -> None:
+            manifest.ready()
+            manifest.critical_path()
+            manifest.bottlenecks()
+
+        benchmarks += [
+            Benchmark(f"manifest.load[{size}]", load),
+            Benchmark(
+                f"manifest.query[{size}]",
+                query,
+                lambda path=path: Manifest.load(path, cache=False),
+            ),
+        ]
+    return benchmarks
+
+
+# Running and comparing ------------------------------------------------------
+
+
+def run_suite(
+    only: Sequence[str] = (), quick: bool = False, repeat: Optional[int] = None
+) -> Dict[str, Any]:
+    """Run the benchmarks whose names start with one of ``only``."""
+    repeat = repeat or (3 if quick else 5)
+    fleet_sizes = (1, 4) if quick else (1, 4, 16)
+    render_scales = (1, 10) if quick else (1, 10, 50)
+    manifest_sizes = (100, 1000) if quick else (100, 1000, 5000)
+
+    def wanted(prefix: str) -> bool:
+        return not only or any(
+            prefix.startswith(o) or o.startswith(prefix) for o in only
+        )
+
+    results: Dict[str, Dict[str, Any]] = {}
+    with tempfile.TemporaryDirectory(prefix="axiomancer-bench-") as tmp:
+        workdir = Path(tmp)
+        benchmarks: List[Benchmark] = []
+        if wanted("render") or wanted("manifest"):
+            benchmarks += tool_benchmarks(workdir, render_scales, manifest_sizes)
+        if wanted("install"):
+            with bundle_server(workdir) as url:
+                installs = install_benchmarks(workdir, url, fleet_sizes)
+                _time_all(installs, only, repeat, results)
+        _time_all(benchmarks, only, repeat, results)
+    return {
+        "version": FORMAT_VERSION,
+        "calibration": calibrate(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": dict(sorted(results.items())),
+    }
+
+
+def _time_all(
+    benchmarks: Sequence[Benchmark],
+    only: Sequence[str],
+    repeat: int,
+    results: Dict[str, Dict[str, Any]],
+) -> None:
+    for benchmark in benchmarks:
+        if only and not any(benchmark.name.startswith(o) for o in only):
+            continue
+        seconds = measure(benchmark.run, repeat, benchmark.setup)
+        results[benchmark.name] = {"seconds": round(seconds, 6), "repeat": repeat}
+
+
+def fleet_scaling(report: Dict[str, Any]) -> Dict[str, float]:
+    """Seconds per target for each fleet size, to show how installs scale."""
+    scaling = {}
+    for name, result in report["results"].items():
+        if name.startswith("install.fleet["):
+            size = int(name[len("install.fleet[") : -1])
+            scaling[name] = round(result["seconds"] / size, 6)
+    return scaling
+
+
+def compare(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> List[Dict[str, Any]]:
+    """Compare every benchmark present in both reports.
+
+    Baseline seconds are scaled by the ratio of the calibrations before
+    comparing. Each row has ``regressed`` set when the benchmark is slower
+    than allowed.
+    """
+    if baseline.get("version") != FORMAT_VERSION:
+        raise ValueError("baseline was written by an incompatible version")
+    speed = current["calibration"] / baseline["calibration"]
+    rows = []
+    for name, result in current["results"].items():
+        if name not in baseline["results"]:
+            continue
+        expected = baseline["results"][name]["seconds"] * speed
+        seconds = result["seconds"]
+        ratio = seconds / expected if expected else 1.0
+        rows.append(
+            {
+                "name": name,
+                "seconds": seconds,
+                "expected": round(expected, 6),
+                "ratio": round(ratio, 3),
+                "regressed": ratio > 1 + tolerance and seconds - expected > NOISE_FLOOR,
+            }
+        )
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python3 -m benchmarks", description=__doc__.split("\n\n")[0]
+    )
+    parser.add_argument(
+        "--only",
+        action="append",
+        default=[],
+        metavar="PREFIX",
+        help="run benchmarks whose names start with PREFIX (repeatable)",
+    )
+    parser.add_argument(
+        "--quick", action="store_true", help="smaller sizes and fewer repeats"
+    )
+    parser.add_argument("--repeat", type=int, help="timed runs per benchmark")
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        default=BASELINE,
+        help="baseline file (default: benchmarks/baseline.json)",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help="allowed slowdown as a fraction (default: 0.5)",
+    )
+    parser.add_argument(
+        "--save", action="store_true", help="write the results as the baseline"
+    )
+    parser.add_argument("--output", type=Path, help="also write the results here")
+    args = parser.parse_args(argv)
+
+    report = run_suite(args.only, args.quick, args.repeat)
+    report["fleet_seconds_per_target"] = fleet_scaling(report)
+    text = json.dumps(report, indent=2) + "\n"
+    if args.output is not None:
+        args.output.write_text(text)
+    if args.save:
+        args.baseline.write_text(text)
+        print(f"✅ Saved {len(report['results'])} results to {args.baseline}")
+        return 0
+
+    try:
+        baseline = json.loads(args.baseline.read_text())
+    except FileNotFoundError:
+        print(text, end="")
+        print(f"⚠️  No baseline at {args.baseline}; run with --save to record one")
+        return 0
+    rows = compare(report, baseline, args.tolerance)
+    for row in rows:
+        icon = "❌" if row["regressed"] else "✅"
+        print(
+            f"{icon} {row['name']:<24} {row['seconds']:>9.4f}s "
+            f"(expected {row['expected']:.4f}s, x{row['ratio']})"
+        )
+    regressions = [row["name"] for row in rows if row["regressed"]]
+    if regressions:
+        print(f"❌ {len(regressions)} regressions: {', '.join(regressions)}")
+        return 1
+    return 0
@@ -0,0 +1,70 @@
+#!/bin/bash
+
+# Axiomancer Release Bundle Builder
+# Packs only the installable payload (axiomancer.md, templates/ and the
+# axiomancer tooling package) into a compressed, versioned tarball with a
+# SHA256SUMS manifest. install.sh streams this bundle straight into tar.
+#
+# Usage: ./build-bundle.sh [VERSION]   (default: git describe, or "dev")
+# Output: $DIST_DIR/axiomancer-VERSION.tar.gz, plus axiomancer.tar.gz for the
+#         "latest" release download URL and a .sha256 file for each, and
+#         .payload.sha256 files holding the payload digest (the SHA-256 of
+#         SHA256SUMS) that AXIOMANCER_SHA256 pins
+
+set -e
+
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+DIST_DIR="${DIST_DIR:-$SCRIPT_DIR/dist}"
+VERSION="${1:-$(git -C "$SCRIPT_DIR" describe --tags --always --dirty 2> /dev/null || echo dev)}"
+VERSION="${VERSION#v}"
+NAME="axiomancer-$VERSION"
+
+# Print the SHA-256 of the given file (or stdin)
+sha256_of() {
+    if command -v sha256sum &> /dev/null; then
+        sha256sum "$@"
+    else
+        shasum -a 256 "$@"
+    fi | cut -d ' ' -f 1
+}
+
+STAGE_DIR=$(mktemp -d)
+trap 'rm -rf "$STAGE_DIR"' EXIT
+
+echo "📦 Building axiomancer bundle $VERSION..."
+
+# Stage the payload
+PAYLOAD_DIR="$STAGE_DIR/$NAME"
+mkdir -p "$PAYLOAD_DIR/templates" "$PAYLOAD_DIR/axiomancer"
+cp "$SCRIPT_DIR/axiomancer.md" "$PAYLOAD_DIR/"
+cp "$SCRIPT_DIR/templates/"* "$PAYLOAD_DIR/templates/"
+cp "$SCRIPT_DIR/axiomancer/"*.py "$PAYLOAD_DIR/axiomancer/"
+echo "$VERSION" > "$PAYLOAD_DIR/VERSION"
+
+# Write the checksum manifest, sorted for reproducible output
+(
+    cd "$PAYLOAD_DIR"
+    find . -type f | sed 's|^\./||' | LC_ALL=C sort | while read -r file; do
+        echo "$(sha256_of "$file")  $file"
+    done > "$STAGE_DIR/SHA256SUMS"
+)
+mv "$STAGE_DIR/SHA256SUMS" "$PAYLOAD_DIR/SHA256SUMS"
+
+# Pack with normalized metadata so identical payloads give identical bundles
+mkdir -p "$DIST_DIR"
+find "$PAYLOAD_DIR" -exec touch -t 198001010000 {} +
+if tar --version 2> /dev/null | grep -q 'GNU tar'; then
+    tar -C "$STAGE_DIR" --sort=name --owner=0 --group=0 --numeric-owner -cf - "$NAME"
+else
+    tar -C "$STAGE_DIR" -cf - "$NAME"
+fi | gzip -n -9 > "$DIST_DIR/$NAME.tar.gz"
+cp "$DIST_DIR/$NAME.tar.gz" "$DIST_DIR/axiomancer.tar.gz"
+
+PAYLOAD_DIGEST=$(sha256_of "$PAYLOAD_DIR/SHA256SUMS")
+for bundle in "$NAME" "axiomancer"; do
+    echo "$(sha256_of "$DIST_DIR/$bundle.tar.gz")  $bundle.tar.gz" > "$DIST_DIR/$bundle.tar.gz.sha256"
+    echo "$PAYLOAD_DIGEST  SHA256SUMS" > "$DIST_DIR/$bundle.payload.sha256"
+done
+
+echo "✅ Built $DIST_DIR/$NAME.tar.gz ($(wc -c < "$DIST_DIR/$NAME.tar.gz" | tr -d ' ') bytes)"
+echo "🔒 Payload digest (AXIOMANCER_SHA256): $PAYLOAD_DIGEST"
@@ -3,6 +3,14 @@
 # Axiomancer Installation Script
 # Installs axiomancer templates and prompt in current directory
 # Can be run locally or via: curl -sSL https://raw.githubusercontent.com/axiomantic/axiomancer/main/install.sh | bash
+#
+# Fleet mode installs into many targets from a single download:
+#   ./install.sh --jobs 8 /srv/repo-a /srv/repo-b /srv/repo-c
+#   find /srv -maxdepth 1 -mindepth 1 -type d | ./install.sh -
+#
+# Installs are laid out once per payload in a content-addressed store on the
+# host and materialized into each target with reflinks or hardlinks where the
+# filesystem allows, falling back to plain copies.
 
 set -e  # Exit on any error
 
@@ -10,32 +18,419 @@ AXIOMANTIC_DIR=".axiomantic"
 CLAUDE_DIR=".claude"
 OPENCODE_DIR=".opencode"
 GITHUB_REPO="axiomantic/axiomancer"
-GITHUB_BRANCH="main"
+JOBS="${AXIOMANCER_JOBS:-4}"
+VERSION="${AXIOMANCER_VERSION:-latest}"
+if [[ "$VERSION" == "latest" ]]; then
+    DEFAULT_BUNDLE_URL="https://github.com/$GITHUB_REPO/releases/latest/download/axiomancer.tar.gz"
+else
+    DEFAULT_BUNDLE_URL="https://github.com/$GITHUB_REPO/releases/download/v${VERSION#v}/axiomancer-${VERSION#v}.tar.gz"
+fi
+BUNDLE_URL="${AXIOMANCER_BUNDLE_URL:-$DEFAULT_BUNDLE_URL}"
+# Used instead of the latest release bundle while no release has published one
+if [[ "$VERSION" == "latest" ]] && [[ -z "${AXIOMANCER_BUNDLE_URL:-}" ]]; then
+    DEFAULT_ARCHIVE_URL="https://github.com/$GITHUB_REPO/archive/refs/heads/main.tar.gz"
+fi
+ARCHIVE_URL="${AXIOMANCER_ARCHIVE_URL:-${DEFAULT_ARCHIVE_URL:-}}"
+CACHE_DIR="${AXIOMANCER_CACHE_DIR:-${XDG_CACHE_HOME:-$HOME/.cache}/axiomancer}"
+EXPECTED_SHA256="${AXIOMANCER_SHA256:-}"
+OFFLINE="${AXIOMANCER_OFFLINE:-false}"
+NO_CACHE="${AXIOMANCER_NO_CACHE:-false}"
+STORE_DIR="${AXIOMANCER_STORE_DIR:-${XDG_DATA_HOME:-$HOME/.local/share}/axiomancer/store}"
+NO_STORE="${AXIOMANCER_NO_STORE:-false}"
+TRACE_FILE="${AXIOMANCER_TRACE:-}"
+# Bump when the layout of an installed .axiomantic directory changes
+STORE_LAYOUT=1
+# Parts of an install the assistant edits; never hardlinked to the store
+EDITABLE_PATHS=(templates README.md)
+
+usage() {
+    cat << 'EOF'
+Usage: install.sh [options] [TARGET_DIR...]
+
+Installs Axiomancer into TARGET_DIR (default: the current directory).
+Several targets, or "-" to read target directories from stdin (one per
+line), install from a single download with bounded parallelism.
+
+Options:
+  -j, --jobs N           Parallel installs in fleet mode (default: 4, or $AXIOMANCER_JOBS)
+  --targets-file FILE    Read target directories from FILE ("-" for stdin)
+  --offline              Install from the download cache without network access
+  --no-cache             Download to a temporary directory, bypassing the cache
+  --no-store             Copy into targets without using the shared content store
+  -h, --help             Show this help
+
+Set AXIOMANCER_TRACE=FILE to append a JSONL span for each install step to FILE
+(see "python3 -m axiomancer trace report").
+EOF
+}
+
+tracing() {
+    [[ -n "$TRACE_FILE" ]]
+}
+
+# Store the current time, in seconds, in variable $1 when tracing
+trace_mark() {
+    tracing || return 0
+    if [[ -n "${EPOCHREALTIME:-}" ]]; then
+        printf -v "$1" '%s' "${EPOCHREALTIME/,/.}"
+    else
+        printf -v "$1" '%s' "$(date +%s)"
+    fi
+}
+
+# Append span $1, started at time $2, to the trace. Further arguments are
+# KEY=VALUE attributes; status=VALUE sets the status of the span instead.
+trace_span() {
+    tracing || return 0
+    local name="$1" start="$2" now pair key value attrs="" status=ok
+    trace_mark now
+    shift 2
+    for pair in "$@"; do
+        key="${pair%%=*}"
+        value="${pair#*=}"
+        if [[ "$key" == status ]]; then
+            status="$value"
+            continue
+        fi
+        if [[ ! "$value" =~ ^-?[0-9]+(\.[0-9]+)?$ ]]; then
+            value="${value//\\/\\\\}"
+            value="\"${value//\"/\\\"}\""
+        fi
+        attrs+="${attrs:+,}\"$key\":$value"
+    done
+    printf '{"trace":"%s","span":"%s","start":%s,"duration":%s,"status":"%s","attrs":{%s}}\n' \
+        "$TRACE_ID" "$name" "$start" "$(awk -v a="$start" -v b="$now" 'BEGIN { printf "%.6f", b - a }')" \
+        "$status" "$attrs" >> "$TRACE_FILE"
+}
 
 # Handle command line arguments
-if [[ $# -gt 0 ]]; then
-    TARGET_DIR="$1"
-    if [[ ! -d "$TARGET_DIR" ]]; then
-        echo "❌ Error: Target directory '$TARGET_DIR' does not exist"
+TARGETS=()
+TARGETS_FILE=""
+while [[ $# -gt 0 ]]; do
+    case "$1" in
+        -h|--help)
+            usage
+            exit 0
+            ;;
+        -j|--jobs)
+            JOBS="$2"
+            shift 2
+            ;;
+        --jobs=*)
+            JOBS="${1#*=}"
+            shift
+            ;;
+        --targets-file)
+            TARGETS_FILE="$2"
+            shift 2
+            ;;
+        --offline)
+            OFFLINE=true
+            shift
+            ;;
+        --no-cache)
+            NO_CACHE=true
+            shift
+            ;;
+        --no-store)
+            NO_STORE=true
+            shift
+            ;;
+        -)
+            TARGETS_FILE="-"
+            shift
+            ;;
+        --)
+            shift
+            TARGETS+=("$@")
+            break
+            ;;
+        -*)
+            echo "❌ Error: Unknown option '$1'"
+            usage
+            exit 1
+            ;;
+        *)
+            TARGETS+=("$1")
+            shift
+            ;;
+    esac
+done
+
+if [[ ! "$JOBS" =~ ^[1-9][0-9]*$ ]]; then
+    echo "❌ Error: --jobs must be a positive integer, got '$JOBS'"
+    exit 1
+fi
+
+[[ "$OFFLINE" == 1 ]] && OFFLINE=true
+[[ "$NO_CACHE" == 1 ]] && NO_CACHE=true
+[[ "$NO_STORE" == 1 ]] && NO_STORE=true
+if [[ "$OFFLINE" == true ]] && [[ "$NO_CACHE" == true ]]; then
+    echo "❌ Error: --offline installs from the cache and cannot be combined with --no-cache"
+    exit 1
+fi
+
+# One trace id per install run, shared with the tools it runs and, through the
+# id file next to the trace, with the bootstrap that follows
+if tracing; then
+    [[ "$TRACE_FILE" == /* ]] || TRACE_FILE="$PWD/$TRACE_FILE"
+    TRACE_ID="$(date +%s)-$$-$RANDOM"
+    mkdir -p "$(dirname "$TRACE_FILE")"
+    printf '%s\n' "$TRACE_ID" > "$TRACE_FILE.id"
+    export AXIOMANCER_TRACE="$TRACE_FILE" AXIOMANCER_TRACE_ID="$TRACE_ID"
+fi
+trace_mark TRACE_START
+
+if [[ -n "$TARGETS_FILE" ]]; then
+    if [[ "$TARGETS_FILE" == "-" ]]; then
+        TARGETS_FILE="/dev/stdin"
+    elif [[ ! -f "$TARGETS_FILE" ]]; then
+        echo "❌ Error: Targets file '$TARGETS_FILE' does not exist"
         exit 1
     fi
+    while IFS= read -r line || [[ -n "$line" ]]; do
+        # Skip blank lines and comments
+        [[ -z "${line//[[:space:]]/}" || "$line" == \#* ]] && continue
+        TARGETS+=("$line")
+    done < "$TARGETS_FILE"
+    FLEET_MODE=true
 else
-    TARGET_DIR="$PWD"
+    FLEET_MODE=false
 fi
 
-# Store original working directory for relative path calculations
-ORIGINAL_DIR="$PWD"
+if [[ ${#TARGETS[@]} -gt 1 ]]; then
+    FLEET_MODE=true
+fi
 
-echo "🧙‍♂️ Installing Axiomancer to: $TARGET_DIR"
+if [[ "$FLEET_MODE" == true ]]; then
+    if [[ ${#TARGETS[@]} -eq 0 ]]; then
+        echo "❌ Error: No target directories given"
+        exit 1
+    fi
+    echo "🧙‍♂️ Installing Axiomancer to ${#TARGETS[@]} targets ($JOBS parallel jobs)"
+else
+    if [[ ${#TARGETS[@]} -eq 1 ]]; then
+        TARGET_DIR="${TARGETS[0]}"
+        if [[ ! -d "$TARGET_DIR" ]]; then
+            echo "❌ Error: Target directory '$TARGET_DIR' does not exist"
+            exit 1
+        fi
+    else
+        TARGET_DIR="$PWD"
 
-# Check if we're in the axiomancer repository itself (only if no target specified)
-if [[ $# -eq 0 ]] && [[ "$(basename "$PWD")" == "axiomancer" ]] && [[ -f "install.sh" ]]; then
-    echo "❌ Error: Cannot install axiomancer within the axiomancer repository itself"
-    echo "   Please run this script from your target project directory, or specify a target:"
-    echo "   ./install.sh /path/to/your/project"
-    exit 1
+        # Check if we're in the axiomancer repository itself (only if no target specified)
+        if [[ "$(basename "$PWD")" == "axiomancer" ]] && [[ -f "install.sh" ]]; then
+            echo "❌ Error: Cannot install axiomancer within the axiomancer repository itself"
+            echo "   Please run this script from your target project directory, or specify a target:"
+            echo "   ./install.sh /path/to/your/project"
+            exit 1
+        fi
+    fi
+    echo "🧙‍♂️ Installing Axiomancer to: $TARGET_DIR"
 fi
 
+# Print the SHA-256 of the given file (or stdin)
+sha256_of() {
+    if command -v sha256sum &> /dev/null; then
+        sha256sum "$@"
+    else
+        shasum -a 256 "$@"
+    fi | cut -d ' ' -f 1
+}
+
+# Succeed if cached bundle $1 extracts into SCRIPT_DIR and passes
+# verify_payload, i.e. matches its SHA256SUMS and the pinned AXIOMANCER_SHA256
+verify_cached() {
+    [[ -f "$1" ]] || return 1
+    extract_bundle < "$1" 2> /dev/null && verify_payload > /dev/null
+}
+
+# Check every extracted file against the bundle's SHA256SUMS manifest, and
+# the manifest itself against the pinned AXIOMANCER_SHA256, if any (the
+# payload digest each release publishes as axiomancer-VERSION.payload.sha256)
+verify_payload() {
+    local expected file actual
+    if [[ ! -f "$SCRIPT_DIR/SHA256SUMS" ]]; then
+        # Branch archives carry no manifest
+        if [[ "$BUNDLE_URL" == "$ARCHIVE_URL" ]] && [[ -z "$EXPECTED_SHA256" ]]; then
+            return 0
+        fi
+        echo "❌ Error: Bundle has no SHA256SUMS manifest"
+        return 1
+    fi
+    actual=$(sha256_of "$SCRIPT_DIR/SHA256SUMS")
+    if [[ -n "$EXPECTED_SHA256" ]] && [[ "$actual" != "$EXPECTED_SHA256" ]]; then
+        echo "❌ Error: Checksum mismatch for $BUNDLE_URL"
+        echo "   expected: $EXPECTED_SHA256"
+        echo "   actual:   $actual"
+        return 1
+    fi
+    while read -r expected file; do
+        if [[ "$(sha256_of "$SCRIPT_DIR/$file" 2> /dev/null)" != "$expected" ]]; then
+            echo "❌ Error: Checksum mismatch for $file in $BUNDLE_URL"
+            return 1
+        fi
+    done < "$SCRIPT_DIR/SHA256SUMS"
+}
+
+# Print the value of the last occurrence of header $2 in header dump $1
+last_header() {
+    grep -i "^$2:" "$1" | tail -n 1 | cut -d ' ' -f 2- | tr -d '\r'
+}
+
+# Extract a bundle read from stdin into SCRIPT_DIR, dropping its top-level
+# axiomancer-VERSION directory
+extract_bundle() {
+    rm -rf "$SCRIPT_DIR"
+    mkdir -p "$SCRIPT_DIR"
+    tar -xzf - -C "$SCRIPT_DIR" --strip-components=1
+}
+
+# Extract a cached bundle, discarding it if it turns out to be unusable
+extract_cached() {
+    verify_cached "$1" && return 0
+    rm -f "$1" "$1.etag" "$1.last-modified"
+    echo "❌ Error: Cached bundle $1 is unusable and was removed, please retry"
+    exit 1
+}
+
+# Switch BUNDLE_URL to the branch archive, unless it is already in use, there
+# is none to fall back to or a pinned AXIOMANCER_SHA256 could not be checked
+use_archive() {
+    [[ -n "$ARCHIVE_URL" ]] && [[ "$BUNDLE_URL" != "$ARCHIVE_URL" ]] || return 1
+    [[ -z "$EXPECTED_SHA256" ]] || return 1
+    BUNDLE_URL="$ARCHIVE_URL"
+}
+
+# Download the bundle into SCRIPT_DIR. The response is streamed straight into
+# tar; unless --no-cache is given it is also teed into the cache, one entry per
+# bundle URL. A partial cache entry is resumed, an existing one is revalidated
+# with its ETag and Last-Modified headers, and offline mode never touches the
+# network. A cached bundle is only used after it passes verify_payload, and a
+# download that fails or turns out corrupt falls back to it. While no release has published the latest bundle (HTTP 404), the
+# branch archive at ARCHIVE_URL is installed instead.
+fetch_bundle() {
+    local entry bundle part headers status statuses sink
+    local conditional=()
+
+    entry="$CACHE_DIR/$(printf '%s' "$BUNDLE_URL" | sha256_of | cut -c 1-16)"
+    bundle="$entry/axiomancer.tar.gz"
+    part="$bundle.part"
+    headers="$TEMP_DIR/headers"
+    BUNDLE_FILE="$bundle"
+
+    if [[ "$NO_CACHE" == true ]]; then
+        sink=/dev/null
+    else
+        sink="$part"
+        mkdir -p "$entry"
+        printf '%s\n' "$BUNDLE_URL" > "$entry/url"
+    fi
+
+    if [[ "$OFFLINE" == true ]]; then
+        if ! verify_cached "$bundle"; then
+            if use_archive; then
+                fetch_bundle
+                return
+            fi
+            echo "❌ Error: Offline mode needs a verified cached bundle in $entry"
+            exit 1
+        fi
+        echo "📦 Using cached axiomancer (offline mode)"
+        FETCH_SOURCE=offline
+        return
+    fi
+
+    if [[ -f "$bundle" ]] && ! verify_cached "$bundle"; then
+        echo "⚠️  Cached bundle failed checksum verification, downloading again"
+        rm -f "$bundle" "$bundle.etag" "$bundle.last-modified"
+    fi
+
+    if [[ "$NO_CACHE" == false ]] && [[ -s "$part" ]]; then
+        echo "⏯️  Resuming interrupted download..."
+        if curl -fsSL -C - -D "$headers" -o "$part" "$BUNDLE_URL" && extract_bundle < "$part" 2> /dev/null; then
+            status=200
+            FETCH_SOURCE=resumed
+        else
+            # The server cannot resume this transfer; start over
+            rm -f "$part"
+        fi
+    fi
+
+    if [[ -z "$status" ]]; then
+        if [[ -f "$bundle" ]]; then
+            [[ -s "$bundle.etag" ]] && conditional+=(-H "If-None-Match: $(cat "$bundle.etag")")
+            [[ -s "$bundle.last-modified" ]] && conditional+=(-H "If-Modified-Since: $(cat "$bundle.last-modified")")
+        fi
+
+        echo "📥 Downloading axiomancer from GitHub..."
+        set +e
+        curl -sSL "${conditional[@]}" -D "$headers" "$BUNDLE_URL" \
+            | tee "$sink" \
+            | extract_bundle 2> "$TEMP_DIR/tar.err"
+        statuses=("${PIPESTATUS[@]}")
+        set -e
+        status=$(awk '/^HTTP\//{code=$2} END{print code}' "$headers" 2> /dev/null)
+
+        if [[ "${statuses[0]}" != "0" ]]; then
+            # Keep what arrived so that the next run resumes the transfer
+            if [[ -f "$bundle" ]]; then
+                echo "⚠️  Download failed, installing from the cached bundle"
+                FETCH_SOURCE=cache
+                extract_cached "$bundle"
+                return
+            fi
+            echo "❌ Error: Failed to download $BUNDLE_URL"
+            exit 1
+        fi
+
+        if [[ "$status" == "304" ]]; then
+            rm -f "$part"
+            echo "✅ Cached axiomancer is up to date"
+            FETCH_SOURCE=revalidated
+            extract_cached "$bundle"
+            return
+        fi
+
+        if [[ "$status" != "200" ]] || [[ "${statuses[2]}" != "0" ]]; then
+            rm -f "$part"
+            if [[ "$status" == "404" ]] && use_archive; then
+                echo "⚠️  No release bundle published yet, installing from the main branch"
+                fetch_bundle
+                return
+            fi
+            if [[ "$status" == "200" ]] && verify_cached "$bundle"; then
+                echo "⚠️  Downloaded bundle is corrupt ($(head -n 1 "$TEMP_DIR/tar.err")), installing from the cached bundle"
+                FETCH_SOURCE=cache
+                return
+            fi
+            if [[ "$status" != "200" ]]; then
+                echo "❌ Error: Download of $BUNDLE_URL failed with HTTP $status"
+            else
+                echo "❌ Error: Failed to extract $BUNDLE_URL: $(head -n 1 "$TEMP_DIR/tar.err")"
+            fi
+            exit 1
+        fi
+    fi
+
+    if ! verify_payload; then
+        rm -f "$part"
+        if verify_cached "$bundle"; then
+            echo "⚠️  Installing from the cached bundle instead"
+            FETCH_SOURCE=cache
+            return
+        fi
+        exit 1
+    fi
+
+    if [[ "$NO_CACHE" == false ]]; then
+        mv -f "$part" "$bundle"
+        last_header "$headers" etag > "$bundle.etag"
+        last_header "$headers" last-modified > "$bundle.last-modified"
+    fi
+    echo "✅ Downloaded axiomancer $(cat "$SCRIPT_DIR/VERSION" 2> /dev/null) successfully"
+}
+
 # Determine if we're running locally or from curl
 if [[ -n "${BASH_SOURCE[0]}" ]] && [[ -f "${BASH_SOURCE[0]}" ]]; then
     # Running locally
@@ -46,70 +441,43 @@ else
     # Running from curl pipe
     LOCAL_MODE=false
     TEMP_DIR=$(mktemp -d)
-    SCRIPT_DIR="$TEMP_DIR/axiomancer-$GITHUB_BRANCH"
-
-    echo "📥 Downloading axiomancer from GitHub..."
+    SCRIPT_DIR="$TEMP_DIR/axiomancer"
 
     # Check for required tools
-    if ! command -v curl &> /dev/null; then
+    if [[ "$OFFLINE" == false ]] && ! command -v curl &> /dev/null; then
         echo "❌ Error: curl is required but not installed"
         exit 1
     fi
 
-    if ! command -v unzip &> /dev/null; then
-        echo "❌ Error: unzip is required but not installed"
+    if ! command -v tar &> /dev/null; then
+        echo "❌ Error: tar is required but not installed"
         exit 1
     fi
 
-    # Download and extract
-    cd "$TEMP_DIR"
-    curl -sSL "https://github.com/$GITHUB_REPO/archive/refs/heads/$GITHUB_BRANCH.zip" -o axiomancer.zip
-    unzip -q axiomancer.zip
-    cd - > /dev/null
-
-    echo "✅ Downloaded axiomancer successfully"
+    # Download (or revalidate the cache) and extract in one stream
+    FETCH_SOURCE=download
+    trace_mark FETCH_START
+    fetch_bundle
+    if tracing; then
+        trace_span install.fetch "$FETCH_START" source="$FETCH_SOURCE" \
+            bytes="$([[ -f "$BUNDLE_FILE" ]] && wc -c < "$BUNDLE_FILE" | tr -d ' ' || echo 0)"
+    fi
 fi
 
-# Create directory structures
-echo "📁 Creating Axiomantic directory structure..."
-mkdir -p "$TARGET_DIR/$AXIOMANTIC_DIR/commands"
-mkdir -p "$TARGET_DIR/$AXIOMANTIC_DIR/templates"
-mkdir -p "$TARGET_DIR/$CLAUDE_DIR/commands"
-mkdir -p "$TARGET_DIR/$OPENCODE_DIR/commands"
-
-# Copy axiomancer command to axiomantic directory
-echo "📋 Copying axiomancer command..."
-if [[ -f "$SCRIPT_DIR/axiomancer.md" ]]; then
-    cp "$SCRIPT_DIR/axiomancer.md" "$TARGET_DIR/$AXIOMANTIC_DIR/commands/axiomancer.md"
-else
+# Verify the payload once, before touching any target
+if [[ ! -f "$SCRIPT_DIR/axiomancer.md" ]]; then
     echo "❌ Error: axiomancer.md command not found"
     exit 1
 fi
 
-# Copy templates to axiomantic directory
-echo "📄 Copying templates..."
-if [[ -d "$SCRIPT_DIR/templates" ]]; then
-    cp -r "$SCRIPT_DIR/templates/"* "$TARGET_DIR/$AXIOMANTIC_DIR/templates/"
-else
+if [[ ! -d "$SCRIPT_DIR/templates" ]]; then
     echo "❌ Error: templates directory not found at $SCRIPT_DIR/templates"
     exit 1
 fi
 
-# Create symlinks from claude and opencode to axiomantic
-echo "🔗 Creating Claude and OpenCode symlinks..."
-cd "$TARGET_DIR"
-ln -sf "../../$AXIOMANTIC_DIR/commands/axiomancer.md" "$CLAUDE_DIR/commands/axiomancer.md"
-ln -sf "../../$AXIOMANTIC_DIR/commands/axiomancer.md" "$OPENCODE_DIR/commands/axiomancer.md"
-cd "$ORIGINAL_DIR"
-
-# Clean up temporary directory if we downloaded
-if [[ "$LOCAL_MODE" == false ]]; then
-    echo "🧹 Cleaning up temporary files..."
-    rm -rf "$TEMP_DIR"
-fi
-
-# Create usage instructions
-cat > "$TARGET_DIR/$AXIOMANTIC_DIR/README.md" << 'EOF'
+# Write usage instructions into an installed .axiomantic directory
+write_readme() {
+    cat > "$1/$AXIOMANTIC_DIR/README.md" << 'EOF'
 # Axiomancer Installation
 
 This directory contains the Axiomancer templates and prompts for your project.
@@ -128,6 +496,17 @@ claude /axiomancer
 # Then: "organize this project" or "bring order to this codebase"
 ```
 
+### Smaller Commands When the Mode Is Known
+```bash
+claude /axiomancer-new        # only the new-project instructions
+claude /axiomancer-existing   # only the existing-project instructions
+```
+
+### Render Templates Without Rewriting Them
+```bash
+PYTHONPATH=.axiomantic python3 -m axiomancer render variables.yaml
+```
+
 ### After Initialization
 Once your project is bootstrapped/organized, use:
 ```bash
@@ -140,6 +519,274 @@ claude --prompt AGENT.md
 After successful bootstrap/organization, the Axiomancer will automatically clean up the `.axiomantic/` directory and associated symlinks to keep your project clean.
 
 EOF
+}
+
+# Lay out a complete .axiomantic directory at $1/$AXIOMANTIC_DIR from the
+# payload in SCRIPT_DIR. Runs where errexit does not apply, so every step
+# that must succeed checks its own status.
+layout_install() {
+    local parent="$1" dir="$1/$AXIOMANTIC_DIR" mode
+    mkdir -p "$dir/commands" "$dir/templates" || return 1
+    cp "$SCRIPT_DIR/axiomancer.md" "$dir/commands/axiomancer.md" || return 1
+    cp -r "$SCRIPT_DIR/templates/"* "$dir/templates/" || return 1
+
+    # Tooling package (optional, needs python3 to run)
+    if [[ -d "$SCRIPT_DIR/axiomancer" ]]; then
+        mkdir -p "$dir/axiomancer" || return 1
+        cp "$SCRIPT_DIR/axiomancer/"*.py "$dir/axiomancer/" || return 1
+
+        # Lean per-mode commands holding only the sections each mode needs
+        if command -v python3 > /dev/null 2>&1; then
+            for mode in new existing; do
+                if ! (cd "$parent" && PYTHONPATH="$AXIOMANTIC_DIR" PYTHONDONTWRITEBYTECODE=1 python3 -m axiomancer prompt \
+                    --mode "$mode" --output "$AXIOMANTIC_DIR/commands/axiomancer-$mode.md" > /dev/null); then
+                    echo "⚠️  Could not assemble the $mode command; /axiomancer still works"
+                fi
+            done
+        fi
+    fi
+
+    # Usage instructions
+    write_readme "$parent"
+}
+
+# Print the store key of the payload in SCRIPT_DIR: a digest of every payload
+# file's checksum and of the code that lays out an install
+payload_key() {
+    local files=() file
+    while IFS= read -r file; do
+        files+=("$file")
+    done < <(cd "$SCRIPT_DIR" && { echo axiomancer.md; find templates -type f; find axiomancer -maxdepth 1 -name '*.py' 2> /dev/null; } | LC_ALL=C sort)
+    {
+        (
+            cd "$SCRIPT_DIR"
+            if command -v sha256sum &> /dev/null; then
+                sha256sum "${files[@]}"
+            else
+                shasum -a 256 "${files[@]}"
+            fi
+        )
+        declare -f layout_install write_readme
+        echo "layout $STORE_LAYOUT"
+    } | sha256_of
+}
+
+# Succeed if store entry $1 still matches the digest list recorded when it
+# was laid out, with no files added or removed
+verify_entry() {
+    local sums
+    sums="$(cd "$(dirname "$1")" && pwd)/$(basename "$1").sha256"
+    [[ -f "$sums" ]] || return 1
+    [[ "$(find "$1" -type f | wc -l)" -eq "$(wc -l < "$sums")" ]] || return 1
+    if command -v sha256sum &> /dev/null; then
+        (cd "$1" && sha256sum -c --status "$sums")
+    else
+        (cd "$1" && shasum -a 256 -c --status "$sums")
+    fi
+}
+
+# Make sure the store holds the install for this payload and set STORE_ENTRY
+# to it. Entries are laid out in a staging directory inside the store, made
+# read-only and renamed into place, so a concurrent installer never sees a
+# partial entry.
+store_payload() {
+    local key stage stale
+    key=$(payload_key)
+    STORE_ENTRY="$STORE_DIR/$key"
+    STORE_HIT=1
+    if [[ -d "$STORE_ENTRY" ]]; then
+        verify_entry "$STORE_ENTRY" && return 0
+        # Modified in place (e.g. through a hardlinked target): move the entry
+        # aside, so concurrent installers never see it half removed, and rebuild
+        echo "⚠️  Store entry $STORE_ENTRY was modified, rebuilding it"
+        stale=$(mktemp -d "$STORE_DIR/.stale.XXXXXX" 2> /dev/null) || return 1
+        mv "$STORE_ENTRY" "$stale/" 2> /dev/null
+        chmod -R u+w "$stale" 2> /dev/null
+        rm -rf "$stale" "$STORE_ENTRY.sha256"
+    fi
+    STORE_HIT=0
+
+    mkdir -p "$STORE_DIR" 2> /dev/null || return 1
+    stage=$(mktemp -d "$STORE_DIR/.stage.XXXXXX" 2> /dev/null) || return 1
+    if ! layout_install "$stage"; then
+        rm -rf "$stage"
+        return 1
+    fi
+    find "$stage/$AXIOMANTIC_DIR" -type f -exec chmod a-w {} +
+    (
+        cd "$stage/$AXIOMANTIC_DIR" &&
+            find . -type f | LC_ALL=C sort | while IFS= read -r file; do
+                echo "$(sha256_of "$file")  $file"
+            done
+    ) > "$stage/sums" || { rm -rf "$stage"; return 1; }
+    # The digest list goes in first, so an entry is never without one
+    mv -f "$stage/sums" "$STORE_ENTRY.sha256" || { rm -rf "$stage"; return 1; }
+
+    # GNU mv -T refuses to move into an entry another installer just created;
+    # elsewhere the stray copy is removed from the entry again
+    if mv -T "$stage/$AXIOMANTIC_DIR" "$STORE_ENTRY" 2> /dev/null; then
+        :
+    elif [[ ! -d "$STORE_ENTRY" ]]; then
+        mv "$stage/$AXIOMANTIC_DIR" "$STORE_ENTRY" || { rm -rf "$stage"; return 1; }
+    fi
+    rm -rf "$stage" "${STORE_ENTRY:?}/$AXIOMANTIC_DIR"
+}
+
+# Copy store entry $1 to the new path $2, sharing data with the store where
+# the filesystem allows: reflinks (or APFS clones), then hardlinks, then a
+# plain copy across filesystems
+materialize() {
+    local method path
+    MATERIALIZE_METHOD=
+    for method in reflink clone hardlink copy; do
+        case "$method" in
+            reflink) cp -R --reflink=always "$1" "$2" 2> /dev/null ;;
+            clone) [[ "$(uname)" == Darwin ]] && cp -R -c "$1" "$2" 2> /dev/null ;;
+            hardlink) cp -R -l "$1" "$2" 2> /dev/null ;;
+            copy) cp -R "$1" "$2" ;;
+        esac && MATERIALIZE_METHOD="$method" && break
+        rm -rf "$2"
+    done
+    [[ -n "$MATERIALIZE_METHOD" ]] || return 1
+
+    # Hardlinks share the store's inodes, so files the assistant may edit get
+    # private, writable copies; plain copies are made writable the same way
+    if [[ "$MATERIALIZE_METHOD" == hardlink ]] || [[ "$MATERIALIZE_METHOD" == copy ]]; then
+        for path in "${EDITABLE_PATHS[@]}"; do
+            [[ -e "$1/$path" ]] || continue
+            rm -rf "${2:?}/$path"
+            cp -R "$1/$path" "$2/$path" && chmod -R u+w "$2/$path" || return 1
+        done
+    fi
+}
+
+# Install the verified payload into one target directory
+install_target() {
+    local target="$1" stage command started
+    trace_mark started
+
+    if [[ ! -d "$target" ]]; then
+        echo "❌ Error: Target directory '$target' does not exist"
+        return 1
+    fi
+
+    # Create directory structures
+    echo "📁 Creating Axiomantic directory structure..."
+    mkdir -p "$target/$CLAUDE_DIR/commands"
+    mkdir -p "$target/$OPENCODE_DIR/commands"
+
+    # Materialize the install next to its final place, then rename it in
+    echo "📋 Materializing axiomancer command, templates and tools..."
+    stage=$(mktemp -d "$target/$AXIOMANTIC_DIR.stage.XXXXXX")
+    if ! materialize "$STORE_ENTRY" "$stage/$AXIOMANTIC_DIR"; then
+        rm -rf "$stage"
+        echo "❌ Error: Could not materialize the install in '$target'"
+        trace_span install.target "$started" target="$target" status=error
+        return 1
+    fi
+    if [[ -e "$target/$AXIOMANTIC_DIR" ]]; then
+        mv "$target/$AXIOMANTIC_DIR" "$stage/previous"
+    fi
+    mv "$stage/$AXIOMANTIC_DIR" "$target/$AXIOMANTIC_DIR"
+    rm -rf "$stage"
+
+    # Create symlinks from claude and opencode to axiomantic
+    echo "🔗 Creating Claude and OpenCode symlinks..."
+    for command in axiomancer axiomancer-new axiomancer-existing; do
+        [[ -f "$target/$AXIOMANTIC_DIR/commands/$command.md" ]] || continue
+        ln -sf "../../$AXIOMANTIC_DIR/commands/$command.md" "$target/$CLAUDE_DIR/commands/$command.md"
+        ln -sf "../../$AXIOMANTIC_DIR/commands/$command.md" "$target/$OPENCODE_DIR/commands/$command.md"
+    done
+
+    if tracing; then
+        trace_span install.target "$started" target="$target" method="$MATERIALIZE_METHOD" \
+            files_written="$(find "$target/$AXIOMANTIC_DIR" -type f | wc -l | tr -d ' ')"
+    fi
+}
+
+# Install into every target with at most $JOBS installs running at once,
+# then print a per-target summary. Returns non-zero if any target failed.
+install_fleet() {
+    local results_dir pids index target log status failed=0 succeeded=0
+    results_dir=$(mktemp -d)
+    pids=()
+    index=0
+
+    for target in "${TARGETS[@]}"; do
+        index=$((index + 1))
+        log="$results_dir/$index.log"
+        {
+            # errexit must stay active inside the install, so it is set on
+            # the inner subshell and cleared for the status bookkeeping
+            set +e
+            ( set -e; install_target "$target" ) > "$log" 2>&1
+            echo $? > "$results_dir/$index.status"
+        } &
+        pids+=($!)
+
+        # Bounded parallelism: wait for the oldest install when the pool is full
+        if [[ ${#pids[@]} -ge $JOBS ]]; then
+            wait "${pids[0]}" || true
+            pids=("${pids[@]:1}")
+        fi
+    done
+    wait
+
+    echo ""
+    echo "📊 Fleet summary:"
+    index=0
+    for target in "${TARGETS[@]}"; do
+        index=$((index + 1))
+        status=$(cat "$results_dir/$index.status" 2> /dev/null || echo 1)
+        if [[ "$status" == "0" ]]; then
+            succeeded=$((succeeded + 1))
+            echo "   ✅ $target"
+        else
+            failed=$((failed + 1))
+            echo "   ❌ $target: $(tail -n 1 "$results_dir/$index.log" 2> /dev/null | sed 's/^❌ Error: //')"
+        fi
+    done
+    echo "   $succeeded succeeded, $failed failed"
+
+    rm -rf "$results_dir"
+    [[ $failed -eq 0 ]]
+}
+
+# Lay out the payload once in the host's content store. Without a usable
+# store (or with --no-store) a private one is used for this run only.
+STORE_TEMP=""
+trace_mark STORE_START
+if [[ "$NO_STORE" == true ]] || ! store_payload; then
+    [[ "$NO_STORE" == true ]] || echo "⚠️  Content store $STORE_DIR is not writable, copying instead"
+    STORE_TEMP=$(mktemp -d)
+    STORE_DIR="$STORE_TEMP"
+    store_payload
+fi
+trace_span install.store "$STORE_START" hit="$STORE_HIT" shared="$([[ -z "$STORE_TEMP" ]] && echo 1 || echo 0)"
+
+FLEET_STATUS=0
+if [[ "$FLEET_MODE" == true ]]; then
+    install_fleet || FLEET_STATUS=1
+else
+    install_target "$TARGET_DIR"
+fi
+
+# Clean up temporary directories
+if [[ -n "$STORE_TEMP" ]]; then
+    rm -rf "$STORE_TEMP"
+fi
+if [[ "$LOCAL_MODE" == false ]]; then
+    echo "🧹 Cleaning up temporary files..."
+    rm -rf "$TEMP_DIR"
+fi
+
+if [[ $FLEET_STATUS -ne 0 ]]; then
+    trace_span install.total "$TRACE_START" targets="${#TARGETS[@]}" status=error
+    echo ""
+    echo "❌ Error: Axiomancer installation failed for some targets"
+    exit 1
+fi
+trace_span install.total "$TRACE_START" targets="$([[ "$FLEET_MODE" == true ]] && echo "${#TARGETS[@]}" || echo 1)"
 
 echo ""
 echo "✅ Axiomancer installed successfully!"
@@ -154,5 +801,5 @@ echo "💬 Available commands:"
 echo "   • For NEW projects: 'create ProjectName' or 'bootstrap web application'"
 echo "   • For EXISTING projects: 'organize this project' or 'bring order to this codebase'"
 echo ""
-echo "📚 Note: Installation directories will be automatically cleaned up after successful bootstrap."
+echo "📚 Note: Installation files will be automatically cleaned up after successful bootstrap (the .axiomantic/axiomancer/ tools are kept)."
 echo ""
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""Tests for the import-graph scanner and component clustering."""
+
+import json
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from axiomancer import analyze
+from axiomancer.cli import main
+
+
+@pytest.fixture
+def temp_dir():
+    """Create a temporary working directory."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield Path(tmpdir)
+
+
+def write_tree(root, files):
+    """Write a mapping of relative paths to contents under root."""
+    for path, content in files.items():
+        full_path = root / path
+        full_path.parent.mkdir(parents=True, exist_ok=True)
+        full_path.write_text(content)
+
+
+@pytest.fixture
+def flask_project(temp_dir):
+    """A small Flask-style project like the axiomancer.md example."""
+    write_tree(
+        temp_dir,
+        {
+            "app/__init__.py": "",
+            "app/auth/__init__.py": "",
+            "app/auth/models.py": "from app.database.models import Base\n",
+            "app/auth/routes.py": (
+                "import flask\nfrom .models import User\n"
+                "from ..utils.helpers import slugify\n"
+            ),
+            "app/database/__init__.py": "",
+            "app/database/models.py": "import sqlalchemy\n",
+            "app/utils/__init__.py": "",
+            "app/utils/helpers.py": "import re\n",
+            "app/api/__init__.py": "",
+            "app/api/users.py": (
+                "from app.auth import models\nfrom app.utils.helpers import slugify\n"
+            ),
+            "node_modules/pkg/index.js": "require('./other')\n",
+        },
+    )
+    return temp_dir
+
+
+class TestParseImports:
+    """Test import extraction for each supported language."""
+
+    def test_python_imports(self):
+        """Test plain, from, relative and parenthesized Python imports."""
+        source = (
+            "import os, sys\n"
+            "from . import sibling\n"
+            "from ..pkg.mod import (a,\n    b as c)\n"
+        )
+        imports = analyze.parse_imports("python", source)
+
+        assert imports == ("os", "sys", ".sibling", "..pkg.mod.a", "..pkg.mod.b")
+
+    def test_typescript_imports(self):
+        """Test ES module, re-export, require and dynamic imports."""
+        source = (
+            "import React from 'react'\n"
+            "import type { User } from './types'\n"
+            "export { api } from '../api'\n"
+            'const x = require("lodash")\n'
+            "const y = await import('./lazy')\n"
+        )
+        imports = analyze.parse_imports("typescript", source)
+
+        assert imports == ("react", "./types", "../api", "lodash", "./lazy")
+
+    def test_rust_and_go_imports(self):
+        """Test Rust mod/use declarations and Go import blocks."""
+        rust = (
+            "mod parser;\npub use crate::config::Settings;\nuse serde::Deserialize;\n"
+        )
+        go = 'import (\n\t"fmt"\n\tapi "example.com/svc/internal/api"\n)\n'
+
+        assert analyze.parse_imports("rust", rust) == (
+            "mod::parser",
+            "crate::config::Settings",
+            "serde::Deserialize",
+        )
+        assert analyze.parse_imports("go", go) == (
+            "fmt",
+            "example.com/svc/internal/api",
+        )
+
+
+class TestScan:
+    """Test graph construction over real trees."""
+
+    def test_resolves_python_edges(self, flask_project):
+        """Test absolute and relative Python imports become module edges."""
+        graph = analyze.scan(flask_project, workers=1)
+
+        assert graph.edges["app/auth/routes.py"] == {
+            "app/auth/models.py",
+            "app/utils/helpers.py",
+        }
+        assert graph.edges["app/api/users.py"] == {
+            "app/auth/models.py",
+            "app/utils/helpers.py",
+        }
+        assert graph.external["flask"] == 1
+        assert not any(m.startswith("node_modules") for m in graph.modules)
+
+    def test_resolves_typescript_rust_and_go(self, temp_dir):
+        """Test relative TS imports, crate paths and Go module packages."""
+        write_tree(
+            temp_dir,
+            {
+                "web/src/app.tsx": (
+                    "import { api } from './services/api'\n"
+                    "import { fmt } from './util.js'\n"
+                ),
+                "web/src/util.ts": "",
+                "web/src/services/api/index.ts": "import axios from 'axios'\n",
+                "engine/Cargo.toml": "[package]\nname = 'engine'\n",
+                "engine/src/lib.rs": "mod config;\nuse crate::config::Settings;\n",
+                "engine/src/config.rs": "use super::lib;\n",
+                "svc/go.mod": "module example.com/svc\n",
+                "svc/main.go": 'import "example.com/svc/internal/api"\n',
+                "svc/internal/api/api.go": 'import "net/http"\n',
+            },
+        )
+        graph = analyze.scan(temp_dir, workers=1)
+
+        assert graph.edges["web/src/app.tsx"] == {
+            "web/src/services/api/index.ts",
+            "web/src/util.ts",
+        }
+        assert graph.edges["engine/src/lib.rs"] == {"engine/src/config.rs"}
+        assert graph.edges["svc"] == {"svc/internal/api"}
+        assert graph.modules["svc/internal/api"] == "go"
+        assert graph.external["axios"] == 1
+
+    def test_process_pool_matches_serial(self, flask_project, monkeypatch):
+        """Test that parsing in a process pool gives the same graph."""
+        serial = analyze.scan(flask_project, workers=1)
+        monkeypatch.setattr(analyze, "SERIAL_THRESHOLD", 0)
+        pooled = analyze.scan(flask_project, workers=2)
+
+        assert pooled.edges == serial.edges
+        assert pooled.external == serial.external
+
+
+class TestClusters:
+    """Test candidate component detection and scoring."""
+
+    def test_cluster_key_skips_source_roots(self):
+        """Test that src/ and app/ do not count towards the cluster depth."""
+        assert analyze.cluster_key("app/auth/models.py") == "app/auth"
+        assert analyze.cluster_key("src/components/auth/Login.tsx", 2) == (
+            "src/components/auth"
+        )
+        assert analyze.cluster_key("setup.py") == "."
+
+    def test_scores_component_boundaries(self, flask_project):
+        """Test cohesion, coupling and cross-cutting detection."""
+        graph = analyze.scan(flask_project, workers=1)
+        clusters = {c.id: c for c in analyze.find_clusters(graph)}
+
+        auth = clusters["app/auth"]
+        assert auth.internal_edges == 1
+        assert auth.outgoing_edges == 2
+        assert auth.cohesion == pytest.approx(0.333)
+        assert auth.depends_on == ["app/database", "app/utils"]
+        assert auth.used_by == ["app/api"]
+
+        utils = clusters["app/utils"]
+        assert utils.instability == 0.0
+        assert utils.cross_cutting is False
+        assert clusters["app/database"].used_by == ["app/auth"]
+
+
+class TestAnalyzeCommand:
+    """Test the ``analyze`` command line."""
+
+    def test_prints_compact_json(self, flask_project, capsys):
+        """Test that the summary is compact JSON with clusters."""
+        assert main(["analyze", str(flask_project), "--workers", "1"]) == 0
+
+        output = capsys.readouterr().out
+        summary = json.loads(output)
+        assert "\n" not in output.strip()
+        assert summary["languages"] == {"python": 10}
+        assert {c["id"] for c in summary["clusters"]} >= {"app/auth", "app/api"}
+
+    def test_rejects_missing_root(self, temp_dir, capsys):
+        """Test that a missing root is a clean error."""
+        assert main(["analyze", str(temp_dir / "missing")]) == 1
+        assert "Not a directory" in capsys.readouterr().err
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Tests for the benchmark suite's inputs and baseline comparison."""
+
+import tempfile
+from pathlib import Path
+
+import pytest
+import yaml
+
+from axiomancer import manifest as manifest_module
+from axiomancer.manifest import Manifest
+from benchmarks import suite
+
+
+@pytest.fixture
+def temp_dir():
+    """Create a temporary working directory."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield Path(tmpdir)
+
+
+def report(calibration, **seconds):
+    """A minimal results report."""
+    return {
+        "version": suite.FORMAT_VERSION,
+        "calibration": calibration,
+        "results": {
+            name.replace("_", "."): {"seconds": value, "repeat": 1}
+            for name, value in seconds.items()
+        },
+    }
+
+
+class TestCompare:
+    """Test regression detection against a baseline."""
+
+    def test_slowdown_beyond_tolerance_regresses(self):
+        """Test that only benchmarks slower than the tolerance are flagged."""
+        baseline = report(1.0, install_local=1.0, render=1.0, gone=1.0)
+        current = report(1.0, install_local=1.6, render=1.4, new=9.0)
+
+        rows = suite.compare(current, baseline, tolerance=0.5)
+
+        assert [(r["name"], r["regressed"]) for r in rows] == [
+            ("install.local", True),
+            ("render", False),
+        ]
+
+    def test_calibration_scales_expectations(self):
+        """Test that a machine twice as slow is allowed twice the time."""
+        rows = suite.compare(report(2.0, render=1.9), report(1.0, render=1.0))
+
+        assert rows[0]["expected"] == 2.0
+        assert not rows[0]["regressed"]
+
+    def test_tiny_benchmarks_ignore_noise(self):
+        """Test that slowdowns below the noise floor are not regressions."""
+        rows = suite.compare(report(1.0, query=0.003), report(1.0, query=0.001))
+
+        assert rows[0]["ratio"] == 3.0
+        assert not rows[0]["regressed"]
+
+
+class TestSuite:
+    """Test the synthetic inputs and the timing loop."""
+
+    def test_synthetic_manifest_is_acyclic(self):
+        """Test that the generated manifest parses and layers cleanly."""
+        data = yaml.safe_load(suite.synthetic_manifest(100))
+        manifest = Manifest(manifest_module.parse_components(data))
+
+        assert len(manifest.components) == 100
+        assert manifest.cycles() == []
+        assert manifest.missing == {}
+
+    def test_tool_benchmarks_run(self, temp_dir):
+        """Test that every tooling benchmark runs on small inputs."""
+        results = {}
+        benchmarks = suite.tool_benchmarks(temp_dir, [1], [20])
+        suite._time_all(benchmarks, [], 1, results)
+
+        assert sorted(results) == [
+            "manifest.load[20]",
+            "manifest.query[20]",
+            "render[1x]",
+        ]
+        assert (temp_dir / "out" / "AGENT.md").is_file()
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""Tests for per-component context packs."""
+
+import json
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from axiomancer import context
+from axiomancer.cli import main
+from axiomancer.errors import ManifestError
+
+MANIFEST = """\
+components:
+  1.1-core:
+    name: "Core"
+    status: COMPLETED
+    dependencies: []
+  # Services
+  2.1-tasks:
+    name: "Task Service"
+    status: PLANNED
+    dependencies: ["1.1-core", "1.2-auth"]
+"""
+
+ARCHITECTURE = """\
+# System Architecture
+
+## 1. Overview
+
+Everything talks to the Task Service through a Queue.
+
+## 2. Components
+
+### 2.1 Core
+
+Shared models.
+
+### 2.2 Task Service
+
+Schedules work items for each Tenant.
+
+#### Storage
+
+Tasks live in Postgres.
+
+## 3. Deployment
+
+One container.
+"""
+
+GLOSSARY = """\
+# Glossary
+
+**Version:** 1.0
+
+## Terms
+
+**Tenant**: An organisation using the service.
+*Used in:* everywhere
+
+- **Work item** — a unit of scheduled work.
+
+**Queue**: The message broker.
+
+**{{TERM}}**: {{DEFINITION}}
+
+## Acronyms
+
+**SLA**: Service level agreement.
+"""
+
+PLAN = """\
+# Core Plan
+
+## Interfaces
+
+`Model.save()` persists a model.
+
+## Tests
+
+Unit tests for every model.
+"""
+
+
+@pytest.fixture
+def temp_dir():
+    """Create a temporary working directory."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield Path(tmpdir)
+
+
+@pytest.fixture
+def project(temp_dir):
+    """A documented project with one dependency plan."""
+    (temp_dir / "STATUS_MANIFEST.yaml").write_text(MANIFEST)
+    (temp_dir / "SYSTEM_ARCHITECTURE.md").write_text(ARCHITECTURE)
+    (temp_dir / "GLOSSARY.md").write_text(GLOSSARY)
+    (temp_dir / "plans").mkdir()
+    (temp_dir / "plans" / "1.1-core.md").write_text(PLAN)
+    return temp_dir
+
+
+def part(pack, kind):
+    """Text of the only part of ``kind`` in a pack."""
+    (found,) = [p.text for p in pack.parts if p.kind == kind]
+    return found
+
+
+class TestIndex:
+    """Test section indexing and incremental refresh."""
+
+    def test_glossary_entries(self):
+        """Test that terms are found below level 2 headings only."""
+        entries = context.glossary_entries(GLOSSARY)
+
+        assert list(entries) == ["Tenant", "Work item", "Queue", "SLA"]
+        start, end = entries["Tenant"]
+        assert GLOSSARY[start:end] == (
+            "**Tenant**: An organisation using the service.\n*Used in:* everywhere\n"
+        )
+
+    def test_glossary_terms_inside_nested_fences_are_skipped(self):
+        """Test that a ~~~ line inside a ``` block does not end the block."""
+        text = (
+            "## Terms\n\n```\n~~~\n**Example**: not a term\n~~~\n```\n\n"
+            "**Tenant**: An organisation.\n"
+        )
+
+        assert list(context.glossary_entries(text)) == ["Tenant"]
+
+    def test_offsets_are_bytes(self, temp_dir):
+        """Test that section ranges address the encoded file."""
+        data = "# Título\n\nÜber\n\n## Zweite\n\nmehr\n".encode("utf-8")
+
+        record = context.index_document("plans/x.md", data)
+
+        level, title, start, end = record["sections"][-1]
+        assert title == "Zweite"
+        assert data[start:end].decode("utf-8") == "## Zweite\n\nmehr\n"
+
+    def test_refresh_reindexes_only_changed_documents(self, project):
+        """Test that unchanged or merely touched documents are reused."""
+        _, first = context.update_context_index(project)
+        assert first == [
+            "SYSTEM_ARCHITECTURE.md",
+            "GLOSSARY.md",
+            "STATUS_MANIFEST.yaml",
+            "plans/1.1-core.md",
+        ]
+
+        (project / "GLOSSARY.md").touch()
+        (project / "plans" / "1.1-core.md").write_text(PLAN + "\nMore.\n")
+        _, second = context.update_context_index(project)
+
+        assert second == ["plans/1.1-core.md"]
+        assert context.update_context_index(project)[1] == []
+        assert len(context.update_context_index(project, full=True)[1]) == 4
+
+
+class TestBuildPack:
+    """Test what goes into a component's pack."""
+
+    def test_pack_contents(self, project):
+        """Test the manifest entry, architecture, glossary and plan parts."""
+        pack = context.build_pack(project, "2.1-tasks")
+
+        assert part(pack, "manifest").startswith("2.1-tasks:\n")
+        assert "# Services" not in part(pack, "manifest")
+        architecture = part(pack, "architecture")
+        assert architecture.startswith("### 2.2 Task Service")
+        assert "Tasks live in Postgres." in architecture
+        assert "## 3. Deployment" not in architecture
+        assert "Tenant" in part(pack, "glossary")
+        assert "Queue" not in part(pack, "glossary")
+        assert part(pack, "plan") == PLAN.strip()
+        assert pack.missing == ["plans/1.2-auth.md"]
+        assert pack.tokens < context.estimate_tokens(
+            MANIFEST + ARCHITECTURE + GLOSSARY + PLAN
+        )
+
+    def test_plan_budget_cuts_at_sections(self, project):
+        """Test that a long plan is cut at a section boundary."""
+        pack = context.build_pack(project, "2.1-tasks", plan_budget=20)
+        plan = [p for p in pack.parts if p.kind == "plan"][0]
+
+        assert plan.truncated
+        assert plan.text.endswith("persists a model.")
+        assert "[... truncated" in pack.render()
+
+    def test_unknown_component(self, project):
+        """Test that an id missing from the manifest is an error."""
+        with pytest.raises(ManifestError):
+            context.build_pack(project, "9.9-nope")
+
+
+class TestContextCommand:
+    """Test the ``context`` command line."""
+
+    def test_json_pack(self, project, capsys):
+        """Test that --json reports the parts with token estimates."""
+        assert main(["context", "2.1-tasks", "--root", str(project), "--json"]) == 0
+
+        report = json.loads(capsys.readouterr().out)
+        assert [p["kind"] for p in report["parts"]] == [
+            "manifest",
+            "architecture",
+            "glossary",
+            "plan",
+        ]
+        assert all(p["tokens"] > 0 for p in report["parts"])
+        assert (project / ".axiomancer_cache" / "context.json").is_file()
+
+    def test_refresh_only(self, project, capsys):
+        """Test that without a component the index is refreshed and summarised."""
+        assert main(["context", "--root", str(project)]) == 0
+
+        summary = json.loads(capsys.readouterr().out)
+        assert summary["documents"] == 4
+        assert summary["terms"] == 4
+        assert summary["components"] == 2
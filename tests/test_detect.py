@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""Tests for bounded project type detection."""
+
+import json
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from axiomancer import detect
+from axiomancer.cli import main
+
+
+@pytest.fixture
+def temp_dir():
+    """Create a temporary working directory."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield Path(tmpdir)
+
+
+def write_tree(root, files):
+    """Write a mapping of relative paths to contents under root."""
+    for path, content in files.items():
+        full_path = root / path
+        full_path.parent.mkdir(parents=True, exist_ok=True)
+        full_path.write_text(content)
+
+
+@pytest.fixture
+def web_project(temp_dir):
+    """A TypeScript React app with vendored and ignored clutter."""
+    write_tree(
+        temp_dir,
+        {
+            "package.json": json.dumps(
+                {
+                    "dependencies": {"react": "^18", "react-dom": "^18"},
+                    "devDependencies": {"vitest": "^1"},
+                }
+            ),
+            ".gitignore": "/generated/\n*.log\n!keep.log\n",
+            ".gitattributes": "*.psd filter=lfs diff=lfs merge=lfs -text\n",
+            "src/App.tsx": "export const App = () => null;\n" * 20,
+            "src/util.ts": "export const x = 1;\n",
+            "src/legacy.js": "module.exports = {};\n",
+            "src/app.test.tsx": "test('renders', () => {});\n",
+            "generated/big.py": "x = 1\n" * 1000,
+            "node_modules/react/index.js": "x\n" * 1000,
+            "debug.log": "noise\n",
+            "keep.log": "kept\n",
+            "art/logo.psd": "binary\n",
+            "scripts/build.sh": "#!/bin/sh\n",
+        },
+    )
+    return temp_dir
+
+
+class TestIgnoreRules:
+    """Test the .gitignore subset the walker understands."""
+
+    def test_patterns(self):
+        """Test anchoring, directory-only rules, ** and negation."""
+        rules = detect.parse_ignore("/build/\n*.log\n!keep.log\ndocs/**/*.tmp\n")
+
+        assert detect.is_ignored(rules, "build", True)
+        assert not detect.is_ignored(rules, "src/build", True)
+        assert not detect.is_ignored(rules, "build", False)
+        assert detect.is_ignored(rules, "a/b/debug.log", False)
+        assert not detect.is_ignored(rules, "keep.log", False)
+        assert detect.is_ignored(rules, "docs/x/y/z.tmp", False)
+        assert detect.is_ignored(rules, "docs/z.tmp", False)
+
+    def test_nested_rules_are_relative(self):
+        """Test that a nested .gitignore only applies below its directory."""
+        rules = detect.parse_ignore("/out\n", base="web")
+
+        assert detect.is_ignored(rules, "web/out", True)
+        assert not detect.is_ignored(rules, "out", True)
+
+
+class TestDetect:
+    """Test the walk, histogram and framework guesses."""
+
+    def test_web_project(self, web_project):
+        """Test that clutter is pruned and the stack is recognised."""
+        result = detect.detect(web_project).to_dict()
+
+        assert result["primary_language"] == "TypeScript"
+        assert result["extension"] == ".tsx"
+        assert [entry["language"] for entry in result["languages"]] == [
+            "TypeScript",
+            "JavaScript",
+            "Shell",
+        ]
+        assert result["manifests"] == ["package.json"]
+        assert [f["name"] for f in result["frameworks"]] == ["React", "Vitest"]
+        assert result["test_frameworks"] == ["Vitest"]
+        assert result["stats"]["complete"] is True
+        assert result["stats"]["pruned"] == 1  # node_modules
+        # generated/, debug.log and the LFS asset
+        assert result["stats"]["ignored"] == 3
+
+    def test_budget_stops_early(self, temp_dir):
+        """Test that the file limit cuts the walk and reports it."""
+        write_tree(
+            temp_dir,
+            {f"pkg{i}/mod{j}.go": "package p\n" for i in range(20) for j in range(5)},
+        )
+
+        result = detect.detect(temp_dir, max_files=12).to_dict()
+
+        assert result["stats"]["complete"] is False
+        assert result["stats"]["pending_directories"] > 0
+        assert result["primary_language"] == "Go"
+        assert result["test_frameworks"] == ["go test"]
+
+    def test_large_directories_are_sampled(self, temp_dir, monkeypatch):
+        """Test that sampled counts are scaled back to the directory size."""
+        monkeypatch.setattr(detect, "DIR_SAMPLE", 10)
+        write_tree(temp_dir, {f"m{i}.py": "x = 1\n" for i in range(40)})
+
+        result = detect.detect(temp_dir).to_dict()
+
+        assert result["languages"][0] == {
+            "language": "Python",
+            "files": 40,
+            "bytes": 240,
+            "share": 1.0,
+        }
+        assert result["stats"]["sampled_directories"] == 1
+
+    def test_manifest_only_project(self, temp_dir):
+        """Test that a new project's manifest names its language."""
+        write_tree(
+            temp_dir, {"pyproject.toml": '[project]\ndependencies = ["fastapi"]\n'}
+        )
+
+        result = detect.detect(temp_dir).to_dict()
+
+        assert result["primary_language"] == "Python"
+        assert result["frameworks"] == [
+            {"name": "FastAPI", "kind": "web", "evidence": "pyproject.toml"}
+        ]
+
+
+class TestDetectCommand:
+    """Test the ``detect`` command line."""
+
+    def test_json_output(self, web_project, capsys):
+        """Test that the command prints the detection as JSON."""
+        assert main(["detect", str(web_project), "--budget", "5"]) == 0
+
+        assert json.loads(capsys.readouterr().out)["primary_language"] == "TypeScript"
+
+    def test_bad_root(self, temp_dir, capsys):
+        """Test that a missing directory is a clean error."""
+        assert main(["detect", str(temp_dir / "missing")]) == 1
+        assert "Not a directory" in capsys.readouterr().err
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""Tests for the content-addressed evidence store."""
+
+import json
+import sys
+import tempfile
+import zlib
+from pathlib import Path
+
+import pytest
+
+from axiomancer import evidence
+from axiomancer.cli import main
+from axiomancer.errors import EvidenceError
+
+PYTEST_OUTPUT = b"""\
+tests/test_a.py ....s.F
+=========================== short test summary info ============================
+FAILED tests/test_a.py::test_f - assert 1 == 2
+Name      Stmts   Miss  Cover
+-----------------------------
+a.py         40      3    92%
+TOTAL        40      3    92%
+============== 1 failed, 5 passed, 1 skipped in 0.12s ==============
+"""
+
+
+@pytest.fixture
+def temp_dir():
+    """Create a temporary working directory."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield Path(tmpdir)
+
+
+class TestSummarize:
+    """Test extraction of counts and coverage from runner output."""
+
+    def test_pytest_with_coverage(self):
+        """Test pytest totals and a coverage.py report."""
+        assert evidence.summarize(PYTEST_OUTPUT.decode()) == {
+            "passed": 5,
+            "failed": 1,
+            "skipped": 1,
+            "coverage": 92.0,
+        }
+
+    def test_other_runners(self):
+        """Test unittest, Jest, cargo and go output."""
+        unittest = "Ran 7 tests in 0.01s\n\nFAILED (failures=1, errors=1)\n"
+        jest = "Tests:       2 failed, 10 passed, 12 total\nAll files | 81.5 |"
+        cargo = "test result: ok. 4 passed; 0 failed; 1 ignored; 0 measured"
+        go = "--- PASS: TestA\n--- FAIL: TestB\ncoverage: 66.7% of statements\n"
+
+        assert evidence.summarize(unittest) == {"passed": 5, "failed": 2}
+        assert evidence.summarize(jest) == {
+            "passed": 10,
+            "failed": 2,
+            "coverage": 81.5,
+        }
+        assert evidence.summarize(cargo) == {"passed": 4, "failed": 0, "skipped": 1}
+        assert evidence.summarize(go) == {
+            "passed": 1,
+            "failed": 1,
+            "skipped": 0,
+            "coverage": 66.7,
+        }
+        assert evidence.summarize("all good\n") == {}
+
+    def test_per_binary_and_per_package_results_are_added_up(self):
+        """Test that every cargo binary and go package counts."""
+        cargo = (
+            "test result: ok. 3 passed; 0 failed; 0 ignored; 0 measured\n"
+            "test result: FAILED. 5 passed; 1 failed; 2 ignored; 0 measured\n"
+            "   Doc-tests demo\n"
+            "test result: ok. 0 passed; 0 failed; 0 ignored; 0 measured\n"
+        )
+        go = (
+            "--- PASS: TestA\n--- PASS: TestB\n"
+            "ok  \texample.com/a\t0.01s\tcoverage: 80.0% of statements\n"
+            "--- PASS: TestC\n"
+            "ok  \texample.com/b\t0.02s\tcoverage: 50.0% of statements\n"
+        )
+
+        assert evidence.summarize(cargo) == {"passed": 8, "failed": 1, "skipped": 2}
+        assert evidence.summarize(go) == {
+            "passed": 3,
+            "failed": 0,
+            "skipped": 0,
+            "coverage": 65.0,
+        }
+
+
+class TestStore:
+    """Test blob storage, the index and reference lookup."""
+
+    def test_record_and_read_back(self, temp_dir):
+        """Test that output is stored compressed and found by prefix."""
+        entry = evidence.record(
+            temp_dir, PYTEST_OUTPUT, "pytest --cov", 1, "test", "1.1-core", 0.5
+        )
+
+        digest = entry["id"]
+        blob = temp_dir / ".axiomancer_cache" / "evidence" / "objects" / digest[:2]
+        assert zlib.decompress((blob / digest[2:]).read_bytes()) == PYTEST_OUTPUT
+        assert evidence.read_blob(temp_dir, "evidence:" + digest[:8]) == PYTEST_OUTPUT
+        assert entry["failed"] == 1 and entry["coverage"] == 92.0
+        assert evidence.load_index(temp_dir) == [entry]
+
+    def test_identical_output_is_stored_once(self, temp_dir):
+        """Test that repeated output shares a blob but gets its own record."""
+        first = evidence.record(temp_dir, b"3 passed\n", "pytest")
+        second = evidence.record(temp_dir, b"3 passed\n", "pytest", component="x")
+
+        objects = temp_dir / ".axiomancer_cache" / "evidence" / "objects"
+        assert first["id"] == second["id"]
+        assert len(list(objects.rglob("*"))) == 2  # one directory, one blob
+        assert len(evidence.load_index(temp_dir)) == 2
+        assert evidence.latest(evidence.load_index(temp_dir), "x") == [second]
+
+    def test_bad_references(self, temp_dir):
+        """Test that malformed and unknown references are errors."""
+        with pytest.raises(EvidenceError, match="Not an evidence reference"):
+            evidence.read_blob(temp_dir, "evidence:xyz")
+        with pytest.raises(EvidenceError, match="No evidence matches"):
+            evidence.read_blob(temp_dir, "abcdef")
+
+    def test_reference_from_another_clone_names_the_local_store(self, temp_dir):
+        """Test that a reference recorded elsewhere fails with a clear error."""
+        entry = evidence.record(temp_dir / "a", b"1 passed\n", "pytest")
+
+        with pytest.raises(EvidenceError, match=r"in this clone.*not committed"):
+            evidence.read_blob(temp_dir / "b", f"evidence:{entry['id'][:12]}")
+
+
+class TestEvidenceCommand:
+    """Test the ``evidence`` command line."""
+
+    def test_run_records_and_keeps_exit_status(self, temp_dir, capsys):
+        """Test that run echoes output, records it and exits like the command."""
+        script = "print('2 passed'); raise SystemExit(3)"
+
+        status = main(
+            [
+                "evidence",
+                "--root",
+                str(temp_dir),
+                "run",
+                "--component",
+                "1.1-core",
+                "--",
+                sys.executable,
+                "-c",
+                script,
+            ]
+        )
+
+        assert status == 3
+        out = capsys.readouterr().out
+        assert out.startswith("2 passed\n")
+        assert "evidence:" in out and "❌ 2 passed" in out
+        (entry,) = evidence.load_index(temp_dir)
+        assert entry["exit_status"] == 3 and entry["component"] == "1.1-core"
+
+    def test_run_json_echoes_output_to_stderr(self, temp_dir, capsys):
+        """Test that run --json leaves only the record on stdout."""
+        root = ["evidence", "--root", str(temp_dir)]
+        script = "print('2 passed')"
+
+        status = main(root + ["run", "--json", "--", sys.executable, "-c", script])
+
+        assert status == 0
+        captured = capsys.readouterr()
+        assert captured.err == "2 passed\n"
+        assert json.loads(captured.out)["passed"] == 2
+
+    def test_add_list_and_show(self, temp_dir, capsys):
+        """Test recording a saved log, the plan table and retrieval."""
+        log = temp_dir / "pytest.log"
+        log.write_bytes(PYTEST_OUTPUT)
+        root = ["evidence", "--root", str(temp_dir)]
+
+        assert main(root + ["add", "--command", "pytest", "--json", str(log)]) == 0
+        entry = json.loads(capsys.readouterr().out)
+        assert main(root + ["list", "--markdown"]) == 0
+        table = capsys.readouterr().out
+        assert main(root + ["show", entry["id"][:6]]) == 0
+
+        assert (
+            "| test | `pytest` | ✅ 5 passed, 1 failed, 1 skipped, 92% coverage |"
+            in (table)
+        )
+        assert f"`evidence:{entry['id'][:12]}`" in table
+        assert capsys.readouterr().out == PYTEST_OUTPUT.decode()
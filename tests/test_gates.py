@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""Tests for the cached quality-gate runner."""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from axiomancer import gates
+from axiomancer.cli import main
+
+CONTRIBUTING = """\
+# Contributing
+
+#### The Inner Ring (Unit Tests)
+
+```python
+assert make_task().done is False
+```
+
+#### The Outer Ring (Quality Gates)
+
+Quality Gate Commands:
+```bash
+black --check .; mypy .; pytest --cov=src
+```
+
+**4.1. Test Evidence**
+```bash
+# Unit test evidence
+pytest tests/unit
+# All tests must pass
+
+# Integration test evidence
+{{INTEGRATION_TEST_COMMAND}}
+
+# Coverage evidence
+pytest --cov=src
+```
+"""
+
+
+@pytest.fixture
+def temp_dir():
+    """Create a temporary working directory."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield Path(tmpdir)
+
+
+def python_gate(ring, code):
+    """A gate running a line of Python that appends to ``runs.log``."""
+    script = f"open('runs.log', 'a').write({ring!r} + chr(10)); {code}"
+    return gates.Gate(ring, f'"{sys.executable}" -c "{script}"')
+
+
+def runs(root):
+    """Rings of the gates that actually ran, in order."""
+    path = root / "runs.log"
+    return path.read_text().split() if path.exists() else []
+
+
+class TestParseGates:
+    """Test reading gate definitions from CONTRIBUTING.md."""
+
+    def test_rings_from_headings_and_comments(self):
+        """Test ring assignment, splitting, placeholders and code examples."""
+        assert [(g.ring, g.command) for g in gates.parse_gates(CONTRIBUTING)] == [
+            ("inner", "pytest tests/unit"),
+            ("outer", "black --check ."),
+            ("outer", "mypy ."),
+            ("outer", "pytest --cov=src"),
+        ]
+
+    def test_tilde_and_nested_fences(self):
+        """Test that ~~~ blocks are read and nested fences stay content."""
+        text = (
+            "#### The Inner Ring (Unit Tests)\n"
+            "~~~bash\npytest tests/unit\n~~~\n"
+            "#### The Outer Ring (Quality Gates)\n"
+            "````markdown\n```bash\nnot-a-gate\n```\n````\n"
+            "~~~ Shell\nflake8 .\n~~~\n"
+        )
+
+        assert [(g.ring, g.command) for g in gates.parse_gates(text)] == [
+            ("inner", "pytest tests/unit"),
+            ("outer", "flake8 ."),
+        ]
+
+    def test_split_commands_respects_quotes(self):
+        """Test that semicolons inside quotes do not split a command."""
+        assert gates.split_commands("a; echo 'x; y' ;b") == ["a", "echo 'x; y'", "b"]
+
+    def test_tool_of(self):
+        """Test tool detection through env assignments and python -m."""
+        assert gates.tool_of("CI=1 python3 -m mypy src") == (
+            "mypy",
+            ["python3", "-m", "mypy", "--version"],
+        )
+        assert gates.tool_of("npm run lint")[0] == "npm"
+
+
+class TestGateRunner:
+    """Test caching, input selection and ring ordering."""
+
+    def test_unchanged_gates_are_cached(self, temp_dir):
+        """Test that a gate reruns when any file it may read changes."""
+        (temp_dir / ".gitignore").write_text("runs.log\nbuild/\n")
+        (temp_dir / "app.py").write_text("x = 1\n")
+        suite = [python_gate("inner", "pass"), python_gate("outer", "pass")]
+
+        first, _ = gates.GateRunner(temp_dir).run(suite)
+        second, timings = gates.GateRunner(temp_dir).run(suite)
+        (temp_dir / "build").mkdir()
+        (temp_dir / "build" / "report.xml").write_text("ignored output\n")
+        gates.GateRunner(temp_dir).run(suite)
+        (temp_dir / "data.txt").write_text("test data, not Python\n")
+        gates.GateRunner(temp_dir).run(suite)
+
+        assert [r.cached for r in first + second] == [False, False, True, True]
+        assert timings["outer"] == {
+            **timings["outer"],
+            "ran": 0,
+            "cached": 1,
+            "passed": True,
+        }
+        assert runs(temp_dir) == ["inner", "outer", "inner", "outer"]
+
+    def test_failing_ring_stops_later_rings(self, temp_dir):
+        """Test that the outer ring waits for the inner ring to pass."""
+        (temp_dir / ".gitignore").write_text("runs.log\n")
+        suite = [python_gate("inner", "raise SystemExit(2)"), python_gate("outer", "")]
+
+        results, timings = gates.GateRunner(temp_dir).run(suite)
+        assert [(r.ring, r.returncode) for r in results] == [("inner", 2)]
+        assert list(timings) == ["inner"]
+
+        results, _ = gates.GateRunner(temp_dir).run(suite, keep_going=True)
+        assert [(r.ring, r.cached) for r in results] == [
+            ("inner", False),
+            ("outer", False),
+        ]
+        assert runs(temp_dir) == ["inner", "inner", "outer"]
+
+    def test_linters_hash_only_their_inputs(self, temp_dir):
+        """Test that data files are inputs of test runners, not of linters."""
+        (temp_dir / "app.py").write_text("x = 1\n")
+        lint, test = gates.Gate("outer", "flake8 ."), gates.Gate("inner", "pytest")
+
+        runner = gates.GateRunner(temp_dir)
+        runner._hash_files()
+        keys = runner.key(lint), runner.key(test)
+        (temp_dir / "data.txt").write_text("expected output\n")
+        runner = gates.GateRunner(temp_dir)
+        runner._hash_files()
+
+        assert runner.key(lint) == keys[0]
+        assert runner.key(test) != keys[1]
+
+    def test_force_ignores_cache(self, temp_dir):
+        """Test that --force reruns gates with unchanged inputs."""
+        suite = [python_gate("inner", "pass")]
+        gates.GateRunner(temp_dir).run(suite)
+        gates.GateRunner(temp_dir, force=True).run(suite)
+
+        assert runs(temp_dir) == ["inner", "inner"]
+
+
+class TestGatesCommand:
+    """Test the ``gates`` command line."""
+
+    def test_failure_report(self, temp_dir, capsys):
+        """Test that a failing gate shows its output and exit status."""
+        (temp_dir / "CONTRIBUTING.md").write_text(
+            "#### The Outer Ring\n\n```bash\n"
+            f'"{sys.executable}" -c "print(42); raise SystemExit(1)"\n```\n'
+        )
+
+        assert main(["gates", "--root", str(temp_dir), "--json"]) == 1
+        report = json.loads(capsys.readouterr().out)
+        assert report["passed"] is False
+        assert report["rings"]["outer"]["ran"] == 1
+
+        assert main(["gates", "--root", str(temp_dir)]) == 1
+        out = capsys.readouterr().out
+        assert "❌ outer" in out and "cached" in out and "\n42\n" in out
+
+    def test_no_gates(self, temp_dir, capsys):
+        """Test that a CONTRIBUTING.md without gate commands is an error."""
+        (temp_dir / "CONTRIBUTING.md").write_text(CONTRIBUTING.split("####")[0])
+
+        assert main(["gates", "--root", str(temp_dir)]) == 1
+        assert "No gate commands" in capsys.readouterr().err
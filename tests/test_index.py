@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""Tests for the persisted analysis index and incremental re-analysis."""
+
+import json
+import subprocess
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from axiomancer import index
+from axiomancer.cli import main
+from axiomancer.sections import split_sections
+from axiomancer.state import STATE_DIR_NAME
+
+
+@pytest.fixture
+def temp_dir():
+    """Create a temporary working directory."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield Path(tmpdir)
+
+
+def write_tree(root, files):
+    """Write a mapping of relative paths to contents under root."""
+    for path, content in files.items():
+        full_path = root / path
+        full_path.parent.mkdir(parents=True, exist_ok=True)
+        full_path.write_text(content)
+
+
+def git(root, *args):
+    """Run a git command in root with a throwaway identity."""
+    subprocess.run(
+        ["git", "-c", "user.name=Test", "-c", "user.email=test@example.com", *args],
+        cwd=root,
+        check=True,
+        capture_output=True,
+    )
+
+
+@pytest.fixture
+def project(temp_dir):
+    """A small project with a status manifest and architecture document."""
+    write_tree(
+        temp_dir,
+        {
+            "app/__init__.py": "",
+            "app/auth/__init__.py": "",
+            "app/auth/models.py": "from app.database.models import Base\n",
+            "app/database/__init__.py": "",
+            "app/database/models.py": "import sqlalchemy\n",
+            "app/api/__init__.py": "",
+            "app/api/users.py": "from app.auth import models\n",
+            "STATUS_MANIFEST.yaml": (
+                "components:\n"
+                "  1.1-database:\n"
+                '    name: "Database Layer"\n'
+                '    location: "app/database/"\n'
+                "  2.1-auth:\n"
+                '    name: "Authentication"\n'
+                '    location: "./app/auth"\n'
+                "  3.1-api:\n"
+                '    name: "{{API_LAYER_NAME}}"\n'
+                '    location: "{{API_PATH}}"\n'
+            ),
+            "SYSTEM_ARCHITECTURE.md": (
+                "# Architecture\n\n"
+                "## Database Layer\n\nModels live in `app/database/`.\n\n"
+                "## Authentication\n\nDepends on 1.1-database.\n\n"
+                "```bash\n# Database Layer is not a heading here\n```\n"
+            ),
+        },
+    )
+    return temp_dir
+
+
+class TestUpdateIndex:
+    """Test full and incremental index updates."""
+
+    def test_first_run_is_a_full_scan(self, project):
+        """Test that the first run parses everything and persists the index."""
+        stored, _, update = index.update_index(project, workers=1)
+
+        assert update.full is True
+        assert update.parsed == 7
+        assert (project / STATE_DIR_NAME / "index.json").is_file()
+        assert "*" in (project / STATE_DIR_NAME / ".gitignore").read_text()
+        assert stored["owners"]["app/auth/models.py"] == ["2.1-auth"]
+        assert index.load_index(project)["files"].keys() == stored["files"].keys()
+
+    def test_unchanged_tree_parses_nothing(self, project):
+        """Test that a second run outside git re-parses no file."""
+        index.update_index(project, workers=1)
+        _, _, update = index.update_index(project, workers=1)
+
+        assert update.full is False
+        assert update.parsed == 0
+        assert update.changed == []
+        assert update.stale_components == []
+
+    def test_reports_stale_clusters_components_and_sections(self, project):
+        """Test that one edited file marks its cluster, component and sections."""
+        index.update_index(project, workers=1)
+        (project / "app/database/models.py").write_text(
+            "import sqlalchemy\nimport alembic\n"
+        )
+        _, graph, update = index.update_index(project, workers=1)
+
+        assert update.parsed == 1
+        assert update.changed == ["app/database/models.py"]
+        assert update.stale_clusters == ["app/database"]
+        assert update.stale_components == ["1.1-database"]
+        assert [(s["heading"], s["line"]) for s in update.stale_sections] == [
+            ("Database Layer", 3),
+            ("Authentication", 7),
+        ]
+        assert graph.external["alembic"] == 1
+
+    def test_new_edge_marks_both_clusters_stale(self, project):
+        """Test that clusters whose scores change are reported too."""
+        index.update_index(project, workers=1)
+        (project / "app/api/users.py").write_text(
+            "from app.auth import models\nfrom app.database import models\n"
+        )
+        _, _, update = index.update_index(project, workers=1)
+
+        assert update.stale_clusters == ["app/api", "app/database"]
+
+    def test_deleted_file_uses_stored_owner(self, project):
+        """Test that a deleted file is dropped and its component is stale."""
+        index.update_index(project, workers=1)
+        (project / "app/auth/models.py").unlink()
+        stored, graph, update = index.update_index(project, workers=1)
+
+        assert update.deleted == ["app/auth/models.py"]
+        assert update.stale_components == ["2.1-auth"]
+        assert "app/auth/models.py" not in stored["files"]
+        assert "app/auth/models.py" not in graph.modules
+
+    def test_git_reports_changed_and_untracked_files(self, project):
+        """Test that inside git only changed and untracked files are parsed."""
+        git(project, "init", "-q")
+        git(project, "add", "-A")
+        git(project, "commit", "-q", "-m", "initial")
+        stored, _, _ = index.update_index(project, workers=1)
+        assert stored["commit"]
+
+        (project / "app/api/users.py").write_text("from app.auth import models  # x\n")
+        (project / "app/api/orders.py").write_text("from app.api import users\n")
+        _, graph, update = index.update_index(project, workers=1)
+
+        assert update.parsed == 2
+        assert update.changed == ["app/api/orders.py", "app/api/users.py"]
+        assert update.stale_components == []
+        assert graph.edges["app/api/orders.py"] == {"app/api/users.py"}
+
+    def test_reverted_uncommitted_changes_are_reparsed(self, project):
+        """Test that files dirty at index time are checked again once reverted."""
+        git(project, "init", "-q")
+        git(project, "add", "-A")
+        git(project, "commit", "-q", "-m", "initial")
+        users = project / "app/api/users.py"
+        committed = users.read_text()
+        users.write_text("from app.database import models\n")
+        (project / "app/api/orders.py").write_text("from app.api import users\n")
+        stored, _, _ = index.update_index(project, workers=1)
+        assert stored["dirty"] == ["app/api/orders.py", "app/api/users.py"]
+
+        users.write_text(committed)
+        (project / "app/api/orders.py").unlink()
+        stored, graph, update = index.update_index(project, workers=1)
+
+        assert update.changed == ["app/api/users.py"]
+        assert update.deleted == ["app/api/orders.py"]
+        assert graph.edges["app/api/users.py"] == {"app/auth/models.py"}
+        assert stored["dirty"] == []
+
+    def test_depth_change_forces_full_scan(self, project):
+        """Test that clusters at another depth are not mixed with stored ones."""
+        index.update_index(project, workers=1)
+        _, _, update = index.update_index(project, depth=2, workers=1)
+
+        assert update.full is True
+
+
+class TestComponentOwners:
+    """Test mapping files to manifest component locations."""
+
+    def test_matches_directories_and_files(self):
+        """Test nested locations, file locations and skipped placeholders."""
+        components = {
+            "a": {"name": "", "location": "src"},
+            "b": {"name": "", "location": "src/auth/"},
+            "c": {"name": "", "location": ["src/auth/jwt.py"]},
+            "d": {"name": "", "location": "{{PATH}}"},
+        }
+        owners = index.component_owners(
+            ["src/auth/jwt.py", "src/db.py", "tests/test_db.py"], components
+        )
+
+        assert owners == {"src/auth/jwt.py": ["a", "b", "c"], "src/db.py": ["a"]}
+
+
+class TestSplitSections:
+    """Test markdown section boundaries."""
+
+    def test_ignores_headings_in_code_fences(self):
+        """Test that offsets cover the text up to the next real heading."""
+        text = "intro\n# One\nbody\n```\n# not a heading\n```\n## Two\n"
+        sections = split_sections(text)
+
+        assert [(s.level, s.title, s.line) for s in sections] == [
+            (0, "", 1),
+            (1, "One", 2),
+            (2, "Two", 7),
+        ]
+        assert text[sections[1].start : sections[1].end].endswith("```\n")
+
+    def test_nested_fences_close_only_on_matching_marker(self):
+        """Test that other or shorter markers inside a fence do not end it."""
+        text = (
+            "# One\n"
+            "````markdown\n```bash\n# inside\n```\n## Also inside\n````\n"
+            "```\n~~~\n# inside too\n~~~\n```\n"
+            "## Two\n"
+        )
+
+        sections = split_sections(text)
+
+        assert [(s.level, s.title, s.line) for s in sections] == [
+            (1, "One", 1),
+            (2, "Two", 13),
+        ]
+
+
+class TestIndexCommand:
+    """Test the ``index`` command line."""
+
+    def test_prints_report_with_summary(self, project, capsys):
+        """Test that --summary embeds the analyze-style summary."""
+        assert main(["index", str(project), "--workers", "1", "--summary"]) == 0
+
+        report = json.loads(capsys.readouterr().out)
+        assert report["full"] is True
+        assert report["analysis"]["languages"] == {"python": 7}
+
+    def test_rejects_manifest_without_components(self, project, capsys):
+        """Test that a manifest without components is a clean error."""
+        (project / "STATUS_MANIFEST.yaml").write_text("project:\n  name: x\n")
+
+        assert main(["index", str(project)]) == 1
+        assert "No components mapping" in capsys.readouterr().err
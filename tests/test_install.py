@@ -6,7 +6,6 @@ import subprocess
 import tempfile
 import threading
 import time
-import zipfile
 from http.server import HTTPServer, SimpleHTTPRequestHandler
 from pathlib import Path
 
@@ -14,6 +13,20 @@ import pytest
 
 
 # Shared fixtures
+@pytest.fixture(scope="session")
+def store_dir():
+    """A content store shared by every install in the test session."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield Path(tmpdir) / "store"
+
+
+@pytest.fixture(autouse=True)
+def isolated_store(store_dir, monkeypatch):
+    """Keep installs out of the real per-user content store."""
+    monkeypatch.setenv("AXIOMANCER_STORE_DIR", str(store_dir))
+    return store_dir
+
+
 @pytest.fixture
 def temp_project_dir():
     """Create a temporary project directory."""
@@ -54,6 +67,80 @@ def simple_http_server(axiomancer_repo_dir):
     server.shutdown()
 
 
+@pytest.fixture
+def archive_server(axiomancer_repo_dir, temp_project_dir):
+    """Serve a release bundle of the repo with ETag and Range support."""
+    import hashlib
+    import io
+
+    served_dir = temp_project_dir / "served"
+    result = subprocess.run(
+        f"DIST_DIR={served_dir} ./build-bundle.sh 0.0.0-test",
+        shell=True,
+        cwd=axiomancer_repo_dir,
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, f"Bundle build failed: {result.stderr}"
+    archive = served_dir / "axiomancer.tar.gz"
+
+    requests = []
+
+    class Handler(SimpleHTTPRequestHandler):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, directory=str(served_dir), **kwargs)
+
+        def send_head(self):
+            path = Path(self.translate_path(self.path))
+            if not path.is_file():
+                return super().send_head()
+            data = path.read_bytes()
+            end = len(data)
+            cut = served_dir / "cut"
+            if cut.exists():
+                # Drop the connection halfway through this one transfer
+                cut.unlink()
+                end = len(data) // 2
+            etag = '"%s"' % hashlib.sha256(data).hexdigest()[:16]
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return None
+            start = 0
+            range_header = self.headers.get("Range", "")
+            if range_header.startswith("bytes="):
+                start = int(range_header[len("bytes=") :].split("-")[0])
+                self.send_response(206)
+                self.send_header(
+                    "Content-Range", f"bytes {start}-{len(data) - 1}/{len(data)}"
+                )
+            else:
+                self.send_response(200)
+            self.send_header("Content-Type", "application/gzip")
+            self.send_header("Content-Length", str(len(data) - start))
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return io.BytesIO(data[start:end])
+
+        def log_request(self, code="-", size="-"):
+            requests.append((self.headers.get("Range"), int(code)))
+
+        def log_message(self, format, *args):
+            pass
+
+    server = HTTPServer(("localhost", 0), Handler)
+    server_thread = threading.Thread(target=server.serve_forever)
+    server_thread.daemon = True
+    server_thread.start()
+    time.sleep(0.1)
+
+    url = f"http://localhost:{server.server_address[1]}/axiomancer.tar.gz"
+    yield url, archive, requests
+
+    server.shutdown()
+
+
 def run_shell_command(cmd, cwd=None, input_data=None):
     """Run a shell command and return result."""
     result = subprocess.run(
@@ -67,6 +154,22 @@ def run_shell_command(cmd, cwd=None, input_data=None):
     return result
 
 
+def run_remote_install(install_script_path, target, cache_dir, url, *args, **env):
+    """Run install.sh as if piped from curl, against a local bundle URL."""
+    full_env = os.environ.copy()
+    full_env.update(
+        AXIOMANCER_BUNDLE_URL=url, AXIOMANCER_CACHE_DIR=str(cache_dir), **env
+    )
+    return subprocess.run(
+        f"bash -s -- {' '.join(args)} {target}",
+        shell=True,
+        capture_output=True,
+        text=True,
+        input=install_script_path.read_text(),
+        env=full_env,
+    )
+
+
 class TestInstallScript:
     """Test suite for install.sh script."""
 
@@ -205,6 +308,7 @@ class TestInstallScript:
             ".axiomantic/templates/SUMMONER.md",
             ".axiomantic/templates/PROJECT_BOOTSTRAP.md",
             ".axiomantic/README.md",
+            ".axiomantic/axiomancer/render.py",
             ".claude/commands/axiomancer.md",  # Symlink
             ".opencode/commands/axiomancer.md"  # Symlink
         ]
@@ -213,6 +317,20 @@ class TestInstallScript:
             full_path = temp_project_dir / file_path
             assert full_path.exists(), f"Expected file not found: {file_path}"
 
+    def test_creates_lean_mode_commands(self, install_script_path, temp_project_dir):
+        """Test that per-mode commands are assembled smaller than the full one."""
+        result = self.run_shell_command(str(install_script_path), cwd=temp_project_dir)
+
+        assert result.returncode == 0, f"Install failed: {result.stderr}"
+        commands = temp_project_dir / ".axiomantic" / "commands"
+        full = (commands / "axiomancer.md").read_text()
+        for mode in ("new", "existing"):
+            lean = (commands / f"axiomancer-{mode}.md").read_text()
+            assert len(lean) < len(full)
+            assert "<!-- section:" not in lean
+            link = temp_project_dir / ".claude" / "commands" / f"axiomancer-{mode}.md"
+            assert link.is_symlink() and link.read_text() == lean
+
     def test_output_contains_instructions(self, install_script_path, temp_project_dir):
         """Test that output contains proper usage instructions."""
         cmd = str(install_script_path)
@@ -232,7 +350,7 @@ class TestInstallScript:
         
         # Verify that the script checks for required tools
         assert "command -v curl" in content, "Script should check for curl"
-        assert "command -v unzip" in content, "Script should check for unzip"
+        assert "command -v tar" in content, "Script should check for tar"
         
         # Test actual dependency checking by creating a script that fails curl check
         test_script = temp_project_dir / "test_deps.sh"
@@ -459,5 +577,447 @@ class TestInstallScriptEdgeCases:
         assert claude_link.resolve() == opencode_link.resolve(), "Both symlinks should point to same file"
 
 
+class TestFleetInstall:
+    """Test installing into many targets from a single payload."""
+
+    def test_installs_multiple_targets(self, install_script_path, temp_project_dir):
+        """Test that every target listed on the command line is installed."""
+        targets = [temp_project_dir / f"repo_{i}" for i in range(5)]
+        for target in targets:
+            target.mkdir()
+
+        cmd = f"{install_script_path} --jobs 2 " + " ".join(str(t) for t in targets)
+        result = run_shell_command(cmd)
+
+        assert result.returncode == 0, f"Fleet install failed: {result.stdout}"
+        assert "5 succeeded, 0 failed" in result.stdout
+        for target in targets:
+            link = target / ".claude" / "commands" / "axiomancer.md"
+            assert link.is_symlink(), f"Symlink missing in {target}"
+            assert os.readlink(link) == "../../.axiomantic/commands/axiomancer.md"
+            assert (target / ".axiomantic" / "templates" / "AGENT.md").exists()
+
+    def test_reads_targets_from_stdin(self, install_script_path, temp_project_dir):
+        """Test that targets are read from stdin and failures are summarized."""
+        good = temp_project_dir / "good"
+        good.mkdir()
+        missing = temp_project_dir / "missing"
+
+        result = run_shell_command(
+            f"{install_script_path} -",
+            input_data=f"{good}\n\n# comment\n{missing}\n",
+        )
+
+        assert result.returncode == 1, "Fleet install should fail if any target fails"
+        assert f"✅ {good}" in result.stdout
+        assert f"❌ {missing}: Target directory" in result.stdout
+        assert "1 succeeded, 1 failed" in result.stdout
+        assert (good / ".axiomantic" / "commands" / "axiomancer.md").exists()
+
+    def test_rejects_invalid_job_count(self, install_script_path, temp_project_dir):
+        """Test that --jobs must be a positive integer."""
+        result = run_shell_command(f"{install_script_path} --jobs 0 {temp_project_dir}")
+
+        assert result.returncode == 1
+        assert "--jobs must be a positive integer" in result.stdout
+
+
+class TestContentStore:
+    """Test materializing installs from the shared content store."""
+
+    def test_targets_share_one_read_only_entry(
+        self, install_script_path, temp_project_dir
+    ):
+        """Test that installs reuse one store entry instead of new copies."""
+        store = temp_project_dir / "store"
+        targets = [temp_project_dir / f"repo_{i}" for i in range(3)]
+        for target in targets:
+            target.mkdir()
+
+        result = run_shell_command(
+            f"AXIOMANCER_STORE_DIR={store} {install_script_path} "
+            + " ".join(str(t) for t in targets)
+        )
+
+        assert result.returncode == 0, f"Install failed: {result.stdout}"
+        entries = [p for p in store.iterdir() if p.is_dir() and p.name[0] != "."]
+        assert len(entries) == 1, "Identical payloads must share one entry"
+        stored = entries[0] / "axiomancer" / "render.py"
+        template = entries[0] / "templates" / "AGENT.md"
+        assert not stored.stat().st_mode & 0o222, "Store files must be read-only"
+        for target in targets:
+            installed = target / ".axiomantic" / "axiomancer" / "render.py"
+            assert installed.read_bytes() == stored.read_bytes()
+            # Same filesystem: hardlinked (or reflinked) rather than copied
+            if installed.stat().st_nlink > 1:
+                assert installed.stat().st_ino == stored.stat().st_ino
+            # Templates get edited, so they never share the store's inodes
+            copy = target / ".axiomantic" / "templates" / "AGENT.md"
+            assert copy.read_bytes() == template.read_bytes()
+            assert copy.stat().st_ino != template.stat().st_ino
+
+    def test_modified_entry_is_rebuilt(self, install_script_path, temp_project_dir):
+        """Test that a store entry changed in place is not reused."""
+        store = temp_project_dir / "store"
+        target = temp_project_dir / "target"
+        target.mkdir()
+        command = f"AXIOMANCER_STORE_DIR={store} {install_script_path} {target}"
+        assert run_shell_command(command).returncode == 0
+
+        (entry,) = [p for p in store.iterdir() if p.is_dir() and p.name[0] != "."]
+        tampered = entry / "axiomancer" / "render.py"
+        original = tampered.read_bytes()
+        tampered.chmod(0o644)
+        tampered.write_bytes(b"tampered")
+
+        result = run_shell_command(command)
+
+        assert result.returncode == 0, f"Install failed: {result.stdout}"
+        assert "was modified, rebuilding it" in result.stdout
+        assert tampered.read_bytes() == original
+        installed = target / ".axiomantic" / "axiomancer" / "render.py"
+        assert installed.read_bytes() == original
+
+    def test_reinstall_replaces_install_in_place(
+        self, install_script_path, temp_project_dir
+    ):
+        """Test that a reinstall swaps the directory and leaves no staging."""
+        stale = temp_project_dir / ".axiomantic" / "templates" / "OLD.md"
+        stale.parent.mkdir(parents=True)
+        stale.write_text("stale")
+
+        result = run_shell_command(str(install_script_path), cwd=temp_project_dir)
+
+        assert result.returncode == 0, f"Install failed: {result.stdout}"
+        assert not stale.exists()
+        assert (temp_project_dir / ".axiomantic" / "templates" / "AGENT.md").exists()
+        assert not list(temp_project_dir.glob(".axiomantic.stage.*"))
+
+    def test_unusable_store_falls_back_to_copies(
+        self, install_script_path, temp_project_dir
+    ):
+        """Test that an unwritable store location does not fail the install."""
+        blocker = temp_project_dir / "not-a-directory"
+        blocker.write_text("")
+        target = temp_project_dir / "target"
+        target.mkdir()
+
+        result = run_shell_command(
+            f"AXIOMANCER_STORE_DIR={blocker}/store {install_script_path} {target}"
+        )
+        assert result.returncode == 0, f"Install failed: {result.stdout}"
+        assert "is not writable, copying instead" in result.stdout
+
+        unused = temp_project_dir / "unused"
+        result = run_shell_command(
+            f"AXIOMANCER_STORE_DIR={unused} {install_script_path} --no-store {target}"
+        )
+        assert result.returncode == 0, f"Install failed: {result.stdout}"
+        assert not unused.exists(), "--no-store must not create the store"
+        assert (target / ".axiomantic" / "commands" / "axiomancer.md").exists()
+
+
+class TestDownloadCache:
+    """Test the conditional, resumable bundle cache used in remote mode."""
+
+    def test_second_install_revalidates_cache(
+        self, install_script_path, archive_server, temp_project_dir
+    ):
+        """Test that an unchanged archive is not downloaded again."""
+        url, _, requests = archive_server
+        cache_dir = temp_project_dir / "cache"
+        for name in ("first", "second"):
+            target = temp_project_dir / name
+            target.mkdir()
+            result = run_remote_install(install_script_path, target, cache_dir, url)
+            assert result.returncode == 0, f"Install failed: {result.stdout}"
+            assert (target / ".axiomantic" / "templates" / "AGENT.md").exists()
+
+        assert [status for _, status in requests] == [200, 304]
+        assert "Cached axiomancer is up to date" in result.stdout
+
+    def test_offline_install_uses_cache_only(
+        self, install_script_path, archive_server, temp_project_dir
+    ):
+        """Test that offline mode installs from the cache without any request."""
+        url, _, requests = archive_server
+        cache_dir = temp_project_dir / "cache"
+        target = temp_project_dir / "target"
+        target.mkdir()
+
+        result = run_remote_install(
+            install_script_path, target, cache_dir, url, "--offline"
+        )
+        assert result.returncode == 1, "Offline mode needs a populated cache"
+        assert "Offline mode needs a verified cached bundle" in result.stdout
+
+        result = run_remote_install(install_script_path, target, cache_dir, url)
+        assert result.returncode == 0, f"Install failed: {result.stdout}"
+        request_count = len(requests)
+
+        result = run_remote_install(
+            install_script_path, target, cache_dir, url, AXIOMANCER_OFFLINE="1"
+        )
+        assert result.returncode == 0, f"Offline install failed: {result.stdout}"
+        assert len(requests) == request_count, "Offline mode must not use the network"
+
+    def test_resumes_partial_download(
+        self, install_script_path, archive_server, temp_project_dir
+    ):
+        """Test that an interrupted transfer is resumed with a Range request."""
+        import hashlib
+
+        url, archive, requests = archive_server
+        cache_dir = temp_project_dir / "cache"
+        entry = cache_dir / hashlib.sha256(url.encode()).hexdigest()[:16]
+        entry.mkdir(parents=True)
+        data = archive.read_bytes()
+        (entry / "axiomancer.tar.gz.part").write_bytes(data[: len(data) // 2])
+
+        target = temp_project_dir / "target"
+        target.mkdir()
+        result = run_remote_install(install_script_path, target, cache_dir, url)
+
+        assert result.returncode == 0, f"Install failed: {result.stdout}"
+        assert requests == [(f"bytes={len(data) // 2}-", 206)]
+        assert (entry / "axiomancer.tar.gz").read_bytes() == data
+
+    def test_keeps_partial_download_after_transfer_error(
+        self, install_script_path, archive_server, temp_project_dir
+    ):
+        """Test that a dropped connection leaves a partial file to resume."""
+        url, archive, requests = archive_server
+        (archive.parent / "cut").touch()
+        cache_dir = temp_project_dir / "cache"
+        target = temp_project_dir / "target"
+        target.mkdir()
+
+        result = run_remote_install(install_script_path, target, cache_dir, url)
+        assert result.returncode == 1
+        assert "Failed to download" in result.stdout
+        (part,) = cache_dir.glob("*/axiomancer.tar.gz.part")
+        received = part.read_bytes()
+        assert received and archive.read_bytes().startswith(received)
+
+        result = run_remote_install(install_script_path, target, cache_dir, url)
+        assert result.returncode == 0, f"Install failed: {result.stdout}"
+        assert requests[-1] == (f"bytes={len(received)}-", 206)
+
+    def test_corrupt_download_falls_back_to_cache(
+        self, install_script_path, archive_server, temp_project_dir
+    ):
+        """Test that a 200 with a broken body installs the verified cache."""
+        url, archive, _ = archive_server
+        cache_dir = temp_project_dir / "cache"
+        target = temp_project_dir / "target"
+        target.mkdir()
+        result = run_remote_install(install_script_path, target, cache_dir, url)
+        assert result.returncode == 0, f"Install failed: {result.stdout}"
+
+        archive.write_bytes(archive.read_bytes()[:100])
+        result = run_remote_install(install_script_path, target, cache_dir, url)
+
+        assert result.returncode == 0, f"Install failed: {result.stdout}"
+        assert "installing from the cached bundle" in result.stdout
+        assert (target / ".axiomantic" / "templates" / "AGENT.md").exists()
+
+        result = run_remote_install(
+            install_script_path,
+            target,
+            cache_dir,
+            url,
+            "--offline",
+            AXIOMANCER_SHA256="0" * 64,
+        )
+        assert result.returncode == 1, "The cache must be checked against the pin"
+
+    def test_rejects_checksum_mismatch(
+        self, install_script_path, archive_server, temp_project_dir
+    ):
+        """Test that a pinned checksum that does not match aborts the install."""
+        url, _, _ = archive_server
+        cache_dir = temp_project_dir / "cache"
+        target = temp_project_dir / "target"
+        target.mkdir()
+
+        result = run_remote_install(
+            install_script_path, target, cache_dir, url, AXIOMANCER_SHA256="0" * 64
+        )
+
+        assert result.returncode == 1
+        assert "Checksum mismatch" in result.stdout
+        assert not (target / ".axiomantic").exists()
+        assert not list(cache_dir.glob("*/axiomancer.tar.gz"))
+
+    def test_accepts_published_payload_digest(
+        self, install_script_path, archive_server, temp_project_dir
+    ):
+        """Test that the digest published next to the bundle is the pin."""
+        url, archive, _ = archive_server
+        published = (archive.parent / "axiomancer.payload.sha256").read_text()
+        target = temp_project_dir / "target"
+        target.mkdir()
+
+        result = run_remote_install(
+            install_script_path,
+            target,
+            temp_project_dir / "cache",
+            url,
+            AXIOMANCER_SHA256=published.split()[0],
+        )
+
+        assert result.returncode == 0, f"Install failed: {result.stdout}"
+        versioned = archive.parent / "axiomancer-0.0.0-test.payload.sha256"
+        assert versioned.read_text() == published
+
+    def test_no_cache_streams_without_writing_cache(
+        self, install_script_path, archive_server, temp_project_dir
+    ):
+        """Test that --no-cache installs straight from the HTTP stream."""
+        url, _, requests = archive_server
+        cache_dir = temp_project_dir / "cache"
+        target = temp_project_dir / "target"
+        target.mkdir()
+
+        result = run_remote_install(
+            install_script_path, target, cache_dir, url, "--no-cache"
+        )
+
+        assert result.returncode == 0, f"Install failed: {result.stdout}"
+        assert "Downloaded axiomancer 0.0.0-test successfully" in result.stdout
+        assert requests == [(None, 200)]
+        assert not cache_dir.exists(), "--no-cache must not populate the cache"
+        assert (target / ".axiomantic" / "axiomancer" / "render.py").exists()
+
+    def test_falls_back_to_branch_archive_without_release(
+        self, install_script_path, archive_server, axiomancer_repo_dir, temp_project_dir
+    ):
+        """Test that a missing latest bundle installs the branch archive."""
+        import tarfile
+
+        url, archive, requests = archive_server
+        with tarfile.open(archive.parent / "main.tar.gz", "w:gz") as tar:
+            for name in ("axiomancer.md", "templates", "axiomancer", "README.md"):
+                tar.add(axiomancer_repo_dir / name, f"axiomancer-main/{name}")
+        missing = url.replace("axiomancer.tar.gz", "missing.tar.gz")
+        archive_url = url.replace("axiomancer.tar.gz", "main.tar.gz")
+        target = temp_project_dir / "target"
+        target.mkdir()
+
+        result = run_remote_install(
+            install_script_path,
+            target,
+            temp_project_dir / "cache",
+            missing,
+            AXIOMANCER_ARCHIVE_URL=archive_url,
+        )
+
+        assert result.returncode == 0, f"Install failed: {result.stdout}"
+        assert "installing from the main branch" in result.stdout
+        assert [status for _, status in requests] == [404, 200]
+        assert (target / ".axiomantic" / "templates" / "AGENT.md").exists()
+
+        pinned = temp_project_dir / "pinned"
+        pinned.mkdir()
+        result = run_remote_install(
+            install_script_path,
+            pinned,
+            temp_project_dir / "cache",
+            missing,
+            AXIOMANCER_ARCHIVE_URL=archive_url,
+            AXIOMANCER_SHA256="0" * 64,
+        )
+        assert result.returncode == 1
+        assert "failed with HTTP 404" in result.stdout
+
+
+class TestReleaseBundle:
+    """Test the lean release bundle built by build-bundle.sh."""
+
+    def test_bundle_contains_only_installable_payload(self, archive_server):
+        """Test that the bundle ships the payload and its checksum manifest."""
+        import tarfile
+
+        _, archive, _ = archive_server
+        with tarfile.open(archive) as tar:
+            names = tar.getnames()
+            sums = tar.extractfile("axiomancer-0.0.0-test/SHA256SUMS").read()
+
+        top_level = {name.split("/")[1] for name in names if "/" in name}
+        assert top_level == {
+            "SHA256SUMS",
+            "VERSION",
+            "axiomancer.md",
+            "templates",
+            "axiomancer",
+        }
+        listed = {line.split()[1] for line in sums.decode().splitlines()}
+        assert "templates/AGENT.md" in listed
+        assert "axiomancer.md" in listed
+
+    def test_tampered_bundle_is_rejected(
+        self, install_script_path, archive_server, temp_project_dir
+    ):
+        """Test that a payload file not matching SHA256SUMS aborts the install."""
+        import io
+        import tarfile
+
+        url, archive, _ = archive_server
+        with tarfile.open(archive) as tar:
+            members = [(m, tar.extractfile(m)) for m in tar.getmembers()]
+            contents = {m.name: f.read() if f else None for m, f in members}
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode="w:gz") as tar:
+            for member, _ in members:
+                data = contents[member.name]
+                if member.name.endswith("/axiomancer.md"):
+                    data = b"tampered"
+                    member.size = len(data)
+                tar.addfile(member, io.BytesIO(data) if data is not None else None)
+        archive.write_bytes(buffer.getvalue())
+
+        target = temp_project_dir / "target"
+        target.mkdir()
+        result = run_remote_install(
+            install_script_path, target, temp_project_dir / "cache", url
+        )
+
+        assert result.returncode == 1
+        assert "Checksum mismatch for axiomancer.md" in result.stdout
+        assert not (target / ".axiomantic").exists()
+
+
+class TestTracing:
+    """Test install spans written to AXIOMANCER_TRACE."""
+
+    def test_install_writes_spans(self, install_script_path, temp_project_dir):
+        """Test that each install step is a span of one trace."""
+        import json
+
+        targets = [temp_project_dir / f"repo_{i}" for i in range(2)]
+        for target in targets:
+            target.mkdir()
+
+        result = run_shell_command(
+            f"AXIOMANCER_TRACE=trace.jsonl AXIOMANCER_STORE_DIR=store "
+            f"{install_script_path} " + " ".join(str(t) for t in targets),
+            cwd=temp_project_dir,
+        )
+
+        assert result.returncode == 0, f"Install failed: {result.stdout}"
+        trace_file = temp_project_dir / "trace.jsonl"
+        spans = [json.loads(line) for line in trace_file.read_text().splitlines()]
+        names = [span["span"] for span in spans]
+        assert names.count("install.target") == 2
+        # A cold store runs the prompt assembler, which adds its own spans
+        assert {"install.store", "install.total", "cli.prompt"} <= set(names)
+        run_id = (temp_project_dir / "trace.jsonl.id").read_text().strip()
+        assert {span["trace"] for span in spans} == {run_id}
+        for span in spans:
+            if span["span"] == "install.target":
+                assert span["attrs"]["files_written"] > 0
+                assert span["duration"] >= 0
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file
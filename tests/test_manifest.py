@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""Tests for the status manifest engine."""
+
+import json
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from axiomancer import manifest as manifest_module
+from axiomancer.cli import main
+from axiomancer.errors import ManifestError
+from axiomancer.manifest import Component, Manifest
+
+MANIFEST = """\
+# TaskFlow - Component Status Manifest
+components:
+  # Core
+  1.1-core:
+    name: "Core"
+    status: COMPLETED
+    dependencies: []
+  1.2-config:
+    name: "Config"
+    status: IN_PROGRESS
+    dependencies: ["1.1-core"]
+  2.1-tasks:
+    name: "Tasks"
+    status: PLANNED
+    dependencies: ["1.1-core"]
+  2.2-users:
+    name: "Users"
+    status: PLANNED
+    dependencies: ["1.2-config"]
+  3.1-api:
+    name: "API"
+    status: PLANNED
+    dependencies: ["2.1-tasks", "2.2-users"]
+  3.2-docs:
+    name: "Docs"
+    status: PLANNED
+    dependencies: ["3.1-api"]
+
+# Metrics and Tracking
+metrics:
+  total_components: {{TOTAL_COMPONENTS}}
+  completed_components: 0  # updated by hand
+  planned_components: 0
+  completion_percentage: 0%
+
+  # Quality Metrics
+  test_coverage_target: 85%
+
+# Risk Assessment
+risks:
+  high_risk_components: []
+  dependency_bottlenecks: []
+"""
+
+
+@pytest.fixture
+def temp_dir():
+    """Create a temporary working directory."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield Path(tmpdir)
+
+
+@pytest.fixture
+def manifest_file(temp_dir):
+    """Write a small manifest with a metrics block still to be filled."""
+    path = temp_dir / "STATUS_MANIFEST.yaml"
+    path.write_text(MANIFEST.replace("{{TOTAL_COMPONENTS}}", "0"))
+    return path
+
+
+def chain(length, status="PLANNED"):
+    """Components where each one depends on the previous one."""
+    return [
+        Component(f"c{n}", "", status, (f"c{n - 1}",) if n else ())
+        for n in range(length)
+    ]
+
+
+class TestQueries:
+    """Test the indexed dependency and status queries."""
+
+    def test_ready_requires_completed_dependencies(self, manifest_file):
+        """Test that only PLANNED components with COMPLETED deps are ready."""
+        manifest = Manifest.load(manifest_file)
+
+        assert manifest.ready() == ["2.1-tasks"]
+
+    def test_dependents_and_dependencies(self, manifest_file):
+        """Test direct and transitive lookups in both directions."""
+        manifest = Manifest.load(manifest_file)
+
+        assert manifest.dependents_of("1.1-core") == ["1.2-config", "2.1-tasks"]
+        assert manifest.dependents_of("1.2-config", transitive=True) == [
+            "2.2-users",
+            "3.1-api",
+            "3.2-docs",
+        ]
+        assert manifest.dependencies_of("3.1-api", transitive=True) == [
+            "1.1-core",
+            "1.2-config",
+            "2.1-tasks",
+            "2.2-users",
+        ]
+        with pytest.raises(ManifestError, match="Unknown component"):
+            manifest.dependents_of("9.9-missing")
+
+    def test_critical_path_skips_completed_work(self, manifest_file):
+        """Test that the longest chain of incomplete components is returned."""
+        manifest = Manifest.load(manifest_file)
+
+        assert manifest.critical_path() == [
+            "1.2-config",
+            "2.2-users",
+            "3.1-api",
+            "3.2-docs",
+        ]
+
+    def test_cycles_are_reported(self):
+        """Test cycle detection and that the critical path refuses cycles."""
+        manifest = Manifest(
+            [
+                Component("a", "", "PLANNED", ("c",)),
+                Component("b", "", "PLANNED", ("a",)),
+                Component("c", "", "PLANNED", ("b",)),
+                Component("d", "", "PLANNED", ("d",)),
+                Component("e", "", "PLANNED", ("a", "missing")),
+            ]
+        )
+
+        assert manifest.cycles() == [["a", "b", "c"], ["d"]]
+        assert manifest.missing == {"e": ["missing"]}
+        with pytest.raises(ManifestError, match="Dependency cycle"):
+            manifest.critical_path()
+
+    def test_bottlenecks_rank_blocked_work(self, manifest_file):
+        """Test that components blocking the most incomplete work rank first."""
+        manifest = Manifest.load(manifest_file)
+
+        assert manifest.blocked_counts()["1.2-config"] == 3
+        assert manifest.bottlenecks() == [
+            "1.2-config",
+            "2.1-tasks",
+            "2.2-users",
+        ]
+
+    def test_deep_chains_do_not_recurse(self):
+        """Test that thousands of chained components are handled iteratively."""
+        manifest = Manifest(chain(5000))
+
+        assert manifest.cycles() == []
+        assert len(manifest.critical_path()) == 5000
+        assert manifest.blocked_counts()["c0"] == 4999
+        assert manifest.ready() == ["c0"]
+
+
+class TestMetrics:
+    """Test metric computation and in-place manifest updates."""
+
+    def test_update_preserves_everything_else(self, manifest_file):
+        """Test that only metric values and bottlenecks change."""
+        manifest = Manifest.load(manifest_file)
+        original = manifest_file.read_text()
+        updated = manifest_module.update_metrics(original, manifest)
+
+        assert "  total_components: 6\n" in updated
+        assert "  completed_components: 1  # updated by hand\n" in updated
+        assert "  completion_percentage: 17%\n" in updated
+        assert "  test_coverage_target: 85%\n" in updated
+        assert (
+            '  dependency_bottlenecks: ["1.2-config", "2.1-tasks", "2.2-users"]\n'
+            in updated
+        )
+        changed = [
+            (old, new)
+            for old, new in zip(original.splitlines(), updated.splitlines())
+            if old != new
+        ]
+        assert len(changed) == 5
+        assert len(updated.splitlines()) == len(original.splitlines())
+
+    def test_fills_template_placeholders(self):
+        """Test that placeholder values in the metrics block are replaced."""
+        text = MANIFEST
+        manifest = Manifest(manifest_module.parse_components({"components": {}}))
+
+        updated = manifest_module.update_metrics(text, manifest)
+
+        assert "{{TOTAL_COMPONENTS}}" not in updated
+        assert "  total_components: 0\n" in updated
+
+    def test_component_blocks(self):
+        """Test that each entry's lines are found without trailing comments."""
+        lines = MANIFEST.splitlines(keepends=True)
+
+        blocks = manifest_module.component_blocks(lines)
+
+        assert len(blocks) == 6
+        start, end = blocks["3.2-docs"]
+        assert "".join(lines[start:end]) == (
+            '  3.2-docs:\n    name: "Docs"\n    status: PLANNED\n'
+            '    dependencies: ["3.1-api"]\n'
+        )
+
+    def test_parsed_manifest_is_cached_by_content(self, manifest_file, monkeypatch):
+        """Test that an unchanged manifest is not parsed again."""
+        Manifest.load(manifest_file)
+
+        def fail(path):
+            raise AssertionError("parsed again")
+
+        monkeypatch.setattr(manifest_module, "load_data_file", fail)
+        assert Manifest.load(manifest_file).ready() == ["2.1-tasks"]
+
+        manifest_file.write_text(MANIFEST.replace("PLANNED", "COMPLETED"))
+        with pytest.raises(AssertionError, match="parsed again"):
+            Manifest.load(manifest_file)
+
+
+class TestManifestCommand:
+    """Test the ``manifest`` command line."""
+
+    def test_metrics_write(self, manifest_file, capsys):
+        """Test that --write updates the file and prints the metrics."""
+        status = main(
+            ["manifest", "metrics", "--manifest", str(manifest_file), "--write"]
+        )
+
+        assert status == 0
+        assert json.loads(capsys.readouterr().out)["completion_percentage"] == 17
+        assert "completion_percentage: 17%" in manifest_file.read_text()
+
+    def test_cycles_exit_status(self, temp_dir, capsys):
+        """Test that finding cycles is a failing exit status."""
+        path = temp_dir / "STATUS_MANIFEST.yaml"
+        path.write_text(
+            "components:\n"
+            "  a: {status: PLANNED, dependencies: [b]}\n"
+            "  b: {status: PLANNED, dependencies: [a]}\n"
+        )
+
+        assert main(["manifest", "cycles", "--manifest", str(path)]) == 1
+        assert json.loads(capsys.readouterr().out) == [["a", "b"]]
+
+    def test_dependents_needs_component(self, manifest_file, capsys):
+        """Test that a missing component id is a clean error."""
+        status = main(["manifest", "dependents", "--manifest", str(manifest_file)])
+
+        assert status == 1
+        assert "needs a component id" in capsys.readouterr().err
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""Tests for anchored, section-level document patches."""
+
+import json
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from axiomancer import patch
+from axiomancer.cli import main
+from axiomancer.errors import PatchError
+from axiomancer.manifest import Manifest
+
+ARCHITECTURE = """\
+# System Architecture
+
+Overview of the system.
+
+## Components
+
+### Auth
+
+Handles login.
+
+### Billing
+
+Charges customers.
+
+```python
+# not a heading
+```
+
+## Data Flow
+
+Requests flow from auth to billing.
+"""
+
+MANIFEST = """\
+project:
+  name: demo
+
+components:
+  # Core
+  auth:
+    name: "Auth"
+    status: PLANNED
+    dependencies: []
+
+  billing:
+    name: "Billing"
+    status: IN_PROGRESS  # started
+    dependencies: [auth]
+
+metrics:
+  total_components: 2
+"""
+
+
+@pytest.fixture
+def temp_dir():
+    """Create a temporary working directory."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield Path(tmpdir)
+
+
+def section_texts(text):
+    """Text of every section by anchor."""
+    return {
+        section.anchor: text[section.start : section.end]
+        for section in patch.anchored_sections(text)
+    }
+
+
+class TestAnchors:
+    """Test anchor lines and section digests."""
+
+    def test_stamp_adds_anchors_and_is_stable(self):
+        """Test that stamping is idempotent and every section is ok."""
+        stamped = patch.stamp(ARCHITECTURE)
+
+        assert "## Data Flow\n<!-- anchor: data-flow sha: " in stamped
+        assert patch.stamp(stamped) == stamped
+        sections = patch.anchored_sections(stamped)
+        assert [section.anchor for section in sections] == [
+            "system-architecture",
+            "components",
+            "auth",
+            "billing",
+            "data-flow",
+        ]
+        assert {patch.section_state(stamped, s) for s in sections} == {"ok"}
+
+    def test_duplicate_headings_get_numbered_anchors(self):
+        """Test that repeated headings get distinct anchors."""
+        text = "## Auth\n### Notes\na\n## Billing\n### Notes\nb\n"
+        anchors = [s.anchor for s in patch.anchored_sections(text)]
+        assert anchors == ["auth", "notes", "billing", "notes-2"]
+
+    def test_anchor_survives_rewording_and_edits_are_detected(self):
+        """Test that anchors are kept and hand edits show as edited."""
+        stamped = patch.stamp(ARCHITECTURE)
+        edited = stamped.replace("## Data Flow", "## Request Flow").replace(
+            "from auth", "from the gateway"
+        )
+
+        (section,) = [
+            s for s in patch.anchored_sections(edited) if s.title == "Request Flow"
+        ]
+        assert section.anchor == "data-flow"
+        assert patch.section_state(edited, section) == "edited"
+
+
+class TestMarkdownPatch:
+    """Test replacing and adding markdown sections."""
+
+    def test_replace_section_with_subsections(self):
+        """Test that only the patched section changes."""
+        text = patch.stamp(ARCHITECTURE)
+        fragment = "### Auth\n\nHandles OAuth2 login.\n\n#### Tokens\n\nShort-lived.\n"
+
+        result, replaced, added, unchanged = patch.patch_markdown(text, fragment)
+
+        assert (replaced, added, unchanged) == (["auth"], [], 4)
+        before, after = section_texts(text), section_texts(result)
+        for anchor in ("system-architecture", "components", "billing", "data-flow"):
+            assert after[anchor] == before[anchor]
+        assert "Handles OAuth2 login." in after["auth"]
+        assert after["tokens"].startswith("#### Tokens\n<!-- anchor: tokens sha: ")
+        assert patch.stamp(result) == result
+
+    def test_matches_by_anchor_line_despite_new_heading(self):
+        """Test that a fragment from show can rename its section."""
+        text = patch.stamp(ARCHITECTURE)
+        fragment = patch.show(Path("a.md"), text, ["data-flow"]).replace(
+            "## Data Flow", "## Request Flow"
+        )
+
+        result, replaced, _, _ = patch.patch_markdown(text, fragment)
+
+        assert replaced == ["data-flow"]
+        assert "## Request Flow\n<!-- anchor: data-flow sha: " in result
+        assert "## Data Flow" not in result
+
+    def test_add_sections_after_anchor_and_at_end(self):
+        """Test placement of new sections and that neighbours stay ok."""
+        text = patch.stamp(ARCHITECTURE)
+        result, _, added, _ = patch.patch_markdown(
+            text, "### Search\n\nIndexes.\n\n### Email\n\nSends.\n", after="billing"
+        )
+        result, _, appended, _ = patch.patch_markdown(
+            result, "## Deployment\n\nDocker.\n"
+        )
+
+        assert (added, appended) == (["search", "email"], ["deployment"])
+        titles = [s.title for s in patch.anchored_sections(result)]
+        assert titles[3:] == ["Billing", "Search", "Email", "Data Flow", "Deployment"]
+        assert result.endswith("Docker.\n")
+        assert {
+            patch.section_state(result, s) for s in patch.anchored_sections(result)
+        } == {"ok"}
+
+    def test_rejects_changes_to_other_sections(self):
+        """Test that a fragment swallowing later headings is refused."""
+        text = patch.stamp(ARCHITECTURE)
+        with pytest.raises(PatchError, match="would change section"):
+            patch.patch_markdown(text, "### Auth\n\n```sh\nunclosed fence\n")
+        with pytest.raises(PatchError, match="Several sections"):
+            patch.patch_markdown("## A\n### X\n## B\n### X\n", "### X\nnew\n")
+        with pytest.raises(PatchError, match="start with the heading"):
+            patch.patch_markdown(text, "no heading\n")
+
+
+class TestManifestPatch:
+    """Test replacing and adding component entries."""
+
+    def test_replace_and_add_components(self):
+        """Test that other entries and blocks stay byte-identical."""
+        fragment = (
+            "billing:\n  name: Billing\n  status: USER_REVIEW\n"
+            "  dependencies: [auth]\n"
+            "search:\n  name: Search\n  status: PLANNED\n"
+        )
+
+        result, replaced, added, unchanged = patch.patch_manifest(MANIFEST, fragment)
+
+        assert (replaced, added, unchanged) == (["billing"], ["search"], 1)
+        assert result.startswith(MANIFEST.split("  billing:")[0])
+        assert result.endswith(
+            "  search:\n    name: Search\n    status: PLANNED\n\n"
+            "metrics:\n  total_components: 2\n"
+        )
+        assert "status: USER_REVIEW\n" in result
+
+    def test_rejects_invalid_patches(self):
+        """Test that invalid YAML and other top-level keys are refused."""
+        with pytest.raises(PatchError, match="not valid YAML"):
+            patch.patch_manifest(MANIFEST, '  auth:\n    name: "Auth\n    x: [\n')
+        with pytest.raises(PatchError, match="Only components"):
+            patch.patch_manifest(MANIFEST, "metrics:\n  total_components: 3\n")
+
+
+class TestPatchCommand:
+    """Test the patch command."""
+
+    def test_apply_writes_only_valid_patches(self, temp_dir, capsys):
+        """Test apply, dry runs and refusals through the CLI."""
+        document = temp_dir / "SYSTEM_ARCHITECTURE.md"
+        document.write_text(ARCHITECTURE)
+        fragment = temp_dir / "changed.md"
+
+        assert main(["patch", "stamp", str(document)]) == 0
+        stamped = document.read_text()
+        fragment.write_text("### Billing\n\nInvoices.\n")
+        assert (
+            main(
+                ["patch", "apply", str(document), "--from", str(fragment), "--dry-run"]
+            )
+            == 0
+        )
+        assert document.read_text() == stamped
+        assert main(["patch", "apply", str(document), "--from", str(fragment)]) == 0
+        assert "replaced billing; 4 other sections unchanged" in capsys.readouterr().out
+        patched = document.read_text()
+        assert "Invoices." in patched
+
+        fragment.write_text("### Auth\n\n```\nunclosed\n")
+        assert main(["patch", "apply", str(document), "--from", str(fragment)]) == 1
+        assert document.read_text() == patched
+
+    def test_list_and_show(self, temp_dir, capsys):
+        """Test listing anchors and showing sections and entries."""
+        manifest = temp_dir / "STATUS_MANIFEST.yaml"
+        manifest.write_text(MANIFEST)
+        document = temp_dir / "arch.md"
+        document.write_text(patch.stamp(ARCHITECTURE))
+
+        assert main(["patch", "list", str(document), "--json"]) == 0
+        rows = json.loads(capsys.readouterr().out)
+        assert [row["anchor"] for row in rows][:2] == [
+            "system-architecture",
+            "components",
+        ]
+        assert {row["state"] for row in rows} == {"ok"}
+
+        assert main(["patch", "show", str(manifest), "billing"]) == 0
+        assert capsys.readouterr().out.startswith('  billing:\n    name: "Billing"')
+        assert main(["patch", "show", str(document), "components"]) == 0
+        shown = capsys.readouterr().out
+        assert "### Auth" in shown and "### Billing" in shown
+        assert "## Data Flow" not in shown
+
+        fragment = temp_dir / "new.yaml"
+        fragment.write_text("search:\n  name: Search\n  status: PLANNED\n")
+        assert main(["patch", "apply", str(manifest), "--from", str(fragment)]) == 0
+        loaded = Manifest.load(manifest, cache=False)
+        assert sorted(c.id for c in loaded.components.values()) == [
+            "auth",
+            "billing",
+            "search",
+        ]
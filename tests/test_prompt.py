@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""Tests for the mode-aware bootstrap prompt assembler."""
+
+import json
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from axiomancer import prompt
+from axiomancer.cli import main
+from axiomancer.errors import PromptError
+
+REPO = Path(__file__).parent.parent
+
+SOURCE = """\
+<!-- section: intro -->
+# Assistant
+
+<!-- section: conception | modes: new | phases: conception | templates: B.md -->
+## New projects
+
+<!-- section: analysis | modes: existing | phases: analysis -->
+## Existing projects
+
+<!-- section: build | phases: generate | templates: A.yaml, B.md -->
+## Generate
+
+<!-- section: detect | modes: auto -->
+## Which mode?
+"""
+
+
+@pytest.fixture
+def temp_dir():
+    """Create a temporary working directory."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield Path(tmpdir)
+
+
+@pytest.fixture
+def templates(temp_dir):
+    """A template directory with the two templates SOURCE refers to."""
+    (temp_dir / "A.yaml").write_text("key: value\n")
+    (temp_dir / "B.md").write_text("# Template B\n")
+    return temp_dir
+
+
+def ids(assembly):
+    """Section ids of an assembly, in order."""
+    return [section.id for section in assembly.sections]
+
+
+class TestAssemble:
+    """Test section selection and template handling."""
+
+    def test_mode_selects_sections(self, templates):
+        """Test that each mode keeps only its own sections."""
+        new = prompt.assemble(SOURCE, "new", template_dir=templates)
+        full = prompt.assemble(SOURCE, "auto", template_dir=templates)
+
+        assert ids(new) == ["intro", "conception", "build"]
+        assert ids(full) == ["intro", "conception", "analysis", "build", "detect"]
+        assert "<!--" not in new.text
+        assert "## Existing projects" not in new.text
+        assert new.tokens < full.tokens
+
+    def test_phase_selects_sections(self, templates):
+        """Test that a phase keeps unconditional and matching sections."""
+        assembly = prompt.assemble(SOURCE, "existing", "generate", templates)
+
+        assert ids(assembly) == ["intro", "build"]
+        assert list(assembly.templates) == ["A.yaml", "B.md"]
+        with pytest.raises(PromptError, match="does not apply"):
+            prompt.assemble(SOURCE, "existing", "conception", templates)
+
+    def test_templates_listed_or_inlined(self, templates):
+        """Test that templates are listed by default and expanded on request."""
+        listed = prompt.assemble(SOURCE, "new", template_dir=templates)
+        inlined = prompt.assemble(SOURCE, "new", template_dir=templates, inline=True)
+
+        assert "- `B.md` (~4 tokens)\n- `A.yaml` (~3 tokens)\n" in listed.text
+        assert "# Template B" not in listed.text
+        assert "## Template: B.md\n\n# Template B\n" in inlined.text
+        assert "```yaml\nkey: value\n```" in inlined.text
+
+    def test_bad_markers(self):
+        """Test that typos in markers are reported rather than ignored."""
+        with pytest.raises(PromptError, match="unknown modes in a: old"):
+            prompt.parse_sections("<!-- section: a | modes: old -->\n")
+        with pytest.raises(PromptError, match="unknown field 'phase'"):
+            prompt.parse_sections("<!-- section: a | phase: analysis -->\n")
+        with pytest.raises(PromptError, match="duplicate section a"):
+            prompt.parse_sections("<!-- section: a -->\n<!-- section: a -->\n")
+
+    def test_shipped_prompt(self):
+        """Test the real prompt: both modes reassemble it without loss."""
+        text = (REPO / "axiomancer.md").read_text()
+        sections = prompt.parse_sections(text)
+        stripped = "".join(section.text for section in sections)
+
+        for mode in ("new", "existing"):
+            assembly = prompt.assemble(text, mode, template_dir=REPO / "templates")
+            assert "## Project Type Detection" not in assembly.text
+            assert assembly.tokens < assembly.source_tokens
+        assert prompt.estimate_tokens(stripped) == assembly.source_tokens
+        for phase in ("customize", "generate", "validate", "cleanup"):
+            prompt.assemble(text, "new", phase, REPO / "templates")
+
+
+class TestPromptCommand:
+    """Test the ``prompt`` command line."""
+
+    def test_json_report_and_output_file(self, templates, capsys):
+        """Test that --output writes the prompt and --json reports tokens."""
+        source = templates / "axiomancer.md"
+        source.write_text(SOURCE)
+        output = templates / "axiomancer-new.md"
+
+        status = main(
+            [
+                "prompt",
+                "--mode",
+                "new",
+                "--source",
+                str(source),
+                "--templates",
+                str(templates),
+                "--output",
+                str(output),
+                "--json",
+            ]
+        )
+
+        assert status == 0
+        report = json.loads(capsys.readouterr().out)
+        assert [s["id"] for s in report["sections"]] == ["intro", "conception", "build"]
+        assert report["tokens"] == prompt.estimate_tokens(output.read_text())
+        assert report["templates"][0] == {
+            "name": "B.md",
+            "tokens": 4,
+            "inlined": False,
+        }
+
+    def test_missing_source(self, temp_dir, capsys):
+        """Test that a missing prompt file is a clean error."""
+        assert main(["prompt", "--source", str(temp_dir / "missing.md")]) == 1
+        assert "Cannot read" in capsys.readouterr().err
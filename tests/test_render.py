@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""Tests for the compiled template renderer."""
+
+import json
+import tempfile
+from pathlib import Path
+
+import pytest
+import yaml
+
+from axiomancer import render
+from axiomancer.cli import main
+from axiomancer.errors import TemplateError
+
+
+@pytest.fixture
+def temp_dir():
+    """Create a temporary working directory."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield Path(tmpdir)
+
+
+@pytest.fixture
+def templates_dir():
+    """Get the real templates directory."""
+    return Path(__file__).parent.parent / "templates"
+
+
+@pytest.fixture
+def variables_file(temp_dir):
+    """Write a variables file like the README examples."""
+    path = temp_dir / "variables.yaml"
+    path.write_text(
+        'PROJECT_NAME: "TaskFlow API"\n'
+        'PROJECT_DESCRIPTION: "task management"\n'
+        'QUALITY_GATE_COMMANDS: "black --check .; mypy .; pytest --cov=src"\n'
+        "TOTAL_COMPONENTS: 11\n"
+        'DEPENDENCY_BOTTLENECKS: ["1.1-core-foundation"]\n'
+    )
+    return path
+
+
+class TestCompileTemplate:
+    """Test template compilation and caching."""
+
+    def test_renders_placeholders(self):
+        """Test that known placeholders are substituted."""
+        compiled = render.compile_template("# {{PROJECT_NAME}}\n{{ LANGUAGE }} code")
+        output, unresolved = compiled.render(
+            {"PROJECT_NAME": "TaskFlow", "LANGUAGE": "python"}
+        )
+
+        assert output == "# TaskFlow\npython code"
+        assert unresolved == []
+
+    def test_unresolved_placeholders_are_kept_verbatim(self):
+        """Test that runtime placeholders survive rendering untouched."""
+        compiled = render.compile_template("run {{TEST_COMMAND}} on {{ component }}")
+        output, unresolved = compiled.render({"TEST_COMMAND": "pytest"})
+
+        assert output == "run pytest on {{ component }}"
+        assert unresolved == ["component"]
+
+    def test_identical_content_is_compiled_once(self):
+        """Test that compilation is cached by content hash."""
+        first = render.compile_template("{{A}} and {{B}}")
+        second = render.compile_template("{{A}} and {{B}}")
+
+        assert first is second
+        assert first.placeholders == frozenset({"A", "B"})
+
+    def test_format_value_uses_yaml_friendly_spelling(self):
+        """Test that non-string values render as valid YAML scalars."""
+        assert render.format_value(True) == "true"
+        assert render.format_value(85) == "85"
+        assert render.format_value(None) == ""
+        assert render.format_value(["a", "b"]) == '["a", "b"]'
+
+    def test_yaml_values_are_escaped_for_quoted_scalars(self):
+        """Test that YAML output stays valid for quotes, backslashes and lists."""
+        compiled = render.compile_template(
+            'name: "{{NAME}}"\n'
+            'path: "C:{{PATH}}"\n'
+            'deps: "{{DEPS}}"\n'
+            "count: {{COUNT}}\n"
+            "# {{NAME}}\n"
+        )
+        variables = {
+            "NAME": 'The "Task" API',
+            "PATH": "\\src\\app",
+            "DEPS": ["1.1-core", "1.2-config"],
+            "COUNT": 11,
+        }
+
+        output, _ = compiled.render(variables, yaml=True)
+
+        assert yaml.safe_load(output) == {
+            "name": 'The "Task" API',
+            "path": "C:\\src\\app",
+            "deps": ["1.1-core", "1.2-config"],
+            "count": 11,
+        }
+        assert output.endswith('# The "Task" API\n')
+        markdown, _ = compiled.render(variables)
+        assert markdown.startswith('name: "The "Task" API"\n')
+
+
+class TestRenderDocuments:
+    """Test rendering a full documentation set."""
+
+    def test_renders_all_generated_documents(
+        self, templates_dir, variables_file, temp_dir
+    ):
+        """Test that every generated document is written in one pass."""
+        output_dir = temp_dir / "project"
+        results = render.render_documents(
+            render.load_variables(variables_file), templates_dir, output_dir
+        )
+
+        assert [r.template for r in results] == list(render.GENERATED_DOCUMENTS)
+        agent = (output_dir / "AGENT.md").read_text()
+        assert agent.startswith("# TaskFlow API Implementer System Prompt")
+        assert "{{PROJECT_NAME}}" not in agent
+
+        manifest = (output_dir / "STATUS_MANIFEST.yaml").read_text()
+        assert "total_components: 11" in manifest
+        assert 'dependency_bottlenecks: ["1.1-core-foundation"]' in manifest
+
+    def test_reports_unresolved_placeholders(
+        self, templates_dir, variables_file, temp_dir
+    ):
+        """Test that each result lists the placeholders left to fill."""
+        results = render.render_documents(
+            render.load_variables(variables_file),
+            templates_dir,
+            temp_dir,
+            names=["STATUS_MANIFEST.yaml"],
+        )
+
+        assert "TIMESTAMP" in results[0].unresolved
+        assert "PROJECT_NAME" not in results[0].unresolved
+
+    def test_strict_mode_writes_nothing(self, templates_dir, variables_file, temp_dir):
+        """Test that strict mode fails before writing any document."""
+        with pytest.raises(TemplateError, match="Unresolved placeholders"):
+            render.render_documents(
+                render.load_variables(variables_file),
+                templates_dir,
+                temp_dir / "out",
+                strict=True,
+            )
+
+        assert not (temp_dir / "out").exists()
+
+    def test_rejects_non_mapping_variables(self, temp_dir):
+        """Test that a variables file must be a mapping."""
+        path = temp_dir / "variables.json"
+        path.write_text(json.dumps(["PROJECT_NAME"]))
+
+        with pytest.raises(TemplateError, match="mapping"):
+            render.load_variables(path)
+
+
+class TestRenderCommand:
+    """Test the ``render`` command line."""
+
+    def test_json_output(self, templates_dir, variables_file, temp_dir, capsys):
+        """Test that --json prints one result per rendered template."""
+        status = main(
+            [
+                "render",
+                str(variables_file),
+                "--templates",
+                str(templates_dir),
+                "--output",
+                str(temp_dir),
+                "--only",
+                "AGENT.md",
+                "--json",
+            ]
+        )
+
+        assert status == 0
+        results = json.loads(capsys.readouterr().out)
+        assert results[0]["template"] == "AGENT.md"
+        assert results[0]["unresolved"] == []
+
+    def test_missing_template_is_reported(self, variables_file, temp_dir, capsys):
+        """Test that a missing template directory is a clean error."""
+        status = main(
+            ["render", str(variables_file), "--templates", str(temp_dir / "none")]
+        )
+
+        assert status == 1
+        assert "Cannot read template" in capsys.readouterr().err
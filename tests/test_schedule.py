@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""Tests for the parallel summon scheduler."""
+
+import json
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import pytest
+import yaml
+
+from axiomancer import manifest as manifest_module
+from axiomancer import schedule
+from axiomancer.cli import main
+from axiomancer.errors import ManifestError, ScheduleError
+from axiomancer.manifest import Manifest
+
+MANIFEST = """\
+components:
+  1.1-core:
+    name: "Core"
+    status: COMPLETED  # reviewed
+    dependencies: []
+  2.1-tasks:
+    name: "Tasks"
+    status: PLANNED
+    dependencies: ["1.1-core"]
+  2.2-users:
+    name: "Users"
+    status: PLANNED
+    dependencies: ["1.1-core"]
+  2.3-teams:
+    name: "Teams"
+    status: PLANNED
+    dependencies: []
+  3.1-api:
+    name: "API"
+    status: PLANNED
+    dependencies: ["2.1-tasks", "2.2-users"]
+
+phases:
+  phase_2:
+    components: ["2.1-tasks", "2.2-users", "2.3-teams"]
+"""
+
+# Writes <component>.txt and scribbles on the worktree's manifest copy.
+WORKER = (
+    "import os, sys; c = os.environ['AXIOMANCER_COMPONENT'];"
+    "open(c + '.txt', 'w').write(c);"
+    "open('STATUS_MANIFEST.yaml', 'a').write('# edited by ' + c);"
+    "sys.exit(c in sys.argv[1:])"
+)
+
+
+@pytest.fixture
+def temp_dir():
+    """Create a temporary working directory."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield Path(tmpdir)
+
+
+@pytest.fixture
+def repo(temp_dir, monkeypatch):
+    """A git repository with a committed status manifest."""
+    for name in ("AUTHOR", "COMMITTER"):
+        monkeypatch.setenv(f"GIT_{name}_NAME", "Test")
+        monkeypatch.setenv(f"GIT_{name}_EMAIL", "test@example.com")
+    (temp_dir / "STATUS_MANIFEST.yaml").write_text(MANIFEST)
+    subprocess.run(["git", "init", "-q"], cwd=temp_dir, check=True)
+    subprocess.run(["git", "add", "-A"], cwd=temp_dir, check=True)
+    subprocess.run(["git", "commit", "-q", "-m", "init"], cwd=temp_dir, check=True)
+    return temp_dir
+
+
+def worker_command(*failing):
+    """A summon command that fails for the given component ids."""
+    return [sys.executable, "-c", WORKER, *failing]
+
+
+def statuses(path):
+    """Component statuses as currently written in the manifest."""
+    manifest = Manifest.load(path, cache=False)
+    return {cid: c.status for cid, c in manifest.components.items()}
+
+
+class TestPlanWaves:
+    """Test selection and wave layering."""
+
+    def test_layers_independent_components(self):
+        """Test that components with no mutual dependencies share a wave."""
+        manifest = Manifest(manifest_module.parse_components(yaml.safe_load(MANIFEST)))
+
+        waves = schedule.plan_waves(manifest, schedule.select(manifest))
+
+        assert waves == [["2.1-tasks", "2.2-users", "2.3-teams"], ["3.1-api"]]
+
+    def test_outside_dependencies_must_be_completed(self):
+        """Test that a selection cannot start on unfinished outside work."""
+        manifest = Manifest(manifest_module.parse_components(yaml.safe_load(MANIFEST)))
+
+        with pytest.raises(ScheduleError, match="3.1-api needs 2.1-tasks"):
+            schedule.plan_waves(manifest, ["2.2-users", "3.1-api"])
+
+    def test_phase_selection(self, repo):
+        """Test that --phase schedules the PLANNED members of a phase."""
+        manifest = Manifest.load(repo / "STATUS_MANIFEST.yaml")
+
+        assert schedule.select(manifest, phase="phase_2") == [
+            "2.1-tasks",
+            "2.2-users",
+            "2.3-teams",
+        ]
+        with pytest.raises(ScheduleError, match="Unknown phase"):
+            schedule.select(manifest, phase="phase_9")
+        with pytest.raises(ScheduleError, match="not PLANNED"):
+            schedule.select(manifest, ["1.1-core"])
+
+
+class TestStatusUpdates:
+    """Test in-place status transitions."""
+
+    def test_set_status_changes_one_value(self):
+        """Test that only the component's status value is rewritten."""
+        updated = manifest_module.set_status(MANIFEST, "1.1-core", "USER_REVIEW")
+
+        assert "    status: USER_REVIEW  # reviewed\n" in updated
+        assert updated.count("\n") == MANIFEST.count("\n")
+        assert updated.replace("USER_REVIEW", "COMPLETED") == MANIFEST
+        with pytest.raises(ManifestError, match="Cannot find the status"):
+            manifest_module.set_status(MANIFEST, "9.9-missing", "COMPLETED")
+        with pytest.raises(ManifestError, match="Unknown status"):
+            manifest_module.set_status(MANIFEST, "1.1-core", "DONE")
+
+    def test_concurrent_updates_are_not_lost(self, temp_dir):
+        """Test that simultaneous transitions from many threads all land."""
+        path = temp_dir / "STATUS_MANIFEST.yaml"
+        path.write_text(MANIFEST)
+        ids = ["2.1-tasks", "2.2-users", "2.3-teams", "3.1-api"]
+        threads = [
+            threading.Thread(
+                target=manifest_module.update_status,
+                args=(path, {cid: "IN_PROGRESS"}),
+            )
+            for cid in ids
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert all(statuses(path)[cid] == "IN_PROGRESS" for cid in ids)
+
+
+class TestScheduler:
+    """Test running summons in git worktrees."""
+
+    def test_runs_waves_in_worktrees(self, repo):
+        """Test statuses, branches and dependency merges after a run."""
+        path = repo / "STATUS_MANIFEST.yaml"
+        manifest = Manifest.load(path)
+        waves = schedule.plan_waves(manifest, schedule.select(manifest))
+        results = schedule.Scheduler(repo, path, worker_command(), workers=3).run(
+            manifest, waves
+        )
+
+        assert [r.outcome for r in results] == ["succeeded"] * 4
+        assert statuses(path)["3.1-api"] == "USER_REVIEW"
+        assert statuses(path)["1.1-core"] == "COMPLETED"
+        api = Path(results[-1].worktree)
+        # The dependent starts from both dependency branches merged together.
+        assert (api / "2.1-tasks.txt").is_file()
+        assert (api / "2.2-users.txt").is_file()
+        assert not (api / "2.3-teams.txt").exists()
+        committed = subprocess.run(
+            ["git", "show", "--stat", "--format=%s", "summon/3.1-api"],
+            cwd=repo,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        assert committed.startswith("Summon 3.1-api")
+        assert "STATUS_MANIFEST.yaml" not in committed
+
+    def test_failure_skips_dependents(self, repo):
+        """Test that a failed summon reverts its status and skips dependents."""
+        path = repo / "STATUS_MANIFEST.yaml"
+        manifest = Manifest.load(path)
+        waves = schedule.plan_waves(manifest, schedule.select(manifest))
+        results = schedule.Scheduler(
+            repo, path, worker_command("2.2-users"), workers=2
+        ).run(manifest, waves)
+
+        outcomes = {r.component: r.outcome for r in results}
+        assert outcomes == {
+            "2.1-tasks": "succeeded",
+            "2.2-users": "failed",
+            "2.3-teams": "succeeded",
+            "3.1-api": "skipped",
+        }
+        assert statuses(path)["2.2-users"] == "PLANNED"
+        assert statuses(path)["3.1-api"] == "PLANNED"
+        branches = subprocess.run(
+            ["git", "branch", "--list", "summon/*"],
+            cwd=repo,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        assert "summon/2.1-tasks" in branches and "summon/2.2-users" not in branches
+        assert not (repo / ".axiomancer_cache/worktrees/2.2-users").exists()
+        assert (repo / ".axiomancer_cache/summons/2.2-users.log").exists()
+
+    def test_manifest_errors_fail_only_that_summon(self, repo):
+        """Test that a status update error is reported as a failed summon."""
+        path = repo / "STATUS_MANIFEST.yaml"
+        manifest = Manifest.load(path)
+        path.write_text(MANIFEST.replace("  2.2-users:", "  2.2-renamed:"))
+
+        results = schedule.Scheduler(repo, path, worker_command(), workers=2).run(
+            manifest, [["2.1-tasks", "2.2-users"]]
+        )
+
+        outcomes = {r.component: r.outcome for r in results}
+        assert outcomes == {"2.1-tasks": "succeeded", "2.2-users": "failed"}
+        assert "2.2-users" in results[1].error
+        assert results[1].branch is None
+
+    def test_parallel_worktrees_are_all_created(self, repo):
+        """Test that concurrent summons do not race on the worktree admin."""
+        path = repo / "STATUS_MANIFEST.yaml"
+        ids = [f"4.{n}-module" for n in range(12)]
+        path.write_text(
+            "components:\n"
+            + "".join(
+                f'  {cid}:\n    name: "{cid}"\n    status: PLANNED\n' for cid in ids
+            )
+        )
+        manifest = Manifest.load(path, cache=False)
+
+        results = schedule.Scheduler(repo, path, worker_command(), workers=6).run(
+            manifest, [ids]
+        )
+
+        assert [r.outcome for r in results] == ["succeeded"] * len(ids), [
+            r.error for r in results
+        ]
+        branches = subprocess.run(
+            ["git", "branch", "--list", "summon/*", "--format=%(refname:short)"],
+            cwd=repo,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.split()
+        assert branches == sorted(f"summon/{cid}" for cid in ids)
+        for result in results:
+            assert (Path(result.worktree) / f"{result.component}.txt").is_file()
+
+    def test_independent_summons_overlap(self, repo):
+        """Test that a wave runs concurrently rather than one at a time."""
+        path = repo / "STATUS_MANIFEST.yaml"
+        manifest = Manifest.load(path)
+        command = [sys.executable, "-c", "import time; time.sleep(0.5)"]
+        started = time.perf_counter()
+        schedule.Scheduler(repo, path, command, workers=3).run(
+            manifest, [["2.1-tasks", "2.2-users", "2.3-teams"]]
+        )
+
+        assert time.perf_counter() - started < 1.4
+
+
+class TestScheduleCommand:
+    """Test the ``schedule`` command line."""
+
+    def test_dry_run_prints_waves(self, repo, capsys):
+        """Test that --dry-run plans without touching the manifest."""
+        path = repo / "STATUS_MANIFEST.yaml"
+        status = main(["schedule", "--manifest", str(path), "--dry-run"])
+
+        assert status == 0
+        assert json.loads(capsys.readouterr().out)["waves"][1] == ["3.1-api"]
+        assert path.read_text() == MANIFEST
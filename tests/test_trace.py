@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""Tests for JSONL tracing and trace reports."""
+
+import json
+import subprocess
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from axiomancer import trace
+from axiomancer.cli import main
+from axiomancer.errors import TraceError
+
+
+@pytest.fixture
+def temp_dir():
+    """Create a temporary working directory."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield Path(tmpdir)
+
+
+@pytest.fixture
+def trace_file(temp_dir, monkeypatch):
+    """Turn tracing on for the test, writing to a fresh file."""
+    path = temp_dir / "trace.jsonl"
+    monkeypatch.setenv(trace.TRACE_ENV, str(path))
+    # Set rather than deleted so that the id trace_id() exports is undone
+    monkeypatch.setenv(trace.TRACE_ID_ENV, "")
+    return path
+
+
+def read_lines(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+class TestSpans:
+    """Test recording spans."""
+
+    def test_span_is_noop_without_trace(self, temp_dir, monkeypatch):
+        """Test that nothing is written when tracing is off."""
+        monkeypatch.delenv(trace.TRACE_ENV, raising=False)
+        with trace.span("work") as attrs:
+            trace.annotate(items=3)
+        assert attrs == {}
+        assert not list(temp_dir.iterdir())
+
+    def test_span_records_attributes_and_errors(self, trace_file):
+        """Test that spans carry annotations and record failures."""
+        with trace.span("outer", kind="test"):
+            with trace.span("inner"):
+                trace.annotate(items=3)
+            trace.annotate(done=True)
+        with pytest.raises(ValueError):
+            with trace.span("failing"):
+                raise ValueError("boom")
+
+        inner, outer, failing = read_lines(trace_file)
+        assert inner["span"] == "inner" and inner["attrs"]["items"] == 3
+        assert outer["attrs"]["kind"] == "test" and outer["attrs"]["done"] is True
+        assert "items" not in outer["attrs"]
+        assert failing["status"] == "error"
+        assert inner["trace"] == outer["trace"] == failing["trace"]
+        assert outer["duration"] >= inner["duration"] >= 0
+
+    def test_begin_and_end_share_the_run_across_processes(self, trace_file):
+        """Test that phase spans find the trace id in the id file."""
+        trace.begin("phase.analysis", {"mode": "existing"}, new_run=True)
+        run_id = trace_file.with_name("trace.jsonl.id").read_text().strip()
+
+        result = subprocess.run(
+            ["python3", "-m", "axiomancer", "trace", "end", "phase.analysis"]
+            + ["--attr", "components=4"],
+            cwd=Path(__file__).parent.parent,
+            env={"PATH": "/usr/bin:/bin", trace.TRACE_ENV: str(trace_file)},
+            capture_output=True,
+            text=True,
+        )
+
+        assert result.returncode == 0, result.stderr
+        (record,) = read_lines(trace_file)
+        assert record["trace"] == run_id
+        assert record["attrs"] == {"mode": "existing", "components": 4}
+
+    def test_end_without_begin_fails(self, trace_file, capsys):
+        """Test that closing an unknown span is an error."""
+        with pytest.raises(TraceError):
+            trace.end("phase.missing", {})
+        assert main(["trace", "end", "phase.missing"]) == 1
+        assert "was not begun" in capsys.readouterr().err
+
+    def test_cli_commands_are_spans(self, trace_file, temp_dir):
+        """Test that every command run through main is traced."""
+        assert main(["detect", str(temp_dir)]) == 0
+        (record,) = read_lines(trace_file)
+        assert record["span"] == "cli.detect"
+        assert record["status"] == "ok"
+
+
+class TestReport:
+    """Test aggregating spans."""
+
+    def test_percentiles(self):
+        """Test nearest-rank percentiles."""
+        ordered = [float(n) for n in range(1, 101)]
+        assert trace.percentile(ordered, 50) == 50
+        assert trace.percentile(ordered, 99) == 99
+        assert trace.percentile([0.5], 90) == 0.5
+
+    def test_report_aggregates_files_and_directories(self, temp_dir, capsys):
+        """Test counts, errors and attribute means across trace files."""
+        runs = temp_dir / "runs"
+        runs.mkdir()
+        for index in range(10):
+            record = {
+                "trace": f"run-{index % 2}",
+                "span": "install.target",
+                "duration": index / 10,
+                "status": "error" if index == 9 else "ok",
+                "attrs": {"files_written": 30 + index % 2, "target": "a"},
+            }
+            with open(runs / f"{index % 2}.jsonl", "a") as handle:
+                handle.write(json.dumps(record) + "\n")
+        with open(runs / "1.jsonl", "a") as handle:
+            handle.write('{"trace": "run-1", "span": "cut')
+
+        assert main(["trace", "report", str(runs), "--json"]) == 0
+        result = json.loads(capsys.readouterr().out)
+        row = result["spans"]["install.target"]
+        assert result["traces"] == 2
+        assert row["count"] == 10 and row["errors"] == 1
+        assert row["p50"] == 0.4 and row["p90"] == 0.8 and row["max"] == 0.9
+        assert row["attrs"] == {"files_written": 30.5}
+
+        assert main(["trace", "report", str(runs)]) == 0
+        assert "install.target" in capsys.readouterr().out
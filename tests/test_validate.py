@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""Tests for the Phase 4.5 template-completion validator."""
+
+import json
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from axiomancer import render, validate
+from axiomancer.cli import main
+
+MANIFEST = """\
+components:
+  1.1-core:
+    name: "Core"
+    status: COMPLETED
+    dependencies: []
+    location: "src/core"
+  2.1-api:
+    name: "API"
+    status: PLANNED
+    dependencies: ["1.1-core"]
+    location: "src/api"
+
+phases:
+  phase_1:
+    components: ["1.1-core", "2.1-api"]
+"""
+
+
+@pytest.fixture
+def temp_dir():
+    """Create a temporary working directory."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        yield Path(tmpdir)
+
+
+@pytest.fixture
+def project(temp_dir):
+    """A project whose generated documents are all complete."""
+    for name in render.GENERATED_DOCUMENTS:
+        (temp_dir / name).write_text(f"# {name}\n\n```bash\nmake test\n```\n")
+    (temp_dir / "STATUS_MANIFEST.yaml").write_text(MANIFEST)
+    (temp_dir / "src/core").mkdir(parents=True)
+    return temp_dir
+
+
+def checks(issues):
+    """Summarize issues as (document, line, severity, check) tuples."""
+    return [(i.document, i.line, i.severity, i.check) for i in issues]
+
+
+class TestDocuments:
+    """Test the per-file streaming checks."""
+
+    def test_complete_project_only_warns_for_planned_location(self, project):
+        """Test that a PLANNED component's missing location is a warning."""
+        issues = validate.validate(project)
+
+        assert checks(issues) == [("STATUS_MANIFEST.yaml", 7, "warning", "location")]
+        assert "src/api does not exist" in issues[0].message
+
+    def test_reports_placeholders_with_line_numbers(self, temp_dir):
+        """Test bootstrap placeholders are reported and runtime ones are not."""
+        (temp_dir / "GRIMOIRE.md").write_text(
+            "# {{PROJECT_NAME}}\n\nrun {{TEST_COMMAND}} tests/test_{{component}}.py\n"
+        )
+        issues = validate.validate(temp_dir, ["GRIMOIRE.md"])
+
+        assert [(i.line, i.message) for i in issues] == [
+            (1, "unresolved placeholder {{PROJECT_NAME}}"),
+            (3, "unresolved placeholder {{TEST_COMMAND}}"),
+        ]
+        assert (
+            validate.validate(temp_dir, ["GRIMOIRE.md"], ["PROJECT_NAME"])[0].line == 3
+        )
+
+    def test_unclosed_code_fence(self, temp_dir):
+        """Test that a fence left open is reported at its opening line."""
+        (temp_dir / "AGENT.md").write_text(
+            "# Agent\n````md\n```bash\n```\n````\n\n~~~\nopen\n"
+        )
+
+        assert checks(validate.validate(temp_dir, ["AGENT.md"])) == [
+            ("AGENT.md", 7, "error", "markdown")
+        ]
+
+    def test_missing_documents(self, temp_dir):
+        """Test that a missing glossary warns and other documents fail."""
+        issues = validate.validate(temp_dir, ["AGENT.md", "GLOSSARY.md"])
+
+        assert checks(issues) == [
+            ("AGENT.md", None, "error", "missing"),
+            ("GLOSSARY.md", None, "warning", "missing"),
+        ]
+
+    def test_rendered_templates_report_only_unset_variables(self, temp_dir):
+        """Test the real templates after a partial render."""
+        templates = Path(__file__).parent.parent / "templates"
+        render.render_documents(
+            {"PROJECT_NAME": "TaskFlow"}, templates, temp_dir, names=["AGENT.md"]
+        )
+        issues = validate.validate(temp_dir, ["AGENT.md"])
+
+        assert issues
+        assert all(i.check == "placeholder" for i in issues)
+        assert not any("PROJECT_NAME" in i.message for i in issues)
+
+
+class TestManifest:
+    """Test the status manifest checks."""
+
+    def test_unresolved_dependencies_cycles_and_phases(self, project):
+        """Test that broken references are errors at the component's line."""
+        (project / "STATUS_MANIFEST.yaml").write_text(
+            MANIFEST.replace('["1.1-core"]', '["2.1-api", "9.9-ghost"]').replace(
+                '"2.1-api"]', '"3.1-web"]'
+            )
+        )
+        issues = [
+            i
+            for i in validate.validate(project, ["STATUS_MANIFEST.yaml"])
+            if i.check == "dependency"
+        ]
+
+        assert [(i.line, i.message) for i in issues] == [
+            (7, "2.1-api depends on unknown 9.9-ghost"),
+            (7, "dependency cycle: 2.1-api -> 2.1-api"),
+            (14, "phase phase_1 lists unknown 3.1-web"),
+        ]
+
+    def test_missing_location_of_started_component_is_an_error(self, project):
+        """Test that work past PLANNED must point at existing code."""
+        (project / "STATUS_MANIFEST.yaml").write_text(
+            MANIFEST.replace("status: PLANNED", "status: IN_PROGRESS")
+        )
+
+        assert checks(validate.validate(project, ["STATUS_MANIFEST.yaml"])) == [
+            ("STATUS_MANIFEST.yaml", 7, "error", "location")
+        ]
+
+    def test_invalid_yaml_reports_line(self, temp_dir):
+        """Test that YAML syntax errors carry the problem line."""
+        (temp_dir / "STATUS_MANIFEST.yaml").write_text(
+            "components:\n  a:\n    name: [unclosed\n  b: {}\n"
+        )
+        issues = validate.validate(temp_dir, ["STATUS_MANIFEST.yaml"])
+
+        assert checks(issues)[0][2:] == ("error", "yaml")
+        assert issues[0].line is not None
+
+
+class TestValidateCommand:
+    """Test the ``validate`` command line."""
+
+    def test_json_report_and_exit_status(self, project, capsys):
+        """Test that errors make the command fail with a JSON report."""
+        (project / "AGENT.md").write_text("# {{PROJECT_NAME}}\n")
+
+        assert main(["validate", str(project), "--json"]) == 1
+        report = json.loads(capsys.readouterr().out)
+        assert report["ok"] is False
+        assert report["errors"] == 1
+        assert report["warnings"] == 1
+        assert report["issues"][0]["line"] == 1
+
+    def test_human_output(self, project, capsys):
+        """Test the summary line when only warnings remain."""
+        assert main(["validate", str(project)]) == 0
+
+        output = capsys.readouterr().out
+        assert "⚠️  STATUS_MANIFEST.yaml:7:" in output
+        assert "✅ 6 documents valid" in output